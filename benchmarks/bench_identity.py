@@ -0,0 +1,146 @@
+# benchmarks/bench_identity.py
+
+"""Throughput and latency of the identity subsystem across user and thread counts.
+
+For every (user count, thread count) pair this measures register_user,
+verify_user, generate_token, verify_token and has_permission, reporting
+ops/sec and latency percentiles, plus memory per user for each user
+count. Results are written as JSON so runs can be compared between
+versions.
+
+Usage: python -m benchmarks.bench_identity [--users 1000,10000] [--threads 1,4]
+       [--ops N] [--iterations N] [--store memory|sqlite] [--output FILE]
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from flask import Flask
+from src.core.identity import IdentityManager, Cryptography, SQLiteUserStore
+
+ROLES = ('viewer', 'editor', 'admin')
+PERMISSIONS = ('view', 'edit', 'delete')
+
+def timed_calls(fn, args_list, threads: int) -> dict:
+    """Run fn(*args) for every args on a thread pool; returns throughput and latency percentiles."""
+    latencies = np.empty(len(args_list))
+
+    def run(indices):
+        for i in indices:
+            start = time.perf_counter()
+            fn(*args_list[i])
+            latencies[i] = time.perf_counter() - start
+
+    shares = np.array_split(np.arange(len(args_list)), threads)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for future in [executor.submit(run, share) for share in shares]:
+            future.result()
+    elapsed = time.perf_counter() - start
+    p50, p90, p99 = np.percentile(latencies, [50, 90, 99]) * 1000
+    return {
+        'ops': len(args_list),
+        'seconds': elapsed,
+        'ops_per_sec': len(args_list) / elapsed,
+        'p50_ms': p50,
+        'p90_ms': p90,
+        'p99_ms': p99,
+        'max_ms': latencies.max() * 1000,
+    }
+
+def make_manager(store: str, iterations: int, directory: str) -> IdentityManager:
+    user_store = SQLiteUserStore(os.path.join(directory, f'users-{time.monotonic_ns()}.db')) if store == 'sqlite' else None
+    manager = IdentityManager(user_store=user_store)
+    manager.cryptography = Cryptography(iterations=iterations)
+    return manager
+
+def bench_case(users: int, threads: int, ops: int, iterations: int, store: str, directory: str) -> list:
+    """All operations for one (users, threads) pair, on a fresh manager."""
+    manager = make_manager(store, iterations, directory)
+    usernames = [f"user_{i:08d}" for i in range(users)]
+    rng = np.random.default_rng(0)
+    sample = [usernames[i] for i in rng.integers(0, users, size=ops)]
+    results = {}
+
+    results['register_user'] = timed_calls(manager.register_user, [(u, f"pw-{u}") for u in usernames], threads)
+    results['verify_user'] = timed_calls(manager.verify_user, [(u, f"pw-{u}") for u in sample], threads)
+    for i, username in enumerate(usernames):
+        manager.assign_role(username, ROLES[i % len(ROLES)])
+    results['generate_token'] = timed_calls(manager.generate_token, [(u,) for u in sample], threads)
+    tokens = [manager.token_manager.generate_token(u) for u in sample]
+    results['verify_token'] = timed_calls(manager.token_manager.verify_token, [(t,) for t in tokens], threads)
+    results['has_permission'] = timed_calls(
+        manager.user_roles.has_permission, [(u, PERMISSIONS[i % len(PERMISSIONS)]) for i, u in enumerate(sample)],
+        threads)
+    manager.users.close()
+    return [dict(operation=operation, users=users, threads=threads, **stats) for operation, stats in results.items()]
+
+def memory_per_user(users: int, store: str, directory: str) -> float:
+    """Bytes of Python heap retained per registered user (hashing at 1 iteration, since only sizes matter).
+
+    For the sqlite store this covers only in-process state; user rows live on disk.
+    """
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    manager = make_manager(store, 1, directory)
+    manager.register_users((f"user_{i:08d}", f"pw-{i}") for i in range(users))
+    for i in range(users):
+        manager.assign_role(f"user_{i:08d}", ROLES[i % len(ROLES)])
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    manager.users.close()
+    return used / users
+
+def int_list(text: str) -> list:
+    return [int(value) for value in text.split(',')]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int_list, default=[1000, 10000])
+    parser.add_argument('--threads', type=int_list, default=[1, 4])
+    parser.add_argument('--ops', type=int, default=2000, help="Calls per operation (register_user uses --users)")
+    parser.add_argument('--iterations', type=int, default=Cryptography().iterations, help="PBKDF2 iterations")
+    parser.add_argument('--store', choices=['memory', 'sqlite'], default='memory')
+    parser.add_argument('--output', default='bench_identity.json')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'benchmark-secret-0123456789abcdef'
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'iterations': args.iterations,
+        'store': args.store,
+        'results': [],
+        'memory': [],
+    }
+    with app.app_context(), tempfile.TemporaryDirectory() as directory:
+        for users in args.users:
+            report['memory'].append({'users': users, 'bytes_per_user': memory_per_user(users, args.store, directory)})
+            for threads in args.threads:
+                rows = bench_case(users, threads, args.ops, args.iterations, args.store, directory)
+                report['results'].extend(rows)
+                for row in rows:
+                    print(f"{row['operation']:>15} users={users:<8} threads={threads:<3} "
+                          f"{row['ops_per_sec']:12.1f} ops/s  p50={row['p50_ms']:.3f}ms  p99={row['p99_ms']:.3f}ms")
+            print(f"{'memory':>15} users={users:<8} {report['memory'][-1]['bytes_per_user']:.1f} bytes/user")
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/bench_identity_memory.py
+
+"""Measure memory per user of identity storage: the old dict-per-user layout vs InMemoryUserStore.
+
+Both layouts include the username -> role mapping UserRoles keeps for
+permission checks, and the username strings and hashes they retain.
+Hashes are random bytes in the stored PBKDF2 format, so no hashing time
+is spent.
+
+The default size runs in seconds for CI; --full measures the large
+run (200,000 users), which takes minutes and gigabytes.
+
+Usage: python -m benchmarks.bench_identity_memory [--users N | --full]
+"""
+
+import argparse
+import base64
+import gc
+import logging
+import os
+import tracemalloc
+from src.core.identity.user_roles import UserRoles
+from src.core.identity.user_store import InMemoryUserStore
+
+ROLES = ('viewer', 'editor', 'admin')
+DEFAULT_USERS = 10000
+FULL_USERS = 200000
+
+def fake_hash() -> bytes:
+    return b'$pbkdf2-sha256$i=100000,s=16$%s$%s' % (base64.b64encode(os.urandom(16)),
+                                                     base64.b64encode(os.urandom(32)))
+
+def generate_users(users: int):
+    for i in range(users):
+        yield f"user_{i:08d}", fake_hash()
+
+def measure(build, users: int) -> float:
+    """Bytes retained per user by build(users)."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    state = build(generate_users(users))
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del state
+    return used / users
+
+def build_dicts(generated):
+    """The previous layout: one dict per user plus UserRoles' own username -> role dict."""
+    users = {}
+    user_roles = {}
+    for i, (username, password_hash) in enumerate(generated):
+        role = ROLES[i % 3]
+        users[username] = {"password_hash": password_hash, "verified": bool(i % 2), "role": role}
+        user_roles[username] = role
+    return users, user_roles
+
+def build_compact(generated):
+    """InMemoryUserStore with UserRoles reading roles from the store."""
+    store = InMemoryUserStore()
+    roles = UserRoles(user_store=store)
+    for i, (username, password_hash) in enumerate(generated):
+        store.add(username, {"password_hash": password_hash, "verified": bool(i % 2), "role": ROLES[i % 3]})
+    return store, roles
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    sizes = parser.add_mutually_exclusive_group()
+    sizes.add_argument('--users', type=int, default=DEFAULT_USERS)
+    sizes.add_argument('--full', action='store_true', help=f"Measure {FULL_USERS} users")
+    args = parser.parse_args()
+    users = FULL_USERS if args.full else args.users
+    logging.disable(logging.INFO)
+
+    dicts = measure(build_dicts, users)
+    compact = measure(build_compact, users)
+    print(f"{users} users")
+    print(f"dict per user:     {dicts:8.1f} bytes/user")
+    print(f"InMemoryUserStore: {compact:8.1f} bytes/user ({dicts / compact:.2f}x smaller)")
+
+if __name__ == '__main__':
+    main()
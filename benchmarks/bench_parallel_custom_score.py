@@ -0,0 +1,51 @@
+# benchmarks/bench_parallel_custom_score.py
+
+"""Measure how CustomScore batch scoring scales with worker count.
+
+Usage: python -m benchmarks.bench_parallel_custom_score [--entities N] [--chunk-size N]
+"""
+
+import argparse
+import logging
+import os
+import time
+from src.core.reputation.reputation_manager import ReputationManager
+from src.core.reputation.scoring_algorithm import CustomScore
+
+def cpu_heavy_score(data, work=20000):
+    """Pure-Python scoring function that holds the GIL."""
+    total = 0.0
+    for i in range(work):
+        total += (data['a'] * i) % 7
+    return total / work
+
+def run(entities: int, executor: str, workers: int, chunk_size: int) -> float:
+    data = {f"entity_{i}": {'a': i} for i in range(entities)}
+    manager = ReputationManager(CustomScore(cpu_heavy_score), executor=executor,
+                                max_workers=workers, chunk_size=chunk_size)
+    try:
+        start = time.perf_counter()
+        manager.add_entities(data)
+        return time.perf_counter() - start
+    finally:
+        manager.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entities', type=int, default=2000)
+    parser.add_argument('--chunk-size', type=int, default=64)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    serial = run(args.entities, None, None, args.chunk_size)
+    print(f"{'executor':<10}{'workers':>8}{'seconds':>10}{'speedup':>9}")
+    print(f"{'serial':<10}{1:>8}{serial:>10.2f}{1.0:>9.2f}")
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        for executor in ('process', 'thread'):
+            elapsed = run(args.entities, executor, workers, args.chunk_size)
+            print(f"{executor:<10}{workers:>8}{elapsed:>10.2f}{serial / elapsed:>9.2f}")
+        workers *= 2
+
+if __name__ == '__main__':
+    main()
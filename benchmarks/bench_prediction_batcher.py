@@ -0,0 +1,62 @@
+# benchmarks/bench_prediction_batcher.py
+
+"""Compare single-row RiskAnalyzer.predict_risk calls with PredictionBatcher under concurrency.
+
+Usage: python -m benchmarks.bench_prediction_batcher [--requests N] [--threads N] [--max-delay-ms F]
+"""
+
+import argparse
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from src.core.risk_assessment import RiskAnalyzer, PredictionBatcher
+
+def train(features: int = 8) -> RiskAnalyzer:
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(rng.normal(size=(5000, features)), columns=[f"f{i}" for i in range(features)])
+    target = (data['f0'] + data['f1'] * data['f2'] > 0).astype(int)
+    analyzer = RiskAnalyzer()
+    analyzer.train_model(data, target)
+    return analyzer
+
+def run(predict, requests: list, threads: int):
+    """Issue every request from a thread pool; returns (requests/sec, latencies in ms)."""
+    latencies = np.empty(len(requests))
+
+    def call(i):
+        start = time.perf_counter()
+        predict(requests[i])
+        latencies[i] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(call, range(len(requests))))
+    return len(requests) / (time.perf_counter() - start), latencies * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-delay-ms', type=float, default=2.0)
+    args = parser.parse_args()
+    analyzer = train()
+    logging.disable(logging.INFO)
+    rows = np.random.default_rng(1).normal(size=(args.requests, 8))
+    columns = [f"f{i}" for i in range(8)]
+    requests = [pd.DataFrame(rows[i:i + 1], columns=columns) for i in range(args.requests)]
+
+    direct_rate, direct_latency = run(analyzer.predict_risk, requests, args.threads)
+    with PredictionBatcher(analyzer, args.max_batch_size, args.max_delay_ms / 1000) as batcher:
+        batched_rate, batched_latency = run(batcher.predict, requests, args.threads)
+        batches = batcher.batches
+    print(f"direct:  {direct_rate:9.1f} req/s  p50={np.percentile(direct_latency, 50):.2f}ms  "
+          f"p99={np.percentile(direct_latency, 99):.2f}ms")
+    print(f"batched: {batched_rate:9.1f} req/s  p50={np.percentile(batched_latency, 50):.2f}ms  "
+          f"p99={np.percentile(batched_latency, 99):.2f}ms  ({batches} batches, "
+          f"{batched_rate / direct_rate:.1f}x throughput)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+# benchmarks/bench_streaming_detection.py
+
+"""Per-event throughput and state size of StreamingAnomalyDetector on one core.
+
+Usage: python -m benchmarks.bench_streaming_detection [--events N] [--features N] [--projections N]
+"""
+
+import argparse
+import logging
+import time
+import numpy as np
+from src.core.risk_assessment import StreamingAnomalyDetector
+
+def rate(fn, events) -> float:
+    start = time.perf_counter()
+    for x in events:
+        fn(x)
+    return len(events) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--events', type=int, default=200000)
+    parser.add_argument('--features', type=int, default=8)
+    parser.add_argument('--projections', type=int, default=100)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    events = np.random.default_rng(0).normal(size=(args.events, args.features))
+    detector = StreamingAnomalyDetector(n_projections=args.projections).fit(events[:1000])
+    print(f"score_one:        {rate(detector.score_one, events):10.0f} events/s")
+    print(f"update:           {rate(detector.update, events):10.0f} events/s")
+    print(f"score_and_update: {rate(detector.score_and_update, events):10.0f} events/s")
+    print(f"state:            {detector.nbytes / 1024:10.1f} KiB after {2 * args.events} updates")
+
+if __name__ == '__main__':
+    main()
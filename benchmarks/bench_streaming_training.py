@@ -0,0 +1,57 @@
+# benchmarks/bench_streaming_training.py
+
+"""Peak memory and time of in-memory vs chunked (streaming) RiskAnalyzer training on a CSV file.
+
+Usage: python -m benchmarks.bench_streaming_training [--rows N] [--features N] [--chunksize N]
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from src.core.risk_assessment import RiskAnalyzer
+
+def write_csv(path: str, rows: int, features: int, block: int = 100000):
+    rng = np.random.default_rng(0)
+    columns = [f"f{i}" for i in range(features)]
+    for start in range(0, rows, block):
+        frame = pd.DataFrame(rng.normal(size=(min(block, rows - start), features)), columns=columns)
+        frame['risk'] = (frame['f0'] + frame['f1'] > 0).astype(int)
+        frame.to_csv(path, mode='a', header=start == 0, index=False)
+
+def measure(fn):
+    """Run fn under tracemalloc; returns (seconds, peak MB)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+def in_memory(path: str):
+    data = pd.read_csv(path)
+    RiskAnalyzer('SGD').train_model(data.drop(columns=['risk']), data['risk'])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--features', type=int, default=16)
+    parser.add_argument('--chunksize', type=int, default=50000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'data.csv')
+        write_csv(path, args.rows, args.features)
+        print(f"dataset:   {os.path.getsize(path) / 1e6:8.1f} MB on disk, {args.rows} rows")
+        seconds, peak = measure(lambda: in_memory(path))
+        print(f"in-memory: {seconds:8.2f}s  peak {peak:8.1f} MB")
+        seconds, peak = measure(lambda: RiskAnalyzer('SGD').train_model_streaming(path, 'risk', args.chunksize))
+        print(f"streaming: {seconds:8.2f}s  peak {peak:8.1f} MB  (chunksize {args.chunksize})")
+
+if __name__ == '__main__':
+    main()
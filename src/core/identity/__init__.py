@@ -4,5 +4,11 @@ from .identity_manager import IdentityManager
 from .cryptography import Cryptography
 from .token_manager import TokenManager
 from .user_roles import UserRoles
+from .permissions import PermissionEngine
+from .user_store import UserStore, InMemoryUserStore, SQLiteUserStore
+from .hashing_pool import PasswordHashingPool, HashingPoolSaturatedError
+from .rate_limiter import TokenBucketLimiter, LoginThrottle
 
-__all__ = ['IdentityManager', 'Cryptography', 'TokenManager', 'User Roles']
+__all__ = ['IdentityManager', 'Cryptography', 'TokenManager', 'UserRoles', 'PermissionEngine',
+           'UserStore', 'InMemoryUserStore', 'SQLiteUserStore',
+           'PasswordHashingPool', 'HashingPoolSaturatedError', 'TokenBucketLimiter', 'LoginThrottle']
@@ -1,16 +1,30 @@
 # src/core/identity/cryptography.py
 
+import base64
 import bcrypt
+import hmac
 import os
 import logging
+import time
 from hashlib import pbkdf2_hmac
 
+HASH_PREFIX = b'$pbkdf2-'
+LEGACY_ALGORITHM = 'sha256'  # Parameters of hashes stored as bare salt + hash
+LEGACY_ITERATIONS = 100000
+LEGACY_SALT_LENGTH = 16
+
 class Cryptography:
-    """Class for cryptographic functions."""
+    """Class for cryptographic functions.
+
+    PBKDF2 hashes are stored as b"$pbkdf2-<algorithm>$i=<iterations>,s=<salt length>$<salt>$<hash>"
+    (salt and hash base64), so parameters can change without breaking
+    existing hashes. Bare salt + hash values from before the format are
+    still accepted and reported by needs_rehash.
+    """
 
-    def __init__(self):
+    def __init__(self, iterations: int = None):
         self.salt_length = 16  # Length of the salt
-        self.iterations = 100000  # Number of iterations for PBKDF2
+        self.iterations = iterations or 100000  # Number of iterations for PBKDF2
         self.hash_algorithm = 'sha256'  # Hash algorithm for PBKDF2
 
     def generate_salt(self):
@@ -33,35 +47,72 @@ class Cryptography:
             salt,
             self.iterations
         )
-        # Combine salt and hash for storage
-        hashed_password = salt + password_hash
+        # Combine parameters, salt and hash for storage
+        hashed_password = b'%s%s$i=%d,s=%d$%s$%s' % (
+            HASH_PREFIX, self.hash_algorithm.encode('ascii'), self.iterations, len(salt),
+            base64.b64encode(salt), base64.b64encode(password_hash))
         logging.info("Password hashed successfully.")
         return hashed_password
 
+    @staticmethod
+    def parse_hash(hashed):
+        """Split a stored hash into (algorithm, iterations, salt, hash)."""
+        if not hashed.startswith(HASH_PREFIX):
+            return LEGACY_ALGORITHM, LEGACY_ITERATIONS, hashed[:LEGACY_SALT_LENGTH], hashed[LEGACY_SALT_LENGTH:]
+        try:
+            algorithm, params, salt, password_hash = hashed[len(HASH_PREFIX):].split(b'$')
+            params = dict(param.split(b'=') for param in params.split(b','))
+            salt = base64.b64decode(salt)
+            if len(salt) != int(params[b's']):
+                raise ValueError("Salt length does not match the hash header.")
+            return algorithm.decode('ascii'), int(params[b'i']), salt, base64.b64decode(password_hash)
+        except (ValueError, KeyError) as e:
+            raise ValueError(f"Malformed password hash: {e}") from e
+
+    def needs_rehash(self, hashed) -> bool:
+        """Whether a stored hash uses weaker or different parameters than this instance."""
+        algorithm, iterations, salt, _ = self.parse_hash(hashed)
+        return (not hashed.startswith(HASH_PREFIX) or algorithm != self.hash_algorithm
+                or iterations < self.iterations or len(salt) != self.salt_length)
+
     def verify_password(self, password, hashed):
         """Verify a password against a hashed password."""
         if not hashed:
             logging.error("Hashed password cannot be empty.")
             raise ValueError("Hashed password cannot be empty.")
 
-        # Extract the salt from the stored hash
-        salt = hashed[:self.salt_length]
-        stored_hash = hashed[self.salt_length:]
+        # Read the parameters and salt from the stored hash
+        algorithm, iterations, salt, stored_hash = self.parse_hash(hashed)
 
-        # Hash the provided password with the extracted salt
+        # Hash the provided password with the stored parameters
         password_hash = pbkdf2_hmac(
-            self.hash_algorithm,
+            algorithm,
             password.encode('utf-8'),
             salt,
-            self.iterations
+            iterations
         )
 
-        if password_hash == stored_hash:
+        if hmac.compare_digest(password_hash, stored_hash):
             logging.info("Password verification successful.")
             return True
         logging.warning("Password verification failed.")
         return False
 
+    def calibrate(self, target_seconds: float = 0.1, min_iterations: int = 100000,
+                  max_iterations: int = 10000000) -> int:
+        """Set iterations so one hash takes about target_seconds on this host; returns the new count."""
+        probe = 10000
+        elapsed = 0.0
+        while elapsed < 0.02 and probe < max_iterations:  # Time long enough runs to be meaningful
+            probe *= 2
+            start = time.perf_counter()
+            pbkdf2_hmac(self.hash_algorithm, b'calibration', b'\0' * self.salt_length, probe)
+            elapsed = time.perf_counter() - start
+        iterations = int(probe * target_seconds / max(elapsed, 1e-9))
+        self.iterations = min(max(iterations, min_iterations), max_iterations)
+        logging.info("Calibrated PBKDF2 to %d iterations for %.0f ms per hash.", self.iterations, target_seconds * 1000)
+        return self.iterations
+
     def hash_with_bcrypt(self, password):
         """Hash a password using bcrypt."""
         if not password:
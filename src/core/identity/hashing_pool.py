@@ -0,0 +1,135 @@
+# src/core/identity/hashing_pool.py
+
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .cryptography import Cryptography
+
+class HashingPoolSaturatedError(Exception):
+    """Raised when the password hashing queue is full."""
+
+class PasswordHashingPool:
+    """Bounded worker pool for PBKDF2 password hashing and verification.
+
+    hashlib.pbkdf2_hmac releases the GIL, so worker threads hash on separate
+    cores while request threads stay free. At most max_workers hashes run
+    at once and at most max_pending are queued or running; beyond that,
+    submissions wait up to submit_timeout and then fail fast with
+    HashingPoolSaturatedError. Batches count every item against
+    max_pending, so a large batch is fed in as its own earlier chunks
+    finish rather than bypassing the limit.
+    """
+
+    def __init__(self, cryptography: Cryptography = None, max_workers: int = None,
+                 max_pending: int = None, submit_timeout: float = 0.0):
+        self.cryptography = cryptography or Cryptography()
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) // 2)
+        self.max_pending = max_pending or self.max_workers * 8
+        self.submit_timeout = submit_timeout  # 0 = fail immediately when saturated
+        self._pending = 0  # Hashes queued or running
+        self._capacity = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='password-hash')
+        logging.info("PasswordHashingPool started with %d workers, %d pending slots.",
+                     self.max_workers, self.max_pending)
+
+    def _acquire(self, count: int, timeout: float) -> bool:
+        """Reserve count pending slots, waiting up to timeout (0 = not at all)."""
+        def fits():
+            return self._pending + count <= self.max_pending
+        with self._capacity:
+            if not fits() and (timeout <= 0 or not self._capacity.wait_for(fits, timeout)):
+                return False
+            self._pending += count
+            return True
+
+    def _release(self, count: int):
+        with self._capacity:
+            self._pending -= count
+            self._capacity.notify_all()
+
+    def _submit(self, fn, *args, timeout: float = None, count: int = 1):
+        """Queue fn(*args) holding count pending slots until it finishes."""
+        timeout = self.submit_timeout if timeout is None else timeout
+        if not self._acquire(count, timeout):
+            logging.warning("Password hashing pool saturated (%d pending).", self.max_pending)
+            raise HashingPoolSaturatedError("Password hashing queue is full.")
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._release(count)
+            raise
+        future.add_done_callback(lambda _future: self._release(count))
+        return future
+
+    def hash_password_async(self, password, timeout: float = None):
+        """Queue a password hash; returns a Future for the stored hash."""
+        return self._submit(self.cryptography.hash_password, password, timeout=timeout)
+
+    def verify_password_async(self, password, hashed, timeout: float = None):
+        """Queue a password verification; returns a Future for the boolean result."""
+        return self._submit(self.cryptography.verify_password, password, hashed, timeout=timeout)
+
+    @staticmethod
+    def _each(fn, items):
+        """fn(*item) for every item; a failing item yields its exception instead of failing the chunk."""
+        results = []
+        for item in items:
+            try:
+                results.append(fn(*item))
+            except Exception as e:
+                logging.error("Password hashing task failed: %s", str(e))
+                results.append(e)
+        return results
+
+    def verify_batch(self, pairs, timeout: float = None) -> list:
+        """Verify many (password, hashed) pairs across the workers.
+
+        Returns one result per pair, in input order: a boolean, or the
+        exception for a pair that failed (e.g. a malformed stored hash, or
+        HashingPoolSaturatedError if the pool stayed full). Each pair holds
+        one pending slot while queued or running; once the batch has
+        max_pending in flight it waits for its own earliest chunk.
+        """
+        return self._run_batch(self.cryptography.verify_password, list(pairs), timeout)
+
+    def hash_batch(self, passwords, timeout: float = None) -> list:
+        """Hash many passwords like verify_batch; returns a stored hash (or the exception) per password."""
+        return self._run_batch(self.cryptography.hash_password, [(password,) for password in passwords], timeout)
+
+    def _run_batch(self, fn, items, timeout):
+        results = [None] * len(items)
+        chunk_size = max(1, min(-(-len(items) // self.max_workers), self.max_pending // self.max_workers))
+        in_flight = deque()  # (start, stop, future) for this batch's queued chunks, oldest first
+
+        def collect():
+            start, stop, future = in_flight.popleft()
+            results[start:stop] = future.result()
+
+        start = 0
+        while start < len(items):
+            stop = min(start + chunk_size, len(items))
+            try:
+                # Only wait on the pool when none of this batch's own chunks can free slots
+                future = self._submit(self._each, fn, items[start:stop], timeout=0 if in_flight else timeout,
+                                      count=stop - start)
+            except HashingPoolSaturatedError as e:
+                if in_flight:
+                    collect()
+                    continue
+                results[start:] = [e] * (len(items) - start)
+                break
+            in_flight.append((start, stop, future))
+            start = stop
+        while in_flight:
+            collect()
+        return results
+
+    @property
+    def pending(self) -> int:
+        """Hashes currently queued or running."""
+        return self._pending
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -4,46 +4,194 @@ import logging
 from .cryptography import Cryptography
 from .token_manager import TokenManager
 from .user_roles import UserRoles
+from .hashing_pool import PasswordHashingPool, HashingPoolSaturatedError
+from .user_store import UserStore, InMemoryUserStore
+from .rate_limiter import LoginThrottle, THROTTLED_RESPONSE
+
+BUSY_RESPONSE = ({"error": "Server busy, please retry"}, 503)
+HASH_FAILED_RESPONSE = ({"error": "Password check failed"}, 500)
 
 class IdentityManager:
     """Class to manage identity verification and user management."""
 
-    def __init__(self):
+    def __init__(self, hashing_pool: PasswordHashingPool = None, user_store: UserStore = None,
+                 throttle: LoginThrottle = None):
         self.cryptography = Cryptography()
-        self.token_manager = TokenManager()
+        self.users = user_store if user_store is not None else InMemoryUserStore()  # e.g. SQLiteUserStore to persist and share users
+        self.token_manager = TokenManager(revocation_store=self.users if self.users.shared else None)
+        self.hashing_pool = hashing_pool  # Optional bounded pool for PBKDF2 work
+        self.throttle = throttle  # Optional per-username/per-IP attempt limits
+        if self.users.shared:
+            # Other processes may change roles, so every check reads the role from the store.
+            self.user_roles = UserRoles(role_source=self.users)
+            return
+        if self.users.role_table is not None:
+            self.user_roles = UserRoles(user_store=self.users)  # Reads roles from the store's own arrays
+            return
         self.user_roles = UserRoles()
-        self.users = {}  # In-memory user storage for demonstration
+        for username, role in self.users.role_assignments():
+            try:
+                self.user_roles.assign_role(username, role)
+            except ValueError:
+                logging.warning("Stored role '%s' for user %s is not defined.", role, username)
+
+    def _hash_password(self, password):
+        """Hash on the pool when configured (may raise HashingPoolSaturatedError), else inline."""
+        if self.hashing_pool is None:
+            return self.cryptography.hash_password(password)
+        return self.hashing_pool.hash_password_async(password).result()
+
+    def _verify_password(self, password, password_hash):
+        """Verify on the pool when configured (may raise HashingPoolSaturatedError), else inline."""
+        if self.hashing_pool is None:
+            return self.cryptography.verify_password(password, password_hash)
+        return self.hashing_pool.verify_password_async(password, password_hash).result()
+
+    @property
+    def _hasher(self) -> Cryptography:
+        """The Cryptography instance that produces new hashes."""
+        return self.cryptography if self.hashing_pool is None else self.hashing_pool.cryptography
+
+    def _upgrade_hash(self, username, password, password_hash):
+        """Rehash a just-verified password whose stored hash uses outdated parameters."""
+        if not self._hasher.needs_rehash(password_hash):
+            return
+        try:
+            new_hash = self._hash_password(password)
+        except HashingPoolSaturatedError:
+            logging.debug("Skipped password rehash for %s: hashing pool busy.", username)
+            return
+        self.users.update(username, password_hash=new_hash)
+        logging.info("Password hash upgraded for user: %s", username)
 
-    def register_user(self, username, password):
+    def register_user(self, username, password, client_ip=None):
         """Register a new user with encrypted password."""
+        if self.throttle is not None and not self.throttle.allow(username, client_ip):
+            return THROTTLED_RESPONSE
         if username in self.users:
             logging.warning("User  already exists: %s", username)
             return {"error": "User  already exists"}, 409
 
-        password_hash = self.cryptography.hash_password(password)
-        self.users[username] = {
+        try:
+            password_hash = self._hash_password(password)
+        except HashingPoolSaturatedError:
+            return BUSY_RESPONSE
+        if not self.users.add(username, {
             "password_hash": password_hash,
             "verified": False,
             "role": None  # Role will be assigned later
-        }
+        }):  # Registered concurrently while hashing
+            logging.warning("User  already exists: %s", username)
+            return {"error": "User  already exists"}, 409
         logging.info("User  registered: %s", username)
         return {"message": "User  registered successfully"}, 201
 
-    def verify_user(self, username, password):
+    def _throttled(self, credentials, client_ip):
+        """Indices of credentials the throttle rejects, checked per item like the single-item path."""
+        if self.throttle is None:
+            return set()
+        return {i for i, (username, _) in enumerate(credentials) if not self.throttle.allow(username, client_ip)}
+
+    def register_users(self, credentials, client_ip=None):
+        """Register many (username, password) pairs; returns one (response, status) per pair.
+
+        Each pair passes the throttle before any hashing. Hashing runs on the
+        pool when configured, and new users are written to the store in one
+        batch. A pair the pool could not hash gets 503 (pool busy) or 500 on
+        its own.
+        """
+        credentials = list(credentials)
+        results = [None] * len(credentials)
+        throttled = self._throttled(credentials, client_ip)
+        existing = self.users.get_many(username for username, _ in credentials)
+        pending = []
+        seen = set()
+        for i, (username, password) in enumerate(credentials):
+            if i in throttled:
+                results[i] = THROTTLED_RESPONSE
+            elif username in existing or username in seen:
+                results[i] = ({"error": "User  already exists"}, 409)
+            elif not password:
+                results[i] = ({"error": "Password cannot be empty."}, 400)
+            else:
+                seen.add(username)
+                pending.append(i)
+        passwords = [credentials[i][1] for i in pending]
+        if self.hashing_pool is None:
+            hashes = [self.cryptography.hash_password(password) for password in passwords]
+        else:
+            hashes = self.hashing_pool.hash_batch(passwords)  # Per-item exceptions for items that failed
+        failed = {i: BUSY_RESPONSE if isinstance(password_hash, HashingPoolSaturatedError) else HASH_FAILED_RESPONSE
+                  for i, password_hash in zip(pending, hashes) if isinstance(password_hash, Exception)}
+        inserted = self.users.add_many(
+            (credentials[i][0], {"password_hash": password_hash, "verified": False, "role": None})
+            for i, password_hash in zip(pending, hashes) if i not in failed)
+        for i in pending:
+            if i in failed:
+                results[i] = failed[i]
+            elif credentials[i][0] in inserted:
+                results[i] = ({"message": "User  registered successfully"}, 201)
+            else:
+                results[i] = ({"error": "User  already exists"}, 409)
+        logging.info("Batch registered %d of %d users.", len(inserted), len(credentials))
+        return results
+
+    def verify_user(self, username, password, client_ip=None):
         """Verify user credentials."""
+        if self.throttle is not None and not self.throttle.allow(username, client_ip):
+            return THROTTLED_RESPONSE
         user = self.users.get(username)
         if not user:
             logging.warning("User  not found: %s", username)
             return {"error": "User  not found"}, 404
 
-        if self.cryptography.verify_password(password, user["password_hash"]):
-            user["verified"] = True
+        try:
+            password_ok = self._verify_password(password, user["password_hash"])
+        except HashingPoolSaturatedError:
+            return BUSY_RESPONSE
+        if password_ok:
+            if not user["verified"]:
+                self.users.update(username, verified=True)
+            self._upgrade_hash(username, password, user["password_hash"])
             logging.info("User  verified: %s", username)
             return {"message": "User  verified successfully"}, 200
         else:
             logging.warning("Invalid password for user: %s", username)
             return {"error": "Invalid password"}, 401
 
+    def verify_users(self, credentials, client_ip=None):
+        """Verify many (username, password) pairs; returns one (response, status) per pair.
+
+        Each pair passes the throttle before any PBKDF2 work. With a hashing
+        pool that work is spread across its workers, and a pair it could not
+        check gets 503 (pool busy) or 500 on its own.
+        """
+        credentials = list(credentials)
+        throttled = self._throttled(credentials, client_ip)
+        users = self.users.get_many(username for username, _ in credentials)
+        known = [i for i, (username, _) in enumerate(credentials) if username in users and i not in throttled]
+        pairs = [(credentials[i][1], users[credentials[i][0]]["password_hash"]) for i in known]
+        if self.hashing_pool is None:
+            outcomes = [self.cryptography.verify_password(password, hashed) for password, hashed in pairs]
+        else:
+            outcomes = self.hashing_pool.verify_batch(pairs)  # Per-item exceptions for pairs that failed
+        results = [THROTTLED_RESPONSE if i in throttled else ({"error": "User  not found"}, 404)
+                   for i in range(len(credentials))]
+        for i, password_ok in zip(known, outcomes):
+            if isinstance(password_ok, HashingPoolSaturatedError):
+                results[i] = BUSY_RESPONSE
+            elif isinstance(password_ok, Exception):
+                results[i] = HASH_FAILED_RESPONSE
+            elif password_ok:
+                if not users[credentials[i][0]]["verified"]:
+                    self.users.update(credentials[i][0], verified=True)
+                self._upgrade_hash(credentials[i][0], credentials[i][1], users[credentials[i][0]]["password_hash"])
+                results[i] = ({"message": "User  verified successfully"}, 200)
+            else:
+                results[i] = ({"error": "Invalid password"}, 401)
+        logging.info("Batch verified %d credentials.", len(credentials))
+        return results
+
     def assign_role(self, username, role):
         """Assign a role to a user."""
         if username not in self.users:
@@ -52,7 +200,7 @@ class IdentityManager:
 
         try:
             self.user_roles.assign_role(username, role)
-            self.users[username]["role"] = role
+            self.users.update(username, role=role)
             logging.info("Role '%s' assigned to user: %s", role, username)
             return {"message": f"Role '{role}' assigned to user '{username}'."}, 200
         except ValueError as e:
@@ -61,7 +209,8 @@ class IdentityManager:
 
     def generate_token(self, username):
         """Generate a JWT token for a user."""
-        if username not in self.users or not self.users[username]["verified"]:
+        user = self.users.get(username)
+        if not user or not user["verified"]:
             logging.warning("Cannot generate token for unverified user: %s", username)
             return {"error": "User  not verified"}, 403
 
@@ -69,6 +218,25 @@ class IdentityManager:
         logging.info("Token generated for user: %s", username)
         return {"token": token}, 200
 
+    def generate_tokens(self, usernames):
+        """Generate JWT tokens for many users in one call.
+
+        Returns ({"tokens": {username: token}, "errors": {username: reason}}, 200).
+        """
+        usernames = list(usernames)
+        users = self.users.get_many(usernames)
+        eligible = []
+        errors = {}
+        for username in usernames:
+            user = users.get(username)
+            if user and user["verified"]:
+                eligible.append(username)
+            else:
+                errors[username] = "User  not verified"
+        tokens = self.token_manager.generate_tokens(eligible)
+        logging.info("Tokens generated for %d users, %d rejected.", len(tokens), len(errors))
+        return {"tokens": dict(zip(eligible, tokens)), "errors": errors}, 200
+
     def is_user_verified(self, username):
         """Check if the user is verified."""
         user = self.users.get(username)
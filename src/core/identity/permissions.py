@@ -0,0 +1,238 @@
+# src/core/identity/permissions.py
+
+import logging
+import numpy as np
+
+MAX_PERMISSIONS = 63  # Bits available below the all-permissions mask in a uint64
+ALL_PERMISSIONS = np.uint64(0xFFFFFFFFFFFFFFFF)
+NO_ROLE = -1
+
+class RoleTable:
+    """Interned role names: role -> small integer id and back, with NO_ROLE for no role."""
+
+    def __init__(self):
+        self.ids = {}  # role -> id
+        self.names = []  # id -> role
+
+    def __len__(self):
+        return len(self.names)
+
+    def intern(self, role) -> int:
+        """Id of a role, assigning the next one on first use; NO_ROLE for None."""
+        if role is None:
+            return NO_ROLE
+        role_id = self.ids.get(role)
+        if role_id is None:
+            role_id = self.ids[role] = len(self.names)
+            self.names.append(role)
+        return role_id
+
+    def name(self, role_id):
+        """Role for an id, or None for NO_ROLE."""
+        return None if role_id == NO_ROLE else self.names[role_id]
+
+class PermissionEngine:
+    """Role -> permission bitmask compiler with per-user effective masks.
+
+    Each permission name gets a bit; each role compiles to the OR of its
+    own permissions and those of every role it inherits from. Users hold a
+    role id in a NumPy array, so a single check is one table lookup and one
+    AND, and bulk checks are one gather and one vectorized AND. A role
+    marked superuser compiles to all bits set and passes any permission
+    check, including permissions that were never declared.
+
+    By default the engine keeps its own username -> slot dict, RoleTable
+    and per-slot role ids. Passing a user_store that keeps them itself
+    (InMemoryUserStore) reads all three from the store instead, so each
+    user's role is stored once; assign_role writes through to the store
+    and only users present in it can get roles.
+
+    Passing a role_source (a UserStore shared between processes, such as
+    SQLiteUserStore) keeps no per-user state at all: every check reads the
+    user's role from the store and only the role -> mask table is held in
+    memory, so role changes made by another process apply immediately.
+    """
+
+    def __init__(self, initial_capacity: int = 1024, user_store=None, role_source=None):
+        self._permission_bits = {}  # permission -> bit index
+        self._roles = {}  # role -> {'permissions': set, 'inherits': list, 'superuser': bool, 'description': str}
+        self._user_store = user_store  # Store holding slots and role ids, if set
+        self._role_table = user_store.role_table if user_store is not None else RoleTable()
+        self._role_ids = self._role_table.ids  # role -> id
+        self._role_names = self._role_table.names  # id -> role
+        self._role_masks = np.zeros(0, dtype=np.uint64)  # id -> compiled mask
+        self._user_slots = user_store.slot_index if user_store is not None else {}  # username -> slot
+        self._own_role_ids = np.full(initial_capacity, NO_ROLE, dtype=np.int16)  # slot -> role id, without a store
+        self._role_source = role_source  # Store to read roles from on every check, if set
+
+    @property
+    def roles(self):
+        """Defined role names."""
+        return list(self._roles)
+
+    @property
+    def _user_role_ids(self) -> np.ndarray:
+        """slot -> role id (the store's array when sharing one; it is replaced as the store grows)."""
+        return self._user_store.role_ids if self._user_store is not None else self._own_role_ids
+
+    def role_description(self, role):
+        return self._roles[role]['description']
+
+    def _bit(self, permission):
+        bit = self._permission_bits.get(permission)
+        if bit is None:
+            if len(self._permission_bits) >= MAX_PERMISSIONS:
+                raise ValueError(f"At most {MAX_PERMISSIONS} distinct permissions are supported.")
+            bit = len(self._permission_bits)
+            self._permission_bits[permission] = bit
+        return bit
+
+    def define_role(self, role, permissions=(), inherits=(), superuser=False, description=''):
+        """Define or redefine a role at runtime and recompile every role and user mask."""
+        for parent in inherits:
+            if parent not in self._roles:
+                raise ValueError(f"Unknown parent role: {parent}")
+        previous = self._roles.get(role)
+        self._roles[role] = {
+            'permissions': set(permissions),
+            'inherits': list(inherits),
+            'superuser': superuser,
+            'description': description,
+        }
+        try:
+            self._compile()
+        except ValueError:
+            if previous is None:
+                del self._roles[role]
+            else:
+                self._roles[role] = previous
+            raise
+        logging.info("Role '%s' defined.", role)
+
+    def _compile(self):
+        """Resolve inheritance into one mask per role and refresh user masks."""
+        for role in self._roles:
+            for permission in self._roles[role]['permissions']:
+                self._bit(permission)
+            self._role_table.intern(role)
+        masks = {}
+
+        def resolve(role, visiting):
+            if role in masks:
+                return masks[role]
+            if role in visiting:
+                raise ValueError(f"Role inheritance cycle involving '{role}'.")
+            visiting.add(role)
+            definition = self._roles[role]
+            if definition['superuser']:
+                mask = int(ALL_PERMISSIONS)
+            else:
+                mask = 0
+                for permission in definition['permissions']:
+                    mask |= 1 << self._permission_bits[permission]
+                for parent in definition['inherits']:
+                    mask |= resolve(parent, visiting)
+            visiting.discard(role)
+            masks[role] = mask
+            return mask
+
+        role_masks = np.zeros(len(self._role_names), dtype=np.uint64)  # Roles only a store interned stay 0
+        for role in self._roles:
+            role_masks[self._role_ids[role]] = resolve(role, set())
+        self._role_masks = role_masks
+
+    def _role_id(self, username):
+        """Role id of a user, NO_ROLE if unknown or without a role."""
+        slot = self._user_slots.get(username)
+        role_ids = self._user_role_ids
+        return int(role_ids[slot]) if slot is not None and slot < len(role_ids) else NO_ROLE
+
+    def _id_mask(self, role_id):
+        """Compiled mask of a role id; no permissions for NO_ROLE or a role that is not defined."""
+        return self._role_masks[role_id] if 0 <= role_id < len(self._role_masks) else np.uint64(0)
+
+    def _role_mask(self, role):
+        """Compiled mask of a role name; no permissions for None or an undefined role."""
+        role_id = self._role_ids.get(role)
+        return self._id_mask(role_id) if role_id is not None else np.uint64(0)
+
+    def assign_role(self, username, role):
+        """Assign a defined role to a user (with a role_source, only validates it; the store holds it)."""
+        if role not in self._roles:
+            raise ValueError("Invalid role specified.")
+        if self._role_source is not None:
+            return
+        if self._user_store is not None:
+            if not self._user_store.update(username, role=role):
+                raise ValueError(f"Unknown user: {username}")
+            return
+        slot = self._user_slots.get(username)
+        if slot is None:
+            slot = len(self._user_slots)
+            if slot >= len(self._own_role_ids):
+                role_ids = np.full(2 * len(self._own_role_ids) + 1, NO_ROLE, dtype=np.int16)
+                role_ids[:len(self._own_role_ids)] = self._own_role_ids
+                self._own_role_ids = role_ids
+            self._user_slots[username] = slot
+        self._own_role_ids[slot] = self._role_ids[role]
+
+    def get_user_role(self, username):
+        """Role assigned to a user, or None."""
+        if self._role_source is not None:
+            return self._role_source.get_role(username)
+        return self._role_table.name(self._role_id(username))
+
+    def user_roles(self) -> dict:
+        """username -> role for every user with a role."""
+        if self._role_source is not None:
+            return dict(self._role_source.role_assignments())
+        role_ids = self._user_role_ids
+        return {username: self._role_names[role_ids[slot]]
+                for username, slot in list(self._user_slots.items())
+                if slot < len(role_ids) and role_ids[slot] != NO_ROLE}
+
+    def _permission_mask(self, permission):
+        bit = self._permission_bits.get(permission)
+        return None if bit is None else np.uint64(1 << bit)
+
+    def has_permission(self, username, permission) -> bool:
+        """Check one user's permission with a single AND on the effective mask."""
+        if self._role_source is not None:
+            user_mask = self._role_mask(self._role_source.get_role(username))
+        else:
+            user_mask = self._id_mask(self._role_id(username))
+        permission_mask = self._permission_mask(permission)
+        if permission_mask is None:
+            return bool(user_mask == ALL_PERMISSIONS)
+        return bool(user_mask & permission_mask)
+
+    def check_many(self, usernames, permission) -> np.ndarray:
+        """Boolean array: which of the given users hold a permission (one vectorized AND)."""
+        if self._role_source is not None:
+            roles = self._role_source.get_roles(usernames)
+            masks = np.fromiter((self._role_mask(roles.get(username)) for username in usernames),
+                                dtype=np.uint64, count=len(usernames))
+        else:
+            masks = self._user_mask_array(usernames)
+        permission_mask = self._permission_mask(permission)
+        if permission_mask is None:
+            return masks == ALL_PERMISSIONS
+        return (masks & permission_mask) != 0
+
+    def _user_mask_array(self, usernames) -> np.ndarray:
+        slots = np.fromiter((self._user_slots.get(username, -1) for username in usernames),
+                            dtype=np.int64, count=len(usernames))
+        role_ids = self._user_role_ids
+        known = (slots >= 0) & (slots < len(role_ids))
+        ids = np.full(len(slots), NO_ROLE, dtype=np.int64)
+        ids[known] = role_ids[slots[known]]
+        defined = (ids >= 0) & (ids < len(self._role_masks))
+        masks = np.zeros(len(slots), dtype=np.uint64)
+        masks[defined] = self._role_masks[ids[defined]]
+        return masks
+
+    def users_with_permission(self, usernames, permission) -> list:
+        """The subset of usernames that hold a permission, in input order."""
+        usernames = list(usernames)
+        allowed = self.check_many(usernames, permission)
+        return [username for username, ok in zip(usernames, allowed) if ok]
@@ -0,0 +1,86 @@
+# src/core/identity/rate_limiter.py
+
+import logging
+import threading
+import time
+
+THROTTLED_RESPONSE = ({"error": "Too many attempts, please retry later"}, 429)
+
+class TokenBucketLimiter:
+    """Per-key token buckets in a lock-striped table.
+
+    Keys hash to one of num_stripes stripes, each with its own dict and
+    lock, so concurrent checks on different keys rarely contend. Buckets
+    refill lazily on access; a bucket idle long enough to refill
+    completely is indistinguishable from a new one, so each stripe drops
+    such buckets every evict_interval seconds.
+    """
+
+    def __init__(self, rate: float, burst: float, num_stripes: int = 64, evict_interval: float = 60.0):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1.")
+        self.rate = rate  # tokens per second
+        self.burst = burst  # bucket capacity
+        self.evict_interval = evict_interval
+        self._full_after = burst / rate  # idle seconds after which a bucket is full again
+        self._stripes = [{} for _ in range(num_stripes)]  # key -> [tokens, last refill time]
+        self._locks = [threading.Lock() for _ in range(num_stripes)]
+        self._last_sweep = [time.monotonic()] * num_stripes
+
+    def __len__(self):
+        return sum(len(stripe) for stripe in self._stripes)
+
+    def allow(self, key, cost: float = 1.0, now: float = None) -> bool:
+        """Take cost tokens from key's bucket; False (and nothing taken) if it has too few."""
+        now = time.monotonic() if now is None else now
+        index = hash(key) % len(self._stripes)
+        buckets = self._stripes[index]
+        with self._locks[index]:
+            if now - self._last_sweep[index] >= self.evict_interval:
+                self._sweep(index, now)
+            bucket = buckets.get(key)
+            if bucket is None:
+                tokens = self.burst
+                bucket = buckets[key] = [tokens, now]
+            else:
+                tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if tokens < cost:
+                bucket[0] = tokens
+                return False
+            bucket[0] = tokens - cost
+            return True
+
+    def _sweep(self, index, now):
+        buckets = self._stripes[index]
+        idle = [key for key, (_, last) in buckets.items() if now - last >= self._full_after]
+        for key in idle:
+            del buckets[key]
+        self._last_sweep[index] = now
+
+    def evict_idle(self, now: float = None) -> int:
+        """Drop fully refilled buckets from every stripe. Returns how many were dropped."""
+        now = time.monotonic() if now is None else now
+        before = len(self)
+        for index, lock in enumerate(self._locks):
+            with lock:
+                self._sweep(index, now)
+        return before - len(self)
+
+class LoginThrottle:
+    """Token-bucket limits on login and registration attempts per username and per client IP."""
+
+    def __init__(self, per_user_rate: float = 0.2, per_user_burst: float = 5,
+                 per_ip_rate: float = 2.0, per_ip_burst: float = 20, num_stripes: int = 64):
+        self.users = TokenBucketLimiter(per_user_rate, per_user_burst, num_stripes)
+        self.ips = TokenBucketLimiter(per_ip_rate, per_ip_burst, num_stripes)
+
+    def allow(self, username, client_ip=None, now: float = None) -> bool:
+        """Whether an attempt may proceed; checks the IP bucket first, then the username bucket."""
+        if client_ip is not None and not self.ips.allow(client_ip, now=now):
+            logging.warning("Throttled attempts from IP: %s", client_ip)
+            return False
+        if not self.users.allow(username, now=now):
+            logging.warning("Throttled attempts for user: %s", username)
+            return False
+        return True
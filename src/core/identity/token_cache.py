@@ -0,0 +1,121 @@
+# src/core/identity/token_cache.py
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+def token_digest(token) -> bytes:
+    """Fixed-size digest of a token, used as its cache key."""
+    if isinstance(token, str):
+        token = token.encode('utf-8')
+    return hashlib.blake2b(token, digest_size=16).digest()
+
+class RevocationList:
+    """Revoked token ids (jti, or token digest for tokens without one), kept until the token expires.
+
+    Revocations whose tokens have expired are pruned automatically, at most
+    once per prune_interval seconds, when new revocations are added. With a
+    shared store (e.g. SQLiteUserStore) revocations are written to and read
+    from the store, so a token revoked by one worker is rejected by all of
+    them. Ids the store reports as not revoked are remembered for
+    negative_ttl seconds, so repeat verifications skip the query; a
+    revocation made through another worker therefore takes effect within
+    negative_ttl, and one made through this list immediately.
+    """
+
+    def __init__(self, store=None, prune_interval: float = 60.0, negative_ttl: float = 1.0,
+                 negative_cache_size: int = 100000):
+        self.store = store
+        self.prune_interval = prune_interval
+        self.negative_ttl = negative_ttl
+        self.negative_cache_size = negative_cache_size
+        self._revoked = {}  # revocation id -> exp
+        self._not_revoked = {}  # revocation id -> monotonic time the store answer goes stale (store only)
+        self._next_prune = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._revoked)
+
+    def __contains__(self, revocation_id) -> bool:
+        if self.store is None:
+            return revocation_id in self._revoked
+        now = time.monotonic()
+        stale_at = self._not_revoked.get(revocation_id)
+        if stale_at is not None and stale_at > now:
+            return False
+        revoked = self.store.is_revoked(revocation_id)
+        if not revoked and self.negative_ttl > 0:
+            with self._lock:
+                if len(self._not_revoked) >= self.negative_cache_size:
+                    self._not_revoked.clear()
+                self._not_revoked[revocation_id] = now + self.negative_ttl
+        return revoked
+
+    def revoke(self, revocation_id: str, exp: float, now: float = None):
+        now = time.time() if now is None else now
+        if now >= self._next_prune:
+            self.prune(now)
+        if self.store is not None:
+            self.store.add_revocation(revocation_id, exp)
+            with self._lock:
+                self._not_revoked.pop(revocation_id, None)
+            return
+        with self._lock:
+            self._revoked[revocation_id] = exp
+
+    def prune(self, now: float = None) -> int:
+        """Forget revocations whose tokens have expired anyway. Returns how many were dropped."""
+        now = time.time() if now is None else now
+        self._next_prune = now + self.prune_interval
+        if self.store is not None:
+            return self.store.prune_revocations(now)
+        with self._lock:
+            expired = [revocation_id for revocation_id, exp in self._revoked.items() if exp <= now]
+            for revocation_id in expired:
+                del self._revoked[revocation_id]
+        return len(expired)
+
+class VerifiedTokenCache:
+    """Bounded LRU of verified token payloads keyed by token digest, each expiring at its own exp."""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # digest -> payload
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, digest: bytes, now: float = None):
+        """Cached payload for a digest, or None if absent or expired."""
+        with self._lock:
+            payload = self._entries.get(digest)
+            if payload is None:
+                self.misses += 1
+                return None
+            if payload['exp'] <= (time.time() if now is None else now):
+                del self._entries[digest]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return payload
+
+    def put(self, digest: bytes, payload: dict):
+        with self._lock:
+            self._entries[digest] = payload
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, digest: bytes):
+        with self._lock:
+            self._entries.pop(digest, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
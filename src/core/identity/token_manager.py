@@ -2,36 +2,146 @@
 
 import jwt
 import datetime
+import hashlib
+import hmac
+import json
 import logging
+import time
+import uuid
+from jwt.utils import base64url_encode, base64url_decode
 from flask import current_app
+from .token_cache import VerifiedTokenCache, RevocationList, token_digest
 
 class TokenManager:
     """Class for managing JWT tokens."""
 
-    def __init__(self):
+    def __init__(self, cache_size=10000, revocation_store=None, revocation_ttl=1.0):
         self.secret_key = current_app.config['SECRET_KEY']
         self.algorithm = 'HS256'
         self.expiration_time = 3600  # Token expiration time in seconds (1 hour)
+        self.cache = VerifiedTokenCache(cache_size)  # Recently verified tokens, until their exp
+        # Revocations live in revocation_store (e.g. SQLiteUserStore) when given, so every worker sees them
+        # within revocation_ttl seconds.
+        self.revocations = RevocationList(store=revocation_store, negative_ttl=revocation_ttl)
+        # Prepared once for the batch APIs: encoded header segment and keyed HMAC state.
+        self._header_segment = base64url_encode(
+            json.dumps({'alg': self.algorithm, 'typ': 'JWT'}, separators=(',', ':')).encode('utf-8'))
+        self._mac = hmac.new(self.secret_key.encode('utf-8'), digestmod=hashlib.sha256)
 
     def generate_token(self, username):
         """Generate a JWT token for a user."""
         expiration = datetime.datetime.utcnow() + datetime.timedelta(seconds=self.expiration_time)
         token = jwt.encode({
             'sub': username,
-            'exp': expiration
+            'exp': expiration,
+            'jti': uuid.uuid4().hex  # Lets individual tokens be revoked
         }, self.secret_key, algorithm=self.algorithm)
         logging.info("Token generated for user: %s", username)
         return token
 
+    def _sign(self, signing_input: bytes) -> bytes:
+        mac = self._mac.copy()
+        mac.update(signing_input)
+        return mac.digest()
+
+    def generate_tokens(self, usernames):
+        """Generate JWT tokens for many users, reusing the encoded header and keyed HMAC."""
+        exp = int(time.time()) + self.expiration_time
+        tokens = []
+        for username in usernames:
+            payload = json.dumps({'sub': username, 'exp': exp, 'jti': uuid.uuid4().hex},
+                                 separators=(',', ':')).encode('utf-8')
+            signing_input = self._header_segment + b'.' + base64url_encode(payload)
+            tokens.append((signing_input + b'.' + base64url_encode(self._sign(signing_input))).decode('ascii'))
+        logging.info("Generated %d tokens in batch.", len(tokens))
+        return tokens
+
+    def _decode_prepared(self, token):
+        """Verify a token issued with the prepared header; returns its payload or None.
+
+        Raises ValueError when the token uses a different header encoding so
+        the caller can fall back to jwt.decode.
+        """
+        token_bytes = token.encode('ascii') if isinstance(token, str) else token
+        signing_input, _, signature = token_bytes.rpartition(b'.')
+        header_segment, _, payload_segment = signing_input.partition(b'.')
+        if header_segment != self._header_segment:
+            raise ValueError("Token header differs from the prepared header.")
+        if not hmac.compare_digest(self._sign(signing_input), base64url_decode(signature)):
+            return None
+        payload = json.loads(base64url_decode(payload_segment))
+        now = time.time()
+        if ('exp' in payload and payload['exp'] <= now) or ('nbf' in payload and payload['nbf'] > now):
+            return None
+        return payload
+
+    def verify_tokens(self, tokens):
+        """Verify many tokens; returns the username (or None) for each, in input order."""
+        subjects = []
+        for token in tokens:
+            digest = token_digest(token)
+            payload = self.cache.get(digest)
+            if payload is None:
+                try:
+                    payload = self._decode_prepared(token)
+                except ValueError:
+                    try:
+                        payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+                    except jwt.InvalidTokenError:
+                        payload = None
+                except Exception:
+                    payload = None  # Malformed base64 or JSON
+                if payload is not None and 'exp' in payload:
+                    self.cache.put(digest, payload)
+            if payload is None or self._revocation_id(payload, digest) in self.revocations:
+                subjects.append(None)
+            else:
+                subjects.append(payload.get('sub'))
+        logging.info("Verified %d tokens in batch (%d valid).", len(subjects), sum(s is not None for s in subjects))
+        return subjects
+
+    @staticmethod
+    def _revocation_id(payload, digest):
+        """The jti, or the token digest for tokens issued without one."""
+        return payload.get('jti') or digest.hex()
+
     def verify_token(self, token):
         """Verify a JWT token."""
+        digest = token_digest(token)
+        payload = self.cache.get(digest)
+        if payload is not None:
+            if self._revocation_id(payload, digest) in self.revocations:
+                self.cache.discard(digest)
+                logging.warning("Token has been revoked.")
+                return None
+            logging.debug("Token verified from cache for user: %s", payload['sub'])
+            return payload['sub']
         try:
             payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
-            logging.info("Token verified successfully for user: %s", payload['sub'])
-            return payload['sub']
         except jwt.ExpiredSignatureError:
             logging.warning("Token has expired.")
             return None
         except jwt.InvalidTokenError:
             logging.warning("Invalid token.")
             return None
+        if self._revocation_id(payload, digest) in self.revocations:
+            logging.warning("Token has been revoked.")
+            return None
+        if 'exp' in payload:
+            self.cache.put(digest, payload)
+        logging.info("Token verified successfully for user: %s", payload['sub'])
+        return payload['sub']
+
+    def revoke_token(self, token):
+        """Revoke a token immediately. Returns False if the token is not one of ours."""
+        digest = token_digest(token)
+        try:
+            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm],
+                                 options={'verify_exp': False})
+        except jwt.InvalidTokenError:
+            logging.warning("Cannot revoke invalid token.")
+            return False
+        self.revocations.revoke(self._revocation_id(payload, digest), payload.get('exp', float('inf')))
+        self.cache.discard(digest)
+        logging.info("Token revoked for user: %s", payload['sub'])
+        return True
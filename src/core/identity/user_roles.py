@@ -1,5 +1,7 @@
 # src/core/identity/user_roles.py
 
+from .permissions import PermissionEngine
+
 class UserRoles:
     """Class for managing user roles and permissions."""
 
@@ -9,27 +11,36 @@ class UserRoles:
         'viewer': 'User with read-only access'
     }
 
-    def __init__(self):
-        self.user_roles = {}  # In-memory storage for user roles
+    def __init__(self, user_store=None, role_source=None):
+        # Built-in roles compile to bitmasks; custom roles can be added with define_role().
+        self.permissions = PermissionEngine(user_store=user_store, role_source=role_source)
+        self.permissions.define_role('viewer', ['view'], description=self.ROLES['viewer'])
+        self.permissions.define_role('editor', ['edit'], inherits=['viewer'], description=self.ROLES['editor'])
+        self.permissions.define_role('admin', superuser=True, description=self.ROLES['admin'])
+
+    @property
+    def user_roles(self):
+        """username -> role mapping (built on demand from the permission engine)."""
+        return self.permissions.user_roles()
+
+    def define_role(self, role, permissions=(), inherits=(), description=''):
+        """Define a custom role, optionally inheriting other roles' permissions."""
+        self.permissions.define_role(role, permissions, inherits, description=description)
+        return {"message": f"Role '{role}' defined."}
 
     def assign_role(self, username, role):
         """Assign a role to a user."""
-        if role not in self.ROLES:
-            raise ValueError("Invalid role specified.")
-        self.user_roles[username] = role
+        self.permissions.assign_role(username, role)
         return {"message": f"Role '{role}' assigned to user '{username}'."}
 
     def get_user_role(self, username):
         """Get the role of a user."""
-        return self.user_roles.get(username, "No role assigned")
+        return self.permissions.get_user_role(username) or "No role assigned"
 
     def has_permission(self, username, permission):
         """Check if a user has a specific permission."""
-        role = self.get_user_role(username)
-        if role == 'admin':
-            return True  # Admin has all permissions
-        elif role == 'editor' and permission in ['edit', 'view']:
-            return True
-        elif role == 'viewer' and permission == 'view':
-            return True
-        return False
+        return self.permissions.has_permission(username, permission)
+
+    def users_with_permission(self, usernames, permission):
+        """Return the users in usernames that have a specific permission."""
+        return self.permissions.users_with_permission(usernames, permission)
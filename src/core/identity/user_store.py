@@ -0,0 +1,339 @@
+# src/core/identity/user_store.py
+
+import logging
+import queue
+import sqlite3
+import threading
+import numpy as np
+from contextlib import contextmanager
+from .permissions import NO_ROLE, RoleTable
+
+class UserStore:
+    """Storage backend interface for IdentityManager user records.
+
+    A record is a dict with "password_hash", "verified" and "role" keys.
+    add/add_many never overwrite an existing user, so the duplicate check
+    and the insert are one atomic step.
+    """
+
+    slot_index = None  # username -> slot mapping other components may share, if the backend keeps one
+    role_table = None  # RoleTable behind per-slot role ids (role_ids) the permission engine may read, if kept
+    shared = False  # True if other processes may change users, so roles must be read per check
+
+    def get(self, username):
+        """Record for a user, or None."""
+        raise NotImplementedError
+
+    def add(self, username, record) -> bool:
+        """Insert a new user. Returns False if the username is taken."""
+        raise NotImplementedError
+
+    def add_many(self, records) -> set:
+        """Insert many (username, record) pairs. Returns the usernames actually inserted."""
+        return {username for username, record in records if self.add(username, record)}
+
+    def update(self, username, **fields) -> bool:
+        """Update fields of an existing user. Returns False if the user does not exist."""
+        raise NotImplementedError
+
+    def get_many(self, usernames) -> dict:
+        """username -> record for the usernames that exist."""
+        records = {}
+        for username in usernames:
+            record = self.get(username)
+            if record is not None:
+                records[username] = record
+        return records
+
+    def get_role(self, username):
+        """Role of a user, or None."""
+        record = self.get(username)
+        return record["role"] if record is not None else None
+
+    def get_roles(self, usernames) -> dict:
+        """username -> role for the usernames that exist."""
+        return {username: record["role"] for username, record in self.get_many(usernames).items()}
+
+    def role_assignments(self):
+        """Iterate (username, role) for users with a role."""
+        raise NotImplementedError
+
+    def add_revocation(self, revocation_id, exp: float):
+        """Record a revoked token id until exp (shared stores only)."""
+        raise NotImplementedError
+
+    def is_revoked(self, revocation_id) -> bool:
+        """True if a token id has been revoked (shared stores only)."""
+        raise NotImplementedError
+
+    def prune_revocations(self, now: float) -> int:
+        """Drop revocations that expired by now. Returns how many were dropped (shared stores only)."""
+        raise NotImplementedError
+
+    def __contains__(self, username) -> bool:
+        return self.get(username) is not None
+
+    def close(self):
+        pass
+
+class InMemoryUserStore(UserStore):
+    """Process-local store (the default) in parallel NumPy arrays.
+
+    Users map to slots through one username -> slot dict; password hashes
+    live in a fixed-width byte matrix, roles as small interned integers
+    and verification as one bool per slot, which takes about 40% less
+    memory than a dict per user (benchmarks/bench_identity_memory.py).
+    Hashes longer than hash_width are kept in a side dict. Slots are never
+    reused, so UserRoles reads slot_index, role_table and role_ids directly
+    instead of keeping a second copy of each user's role.
+    """
+
+    def __init__(self, initial_capacity: int = 1024, hash_width: int = 104):
+        self.hash_width = hash_width
+        self.slot_index = {}  # username -> slot
+        self._hashes = np.zeros((initial_capacity, hash_width), dtype=np.uint8)
+        self._hash_lengths = np.zeros(initial_capacity, dtype=np.uint16)
+        self._verified = np.zeros(initial_capacity, dtype=bool)
+        self._role_ids = np.full(initial_capacity, NO_ROLE, dtype=np.int16)
+        self._overflow_hashes = {}  # slot -> hash longer than hash_width
+        self.role_table = RoleTable()
+        self._lock = threading.Lock()
+
+    @property
+    def role_ids(self) -> np.ndarray:
+        """slot -> interned role id (NO_ROLE for none); replaced by a larger array as the store grows."""
+        return self._role_ids
+
+    def __len__(self):
+        return len(self.slot_index)
+
+    def __contains__(self, username) -> bool:
+        return username in self.slot_index
+
+    def _grow(self, capacity):
+        def grown(array, fill):
+            new = np.full((capacity,) + array.shape[1:], fill, dtype=array.dtype)
+            new[:len(array)] = array
+            return new
+        self._hashes = grown(self._hashes, 0)
+        self._hash_lengths = grown(self._hash_lengths, 0)
+        self._verified = grown(self._verified, False)
+        self._role_ids = grown(self._role_ids, NO_ROLE)
+
+    def _set_hash(self, slot, password_hash):
+        if len(password_hash) > self.hash_width:
+            self._overflow_hashes[slot] = bytes(password_hash)
+            self._hash_lengths[slot] = 0
+        else:
+            self._overflow_hashes.pop(slot, None)
+            self._hashes[slot, :len(password_hash)] = np.frombuffer(password_hash, dtype=np.uint8)
+            self._hash_lengths[slot] = len(password_hash)
+
+    def _record(self, slot):
+        password_hash = self._overflow_hashes.get(slot)
+        if password_hash is None:
+            password_hash = self._hashes[slot, :self._hash_lengths[slot]].tobytes()
+        role_id = self._role_ids[slot]
+        return {"password_hash": password_hash, "verified": bool(self._verified[slot]),
+                "role": self.role_table.name(role_id)}
+
+    def get(self, username):
+        slot = self.slot_index.get(username)
+        return self._record(slot) if slot is not None else None
+
+    def add(self, username, record) -> bool:
+        with self._lock:
+            if username in self.slot_index:
+                return False
+            slot = len(self.slot_index)
+            if slot == len(self._verified):
+                self._grow(2 * slot)
+            self._set_hash(slot, record["password_hash"])
+            self._verified[slot] = record.get("verified", False)
+            self._role_ids[slot] = self.role_table.intern(record.get("role"))
+            self.slot_index[username] = slot  # Published last, once the slot is filled
+            return True
+
+    def update(self, username, **fields) -> bool:
+        unknown = set(fields) - {"password_hash", "verified", "role"}
+        if unknown:
+            raise ValueError(f"Unknown user fields: {sorted(unknown)}")
+        with self._lock:
+            slot = self.slot_index.get(username)
+            if slot is None:
+                return False
+            if "password_hash" in fields:
+                self._set_hash(slot, fields["password_hash"])
+            if "verified" in fields:
+                self._verified[slot] = fields["verified"]
+            if "role" in fields:
+                self._role_ids[slot] = self.role_table.intern(fields["role"])
+            return True
+
+    def role_assignments(self):
+        return [(username, self.role_table.name(self._role_ids[slot]))
+                for username, slot in list(self.slot_index.items()) if self._role_ids[slot] != NO_ROLE]
+
+class SQLiteUserStore(UserStore):
+    """SQLite-backed store shared by every process that opens the same file.
+
+    Users live in a WITHOUT ROWID table keyed by username, so lookups are a
+    single primary-key B-tree probe. Connections are pooled and each keeps
+    its compiled statements in sqlite3's statement cache; the SQL below is
+    fixed text with parameters, so every call reuses a prepared statement.
+    WAL journaling lets readers in other processes proceed during writes.
+    """
+
+    _SCHEMA = ("CREATE TABLE IF NOT EXISTS users ("
+               "username TEXT PRIMARY KEY, password_hash BLOB NOT NULL, "
+               "verified INTEGER NOT NULL DEFAULT 0, role TEXT) WITHOUT ROWID")
+    _SELECT = "SELECT password_hash, verified, role FROM users WHERE username = ?"
+    _INSERT = "INSERT OR IGNORE INTO users (username, password_hash, verified, role) VALUES (?, ?, ?, ?)"
+    _SELECT_ROLE = "SELECT role FROM users WHERE username = ?"
+    _SELECT_ROLES = "SELECT username, role FROM users WHERE role IS NOT NULL"
+    _REVOCATIONS_SCHEMA = ("CREATE TABLE IF NOT EXISTS revocations ("
+                           "id TEXT PRIMARY KEY, exp REAL NOT NULL) WITHOUT ROWID")
+    _INSERT_REVOCATION = "INSERT OR REPLACE INTO revocations (id, exp) VALUES (?, ?)"
+    _SELECT_REVOCATION = "SELECT 1 FROM revocations WHERE id = ?"
+    _PRUNE_REVOCATIONS = "DELETE FROM revocations WHERE exp <= ?"
+    _COLUMNS = ("password_hash", "verified", "role")
+    _BATCH_SIZE = 500  # Rows per IN (...) lookup, below SQLite's bound-parameter limit
+    shared = True
+
+    def __init__(self, path: str = 'identity.db', pool_size: int = 4, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._pool = queue.LifoQueue()
+        for _ in range(pool_size):
+            self._pool.put(self._connect())
+        with self._connection() as conn:
+            conn.execute(self._SCHEMA)
+            conn.execute(self._REVOCATIONS_SCHEMA)
+        logging.info("SQLiteUserStore opened at %s with %d pooled connections.", path, pool_size)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False,
+                               isolation_level=None, cached_statements=64)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    @contextmanager
+    def _transaction(self):
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    @staticmethod
+    def _record(row):
+        password_hash, verified, role = row
+        return {"password_hash": bytes(password_hash), "verified": bool(verified), "role": role}
+
+    @staticmethod
+    def _row(username, record):
+        return (username, record["password_hash"], int(record.get("verified", False)), record.get("role"))
+
+    def get(self, username):
+        with self._connection() as conn:
+            row = conn.execute(self._SELECT, (username,)).fetchone()
+        return self._record(row) if row is not None else None
+
+    def get_role(self, username):
+        with self._connection() as conn:
+            row = conn.execute(self._SELECT_ROLE, (username,)).fetchone()
+        return row[0] if row is not None else None
+
+    def get_roles(self, usernames) -> dict:
+        usernames = list(dict.fromkeys(usernames))
+        roles = {}
+        with self._connection() as conn:
+            for start in range(0, len(usernames), self._BATCH_SIZE):
+                chunk = usernames[start:start + self._BATCH_SIZE]
+                query = "SELECT username, role FROM users WHERE username IN (%s)" % ",".join("?" * len(chunk))
+                roles.update(conn.execute(query, chunk).fetchall())
+        return roles
+
+    def get_many(self, usernames) -> dict:
+        usernames = list(dict.fromkeys(usernames))
+        records = {}
+        with self._connection() as conn:
+            for start in range(0, len(usernames), self._BATCH_SIZE):
+                chunk = usernames[start:start + self._BATCH_SIZE]
+                query = ("SELECT username, password_hash, verified, role FROM users WHERE username IN (%s)"
+                         % ",".join("?" * len(chunk)))
+                for row in conn.execute(query, chunk):
+                    records[row[0]] = self._record(row[1:])
+        return records
+
+    def add(self, username, record) -> bool:
+        with self._connection() as conn:
+            return conn.execute(self._INSERT, self._row(username, record)).rowcount == 1
+
+    def add_many(self, records) -> set:
+        """Insert many users in one write transaction; existing usernames are left untouched."""
+        records = list(records)
+        inserted = set()
+        with self._transaction() as conn:
+            for start in range(0, len(records), self._BATCH_SIZE):
+                chunk = records[start:start + self._BATCH_SIZE]
+                query = "SELECT username FROM users WHERE username IN (%s)" % ",".join("?" * len(chunk))
+                existing = {row[0] for row in conn.execute(query, [username for username, _ in chunk])}
+                rows = []
+                for username, record in chunk:
+                    if username not in existing and username not in inserted:
+                        inserted.add(username)
+                        rows.append(self._row(username, record))
+                conn.executemany(self._INSERT, rows)
+        logging.info("Inserted %d of %d users in batch.", len(inserted), len(records))
+        return inserted
+
+    def update(self, username, **fields) -> bool:
+        unknown = set(fields) - set(self._COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown user fields: {sorted(unknown)}")
+        if "verified" in fields:
+            fields["verified"] = int(fields["verified"])
+        columns = [column for column in self._COLUMNS if column in fields]
+        query = "UPDATE users SET %s WHERE username = ?" % ", ".join(f"{column} = ?" for column in columns)
+        with self._connection() as conn:
+            return conn.execute(query, [fields[column] for column in columns] + [username]).rowcount == 1
+
+    def role_assignments(self):
+        with self._connection() as conn:
+            return conn.execute(self._SELECT_ROLES).fetchall()
+
+    def add_revocation(self, revocation_id, exp: float):
+        with self._connection() as conn:
+            conn.execute(self._INSERT_REVOCATION, (revocation_id, exp))
+
+    def is_revoked(self, revocation_id) -> bool:
+        with self._connection() as conn:
+            return conn.execute(self._SELECT_REVOCATION, (revocation_id,)).fetchone() is not None
+
+    def prune_revocations(self, now: float) -> int:
+        with self._connection() as conn:
+            return conn.execute(self._PRUNE_REVOCATIONS, (now,)).rowcount
+
+    def __len__(self):
+        with self._connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
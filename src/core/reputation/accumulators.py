@@ -0,0 +1,119 @@
+# reputation/accumulators.py
+
+import math
+import time
+
+class Accumulator:
+    """Base class for per-entity running-state score accumulators."""
+    __slots__ = ()
+
+    def update(self, signal, value: float, ts: float = None):
+        """Fold one observation into the running state."""
+        raise NotImplementedError("Subclasses should implement this method.")
+
+    def score(self) -> float:
+        """Return the score implied by the running state."""
+        raise NotImplementedError("Subclasses should implement this method.")
+
+    def reference_time(self):
+        """Time the score refers to, or None if it does not depend on time."""
+        return None
+
+    def state(self) -> tuple:
+        """Running state as two floats, for persistence."""
+        raise NotImplementedError("Subclasses should implement this method.")
+
+    def load_state(self, state):
+        """Restore running state produced by state()."""
+        raise NotImplementedError("Subclasses should implement this method.")
+
+    def seed(self, score: float, ts: float = None):
+        """Start from an existing score whose running state is unknown (e.g. loaded from CSV)."""
+        raise NotImplementedError("Subclasses should implement this method.")
+
+class AverageAccumulator(Accumulator):
+    """Running count and sum, matching SimpleAverageScore."""
+    __slots__ = ('count', 'total')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+
+    def update(self, signal, value: float, ts: float = None):
+        self.count += 1
+        self.total += value
+
+    def score(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def state(self) -> tuple:
+        return (float(self.count), self.total)
+
+    def load_state(self, state):
+        self.count, self.total = int(state[0]), float(state[1])
+
+    def seed(self, score: float, ts: float = None):
+        self.count, self.total = 1, score  # The prior score counts as one observation
+
+class WeightedAccumulator(Accumulator):
+    """Running weighted sum, matching WeightedScore."""
+    __slots__ = ('weights', 'total')
+
+    def __init__(self, weights: dict = None):
+        self.weights = weights
+        self.total = 0.0
+
+    def update(self, signal, value: float, ts: float = None):
+        weight = 1 if self.weights is None else self.weights.get(signal, 0)
+        self.total += value * weight
+
+    def score(self) -> float:
+        return self.total
+
+    def state(self) -> tuple:
+        return (self.total, 0.0)
+
+    def load_state(self, state):
+        self.total = float(state[0])
+
+    def seed(self, score: float, ts: float = None):
+        self.total = score
+
+class DecayAccumulator(Accumulator):
+    """Exponentially time-decayed running sum, as of the latest observation time."""
+    __slots__ = ('decay_rate', 'total', 'last_ts')
+
+    def __init__(self, decay_rate: float):
+        self.decay_rate = decay_rate
+        self.total = 0.0
+        self.last_ts = None
+
+    def update(self, signal, value: float, ts: float = None):
+        if ts is None:
+            ts = time.time()
+        if self.last_ts is None:
+            self.total += value
+            self.last_ts = ts
+        elif ts >= self.last_ts:
+            self.total = self.total * math.exp(-self.decay_rate * (ts - self.last_ts)) + value
+            self.last_ts = ts
+        else:
+            # Late event: decay it to the current reference time instead of rewinding.
+            self.total += value * math.exp(-self.decay_rate * (self.last_ts - ts))
+
+    def score(self) -> float:
+        return self.total
+
+    def reference_time(self):
+        return self.last_ts
+
+    def state(self) -> tuple:
+        return (self.total, math.nan if self.last_ts is None else self.last_ts)
+
+    def load_state(self, state):
+        self.total = float(state[0])
+        self.last_ts = None if math.isnan(state[1]) else float(state[1])
+
+    def seed(self, score: float, ts: float = None):
+        self.total = score
+        self.last_ts = ts
@@ -0,0 +1,77 @@
+# reputation/parallel.py
+
+import itertools
+import logging
+import threading
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+
+EXECUTOR_TYPES = {
+    'process': ProcessPoolExecutor,  # CPU-bound pure-Python scoring functions
+    'thread': ThreadPoolExecutor,  # Scoring functions that release the GIL (NumPy, I/O)
+}
+
+def create_executor(kind: str, max_workers: int = None):
+    """Create a process or thread pool for parallel scoring."""
+    if kind not in EXECUTOR_TYPES:
+        logging.error("Unsupported executor type: %s", kind)
+        raise ValueError(f"Unsupported executor type: {kind}. Use one of {sorted(EXECUTOR_TYPES)}.")
+    return EXECUTOR_TYPES[kind](max_workers=max_workers)
+
+def _score_chunk(algorithm, items):
+    """Score one chunk of (entity, data) pairs; failures yield None for that entity only."""
+    scores = []
+    for entity, data in items:
+        try:
+            scores.append(algorithm.calculate_score(data))
+        except Exception as e:
+            logging.error("Error scoring entity %s: %s", entity, str(e))
+            scores.append(None)
+    return scores
+
+def score_in_parallel(algorithm, items, executor, chunk_size: int = 256) -> list:
+    """Score (entity, data) pairs across an executor in chunks; results follow input order.
+
+    For process pools the algorithm (including any custom scoring function)
+    must be picklable, i.e. defined at module level rather than as a lambda.
+    """
+    items = list(items)
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    scores = []
+    for chunk_scores in executor.map(_score_chunk, itertools.repeat(algorithm), chunks):
+        scores.extend(chunk_scores)
+    return scores
+
+class ScoringPool:
+    """A scoring executor that is replaced after a worker crash.
+
+    A process pool whose worker dies stays broken for good. score()
+    recreates the executor and retries once before re-raising, so one
+    crash does not disable parallel scoring for every later call or for
+    every shard sharing the pool.
+    """
+
+    def __init__(self, kind: str, max_workers: int = None):
+        self.kind = kind
+        self.max_workers = max_workers
+        self.executor = create_executor(kind, max_workers)
+        self._lock = threading.Lock()
+
+    def score(self, algorithm, items, chunk_size: int = 256) -> list:
+        """score_in_parallel on the current executor, recreating it once if it is broken."""
+        items = list(items)
+        executor = self.executor
+        try:
+            return score_in_parallel(algorithm, items, executor, chunk_size)
+        except BrokenExecutor as e:
+            logging.warning("Scoring pool broken, recreating it: %s", str(e))
+            return score_in_parallel(algorithm, items, self._replace(executor), chunk_size)
+
+    def _replace(self, broken):
+        with self._lock:
+            if self.executor is broken:  # Another caller may have replaced it already
+                self.executor = create_executor(self.kind, self.max_workers)
+                broken.shutdown(wait=False)
+            return self.executor
+
+    def shutdown(self):
+        self.executor.shutdown()
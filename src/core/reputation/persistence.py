@@ -0,0 +1,367 @@
+# reputation/persistence.py
+
+import glob
+import json
+import logging
+import os
+import shutil
+import struct
+import threading
+import zlib
+import numpy as np
+
+MANIFEST = 'MANIFEST.json'
+SNAPSHOT_META = 'meta.json'  # Written last, so it marks a directory as a complete snapshot
+
+OP_PUT = 1
+OP_REMOVE = 2
+OP_SCALE = 3
+OP_PUT_STREAM = 4  # A put from streaming ingest; the payload starts with the accumulator state
+
+# crc32, then op, payload length and value; the payload follows the header.
+# The CRC covers everything after itself, so torn or partial writes are detected.
+_RECORD_CRC = struct.Struct('<I')
+_RECORD_BODY = struct.Struct('<BId')
+_RECORD_HEADER_SIZE = _RECORD_CRC.size + _RECORD_BODY.size
+_STREAM_STATE = struct.Struct('<dd')
+
+def _encode_entity(entity) -> bytes:
+    if not isinstance(entity, str):
+        raise TypeError(f"Persisted entities must be strings, got {type(entity).__name__}.")
+    return entity.encode('utf-8')
+
+def fsync_directory(path: str):
+    """Make entries created, renamed or removed in a directory durable."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _write_durable(path: str, write):
+    """Create a file with write(f) and fsync it before returning."""
+    with open(path, 'wb') as f:
+        write(f)
+        f.flush()
+        os.fsync(f.fileno())
+
+def write_snapshot(path: str, entities, scores, metadata: dict = None, streams: dict = None):
+    """Write a columnar binary snapshot directory atomically and durably.
+
+    Layout: scores.npy (float64), offsets.npy (int64 byte offsets into
+    entities.bin, n + 1 entries), entities.bin (concatenated UTF-8) and
+    meta.json. With streams (entity -> accumulator state pair), it also
+    holds stream_states.npy (n x 2 float64) and stream_mask.npy marking
+    the entities that have one. The directory is written under a temporary name, every
+    file and the directory are fsynced, and it is then renamed into place
+    with the parent directory fsynced, so once this returns a power loss
+    cannot leave a truncated snapshot under the final name.
+
+    An existing directory at path is only replaced if it is a snapshot
+    (it has meta.json); anything else raises ValueError. The old snapshot
+    is renamed to path + '.old' before the new one moves into place and
+    deleted afterwards, and read_snapshot falls back to it, so a crash
+    between the renames still leaves one complete snapshot.
+    """
+    if os.path.exists(path) and not os.path.exists(os.path.join(path, SNAPSHOT_META)):
+        logging.error("Refusing to overwrite %s: it is not a snapshot directory.", path)
+        raise ValueError(f"Refusing to overwrite {path}: it exists and is not a snapshot directory.")
+    encoded = [_encode_entity(entity) for entity in entities]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    tmp_path = path + '.tmp'
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    _write_durable(os.path.join(tmp_path, 'scores.npy'), lambda f: np.save(f, np.asarray(scores, dtype=np.float64)))
+    _write_durable(os.path.join(tmp_path, 'offsets.npy'), lambda f: np.save(f, offsets))
+    _write_durable(os.path.join(tmp_path, 'entities.bin'), lambda f: f.write(b''.join(encoded)))
+    if streams:
+        states = np.zeros((len(encoded), 2), dtype=np.float64)
+        mask = np.zeros(len(encoded), dtype=bool)
+        for i, entity in enumerate(entities):
+            state = streams.get(entity)
+            if state is not None:
+                states[i] = state
+                mask[i] = True
+        _write_durable(os.path.join(tmp_path, 'stream_states.npy'), lambda f: np.save(f, states))
+        _write_durable(os.path.join(tmp_path, 'stream_mask.npy'), lambda f: np.save(f, mask))
+    _write_durable(os.path.join(tmp_path, SNAPSHOT_META),
+                   lambda f: f.write(json.dumps(dict(metadata or {}, count=len(encoded))).encode('utf-8')))
+    fsync_directory(tmp_path)
+    old_path = path + '.old'
+    parent = os.path.dirname(os.path.abspath(path))
+    if os.path.exists(path):
+        shutil.rmtree(old_path, ignore_errors=True)
+        os.rename(path, old_path)
+    os.rename(tmp_path, path)
+    fsync_directory(parent)
+    shutil.rmtree(old_path, ignore_errors=True)
+    logging.info("Snapshot of %d entities written to %s.", len(encoded), path)
+
+def read_snapshot(path: str, mmap: bool = True):
+    """Read a snapshot directory. Returns (entities, scores, metadata); scores are memory-mapped by default."""
+    if not os.path.exists(path) and os.path.exists(path + '.old'):
+        path = path + '.old'  # Interrupted between write_snapshot's renames
+    mmap_mode = 'r' if mmap else None
+    scores = np.load(os.path.join(path, 'scores.npy'), mmap_mode=mmap_mode)
+    offsets = np.load(os.path.join(path, 'offsets.npy')).tolist()
+    with open(os.path.join(path, 'entities.bin'), 'rb') as f:
+        blob = f.read()
+    with open(os.path.join(path, SNAPSHOT_META), 'r') as f:
+        metadata = json.load(f)
+    text = blob.decode('utf-8')
+    if len(text) == len(blob):
+        # ASCII-only: byte offsets are character offsets, so slice the decoded text directly.
+        entities = [text[start:end] for start, end in zip(offsets, offsets[1:])]
+    else:
+        entities = [blob[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+    return entities, scores, metadata
+
+def read_stream_states(path: str, entities) -> dict:
+    """entity -> accumulator state pair stored in a snapshot ({} for snapshots without streams)."""
+    states_path = os.path.join(path, 'stream_states.npy')
+    if not os.path.exists(states_path):
+        return {}
+    states = np.load(states_path)
+    mask = np.load(os.path.join(path, 'stream_mask.npy'))
+    return {entities[i]: tuple(states[i]) for i in np.flatnonzero(mask)}
+
+class WriteAheadLog:
+    """Append-only log of score operations with a CRC per record."""
+
+    def __init__(self, path: str, fsync: bool = False):
+        self.path = path
+        self.fsync = fsync
+        self._file = open(path, 'ab')
+
+    @property
+    def size(self) -> int:
+        """Bytes written to the log so far."""
+        return self._file.tell()
+
+    @staticmethod
+    def _encode(op: int, value: float, payload: bytes) -> bytes:
+        body = _RECORD_BODY.pack(op, len(payload), value)
+        crc = zlib.crc32(payload, zlib.crc32(body))
+        return _RECORD_CRC.pack(crc) + body + payload
+
+    def _write(self, data: bytes):
+        self._file.write(data)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _append(self, op: int, value: float, payload: bytes):
+        self._write(self._encode(op, value, payload))
+
+    def append_many(self, records):
+        """Append (op, value, payload) records with one write, flush and fsync for the whole batch."""
+        self._write(b''.join(self._encode(op, value, payload) for op, value, payload in records))
+
+    def append_put(self, entity, score: float):
+        self._append(OP_PUT, score, _encode_entity(entity))
+
+    def append_puts(self, entities, scores):
+        """Append one put record per (entity, score) pair as a single batch."""
+        self.append_many((OP_PUT, float(score), _encode_entity(entity)) for entity, score in zip(entities, scores))
+
+    def append_put_stream(self, entity, score: float, state):
+        """Append a put from streaming ingest together with the entity's accumulator state."""
+        self._append(OP_PUT_STREAM, score, _STREAM_STATE.pack(*state) + _encode_entity(entity))
+
+    def append_remove(self, entity):
+        self._append(OP_REMOVE, 0.0, _encode_entity(entity))
+
+    def append_scale(self, factor: float, epoch: float):
+        self._append(OP_SCALE, factor, struct.pack('<d', epoch))
+
+    def close(self):
+        self._file.close()
+
+    @staticmethod
+    def read_records(path: str):
+        """Return ([(op, key, value), ...], valid_length), stopping at the first torn or corrupt record.
+
+        key is the entity, the new epoch for OP_SCALE, or (entity, state) for OP_PUT_STREAM.
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        records = []
+        position = 0
+        while position + _RECORD_HEADER_SIZE <= len(data):
+            (crc,) = _RECORD_CRC.unpack_from(data, position)
+            op, length, value = _RECORD_BODY.unpack_from(data, position + _RECORD_CRC.size)
+            start = position + _RECORD_HEADER_SIZE
+            payload = data[start:start + length]
+            if len(payload) < length or zlib.crc32(payload, zlib.crc32(data[position + _RECORD_CRC.size:start])) != crc:
+                break
+            if op == OP_SCALE:
+                records.append((op, struct.unpack('<d', payload)[0], value))
+            elif op == OP_PUT_STREAM:
+                state = _STREAM_STATE.unpack_from(payload)
+                records.append((op, (payload[_STREAM_STATE.size:].decode('utf-8'), state), value))
+            else:
+                records.append((op, payload.decode('utf-8'), value))
+            position = start + length
+        if position < len(data):
+            logging.warning("Ignoring %d bytes of torn or corrupt WAL data in %s.", len(data) - position, path)
+        return records, position
+
+class ScorePersistence:
+    """Snapshot + write-ahead-log persistence for a ScoreStore.
+
+    The directory holds numbered snapshot directories, numbered WAL files
+    and a MANIFEST naming the current snapshot and the first WAL to replay
+    on top of it. Compaction rotates the WAL, copies the live arrays and
+    writes the next snapshot on a background thread; the manifest is
+    replaced atomically, so a crash at any point recovers from either the
+    old or the new snapshot. Recovery cost is one snapshot load plus the
+    WAL written since the last compaction.
+    """
+
+    def __init__(self, directory: str, compact_bytes: int = 64 * 1024 * 1024, fsync: bool = False):
+        self.directory = directory
+        self.compact_bytes = compact_bytes  # WAL size that triggers background compaction
+        self.fsync = fsync
+        self.wal = None
+        self._wal_seq = 0
+        self._lock = threading.Lock()
+        self._compaction = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _read_manifest(self):
+        path = self._path(MANIFEST)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r') as f:
+            return json.load(f)
+
+    def _write_manifest(self, snapshot_seq: int, wal_seq: int):
+        tmp_path = self._path(MANIFEST + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'snapshot': snapshot_seq, 'wal': wal_seq}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path(MANIFEST))
+        fsync_directory(self.directory)
+
+    def _wal_files(self, first_seq: int):
+        """Existing WAL paths with sequence >= first_seq, in order."""
+        found = []
+        for path in glob.glob(self._path('wal-*.log')):
+            seq = int(os.path.basename(path)[4:-4])
+            if seq >= first_seq:
+                found.append((seq, path))
+        return sorted(found)
+
+    def has_state(self) -> bool:
+        """True when the directory already holds a manifest to recover from."""
+        return self._read_manifest() is not None
+
+    def recover(self):
+        """Load the current snapshot, replay the WAL after it and open the log for appends.
+
+        Returns (entities, scores, metadata, streams, records), where streams
+        maps entity -> accumulator state from the snapshot and records is the
+        replayed WAL as (op, key, value) tuples to apply in order.
+        """
+        manifest = self._read_manifest()
+        if manifest is None:
+            raise FileNotFoundError(f"No manifest in {self.directory}.")
+        snapshot_path = self._path(f"snapshot-{manifest['snapshot']:06d}")
+        entities, scores, metadata = read_snapshot(snapshot_path)
+        streams = read_stream_states(snapshot_path, entities)
+        records = []
+        wal_seq = manifest['wal']
+        for seq, path in self._wal_files(manifest['wal']):
+            wal_records, valid_length = WriteAheadLog.read_records(path)
+            records.extend(wal_records)
+            if valid_length < os.path.getsize(path):
+                with open(path, 'r+b') as f:
+                    f.truncate(valid_length)
+            wal_seq = seq
+        self._open_wal(wal_seq)
+        logging.info("Recovered %d entities and %d WAL records from %s.", len(entities), len(records), self.directory)
+        return entities, scores, metadata, streams, records
+
+    def initialize(self, entities, scores, metadata: dict = None):
+        """Start a fresh directory from the given state: snapshot 0 plus an empty WAL."""
+        write_snapshot(self._path('snapshot-000000'), entities, scores, metadata)
+        self._write_manifest(0, 0)
+        self._open_wal(0)
+
+    def _open_wal(self, seq: int):
+        if self.wal is not None:
+            self.wal.close()
+        self._wal_seq = seq
+        self.wal = WriteAheadLog(self._path(f"wal-{seq:06d}.log"), fsync=self.fsync)
+        if self.fsync:
+            fsync_directory(self.directory)  # The new log's directory entry must survive too
+
+    def log_put(self, entity, score: float):
+        self.wal.append_put(entity, score)
+
+    def log_puts(self, entities, scores):
+        self.wal.append_puts(entities, scores)
+
+    def log_put_stream(self, entity, score: float, state):
+        self.wal.append_put_stream(entity, score, state)
+
+    def log_remove(self, entity):
+        self.wal.append_remove(entity)
+
+    def log_scale(self, factor: float, epoch: float):
+        self.wal.append_scale(factor, epoch)
+
+    def should_compact(self) -> bool:
+        """True when the WAL has outgrown compact_bytes and no compaction is running."""
+        return self.wal.size >= self.compact_bytes and not self.compacting
+
+    @property
+    def compacting(self) -> bool:
+        return self._compaction is not None and self._compaction.is_alive()
+
+    def compact(self, entities, scores, metadata: dict = None, background: bool = True, streams: dict = None):
+        """Snapshot the given state and drop the WAL it supersedes.
+
+        entities/scores/streams must be copies the caller will not mutate. The WAL
+        is rotated before returning, so writes made after this call land in
+        the new log and are replayed on top of the new snapshot.
+        """
+        with self._lock:
+            if self.compacting:
+                self._compaction.join()
+            snapshot_seq = self._wal_seq + 1
+            self._open_wal(snapshot_seq)
+            args = (snapshot_seq, entities, scores, metadata, streams)
+            if background:
+                self._compaction = threading.Thread(target=self._write_compaction, args=args, daemon=True)
+                self._compaction.start()
+            else:
+                self._write_compaction(*args)
+
+    def _write_compaction(self, snapshot_seq: int, entities, scores, metadata, streams=None):
+        try:
+            previous = self._read_manifest()
+            write_snapshot(self._path(f"snapshot-{snapshot_seq:06d}"), entities, scores, metadata, streams)
+            self._write_manifest(snapshot_seq, snapshot_seq)  # Durable before anything it supersedes is removed
+            for seq, path in self._wal_files(0):
+                if seq < snapshot_seq:
+                    os.remove(path)
+            if previous is not None and previous['snapshot'] != snapshot_seq:
+                shutil.rmtree(self._path(f"snapshot-{previous['snapshot']:06d}"), ignore_errors=True)
+            fsync_directory(self.directory)
+            logging.info("Compaction to snapshot %d completed.", snapshot_seq)
+        except Exception as e:
+            logging.error("Error compacting %s: %s", self.directory, str(e))
+
+    def close(self):
+        """Wait for any running compaction and close the WAL."""
+        if self._compaction is not None:
+            self._compaction.join()
+        if self.wal is not None:
+            self.wal.close()
+            self.wal = None
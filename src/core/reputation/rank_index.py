@@ -0,0 +1,169 @@
+# reputation/rank_index.py
+
+import math
+from bisect import bisect_left, insort
+from itertools import accumulate
+
+class RankIndex:
+    """Order-statistics index over entity scores.
+
+    Keys are (score, entity) tuples kept in a list of sorted blocks, each
+    holding at most 2 * load keys, plus the max key of every block. Inserts
+    and removals bisect to a block and shift within it; rank and range
+    queries bisect the block maxima and use cumulative block offsets,
+    which are rebuilt lazily after writes.
+    """
+
+    def __init__(self, load: int = 1000):
+        self._load = load
+        self._blocks = []  # sorted lists of (score, entity)
+        self._maxes = []  # last key of each block
+        self._offsets = None  # cumulative block sizes, None when stale
+        self._scores = {}  # entity -> indexed score
+
+    def __len__(self):
+        return len(self._scores)
+
+    def __contains__(self, entity):
+        return entity in self._scores
+
+    @classmethod
+    def from_items(cls, entities, scores, load: int = 1000):
+        """Build an index in one sort from parallel entity and score sequences."""
+        index = cls(load)
+        index._scores = dict(zip(entities, map(float, scores)))
+        keys = sorted((score, entity) for entity, score in index._scores.items())
+        index._blocks = [keys[i:i + load] for i in range(0, len(keys), load)]
+        index._maxes = [block[-1] for block in index._blocks]
+        return index
+
+    def _block_offsets(self):
+        if self._offsets is None:
+            self._offsets = [0, *accumulate(len(block) for block in self._blocks)]
+        return self._offsets
+
+    def _insert_key(self, key):
+        self._offsets = None
+        if not self._blocks:
+            self._blocks.append([key])
+            self._maxes.append(key)
+            return
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            i -= 1
+        block = self._blocks[i]
+        insort(block, key)
+        self._maxes[i] = block[-1]
+        if len(block) > 2 * self._load:
+            self._blocks[i:i + 1] = [block[:self._load], block[self._load:]]
+            self._maxes[i:i + 1] = [self._blocks[i][-1], self._blocks[i + 1][-1]]
+
+    def _remove_key(self, key):
+        self._offsets = None
+        i = bisect_left(self._maxes, key)
+        block = self._blocks[i]
+        del block[bisect_left(block, key)]
+        if block:
+            self._maxes[i] = block[-1]
+        else:
+            del self._blocks[i]
+            del self._maxes[i]
+
+    def _count_below(self, key) -> int:
+        """Number of indexed keys strictly less than key."""
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return len(self)
+        return self._block_offsets()[i] + bisect_left(self._blocks[i], key)
+
+    def _count_at_most(self, score: float) -> int:
+        """Number of indexed scores <= score."""
+        return self._count_below((math.nextafter(score, math.inf),))
+
+    def insert(self, entity, score: float):
+        """Index an entity, replacing its previous score if present."""
+        score = float(score)
+        previous = self._scores.get(entity)
+        if previous is not None:
+            if previous == score:
+                return
+            self._remove_key((previous, entity))
+        self._scores[entity] = score
+        self._insert_key((score, entity))
+
+    def remove(self, entity) -> bool:
+        """Drop an entity from the index. Returns False if it was not indexed."""
+        score = self._scores.pop(entity, None)
+        if score is None:
+            return False
+        self._remove_key((score, entity))
+        return True
+
+    def scale(self, factor: float):
+        """Multiply every indexed score by a positive factor; ordering is unchanged."""
+        self._scores = {entity: score * factor for entity, score in self._scores.items()}
+        self._blocks = [[(score * factor, entity) for score, entity in block] for block in self._blocks]
+        self._maxes = [block[-1] for block in self._blocks]
+
+    def score_of(self, entity):
+        """Indexed score for an entity, or None."""
+        return self._scores.get(entity)
+
+    def top_k(self, k: int):
+        """Return up to k (entity, score) pairs, highest score first, in O(k)."""
+        result = []
+        for block in reversed(self._blocks):
+            for score, entity in reversed(block):
+                if len(result) >= k:
+                    return result
+                result.append((entity, score))
+        return result
+
+    def count_above(self, score: float) -> int:
+        """Number of indexed entities scoring strictly higher than score."""
+        return len(self) - self._count_at_most(score)
+
+    def count_at_most(self, score: float) -> int:
+        """Number of indexed entities scoring at most score."""
+        return self._count_at_most(score)
+
+    def rank(self, entity):
+        """1-based competition rank (1 = highest score), or None if not indexed."""
+        score = self._scores.get(entity)
+        if score is None:
+            return None
+        return self.count_above(score) + 1
+
+    def percentile_of_score(self, score: float) -> float:
+        """Percentage of indexed entities whose score is at most `score`."""
+        if not self._scores:
+            return 0.0
+        return 100.0 * self._count_at_most(score) / len(self)
+
+    def percentile(self, entity):
+        """Percentile of an entity's score among all indexed entities, or None."""
+        score = self._scores.get(entity)
+        if score is None:
+            return None
+        return self.percentile_of_score(score)
+
+    def count_range(self, min_score: float, max_score: float) -> int:
+        """Number of entities with min_score <= score <= max_score, in O(log n)."""
+        if max_score < min_score:
+            return 0
+        return self._count_at_most(max_score) - self._count_below((min_score,))
+
+    def range(self, min_score: float, max_score: float):
+        """(entity, score) pairs with min_score <= score <= max_score, ascending, in O(log n + k)."""
+        result = []
+        i = bisect_left(self._maxes, (min_score,))
+        if i == len(self._blocks):
+            return result
+        j = bisect_left(self._blocks[i], (min_score,))
+        for block in self._blocks[i:]:
+            for score, entity in block[j:]:
+                if score > max_score:
+                    return result
+                result.append((entity, score))
+            j = 0
+        return result
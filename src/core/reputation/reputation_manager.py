@@ -1,53 +1,373 @@
 # reputation/reputation_manager.py
 
 import logging
+import time
+import numpy as np
 import pandas as pd
 from .scoring_algorithm import ScoringAlgorithm
+from .score_store import ScoreStore
+from .time_decay import ForwardDecay
+from .rank_index import RankIndex
+from .persistence import (ScorePersistence, write_snapshot, read_snapshot,
+                          read_stream_states, OP_PUT, OP_PUT_STREAM, OP_REMOVE, OP_SCALE)
+from .parallel import ScoringPool
+from .score_cache import CachedScore
 
 class ReputationManager:
-    """Class for managing reputation scores."""
+    """Class for managing reputation scores.
 
-    def __init__(self, scoring_algorithm: ScoringAlgorithm):
+    With a time_based scoring algorithm, stored scores decay by wall-clock
+    time at time_decay_rate per second (default: the algorithm's
+    time_decay_rate), independently of its per-position decay_rate.
+    """
+
+    def __init__(self, scoring_algorithm: ScoringAlgorithm, initial_capacity: int = 1024,
+                 executor: str = None, max_workers: int = None, chunk_size: int = 256,
+                 time_decay_rate: float = None, pool=None):
         self.scoring_algorithm = scoring_algorithm
-        self.scores = pd.DataFrame(columns=['entity', 'score'])
+        self.store = ScoreStore(initial_capacity)
+        self.accumulators = {}  # entity -> running-state accumulator for streamed observations
+        self.rank_index = None  # Built on the first rank query, then kept in sync with every write
+        self.persistence = None  # Snapshot + WAL persistence, see enable_persistence()
+        # 'process' or 'thread' pool for algorithms without a vectorized calculate_scores (e.g. CustomScore)
+        self.executor_type = executor
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        # A ScoringPool passed as pool is shared with other managers and left running by close()
+        self._executor = pool
+        self._owns_executor = pool is None
+        # Time-based decay is applied lazily on read; stored scores are normalized to a shared epoch.
+        self.decay = None
+        if getattr(scoring_algorithm, 'time_based', False):
+            if time_decay_rate is None:
+                time_decay_rate = scoring_algorithm.time_decay_rate
+            self.decay = ForwardDecay(time_decay_rate)
         logging.info("ReputationManager initialized with %s.", self.scoring_algorithm.__class__.__name__)
 
-    def add_entity(self, entity: str, data: dict):
+    def _store_factor(self, ts: float = None) -> float:
+        """Factor turning a score observed at ts into its stored form (1.0 unless decaying by time)."""
+        if self.decay is None:
+            return 1.0
+        if ts is None:
+            ts = time.time()
+        if self.decay.needs_rebase(ts):
+            factor = self.decay.rebase(ts)
+            self.store.scale(factor)
+            if self.rank_index is not None:
+                self.rank_index.scale(factor)
+            if self.persistence is not None:
+                self.persistence.log_scale(factor, self.decay.epoch)
+        return self.decay.normalize(1.0, ts)
+
+    def _read_factor(self, now: float = None) -> float:
+        """Factor turning stored scores into scores as of now (1.0 unless decaying by time)."""
+        return 1.0 if self.decay is None else self.decay.factor_at(now)
+
+    def _stored_threshold(self, score: float, now: float = None) -> float:
+        """Stored value that reads as score at now; saturates to +/-inf instead of dividing by an underflowed factor."""
+        return score if self.decay is None else self.decay.normalize(score, now)
+
+    def _put(self, entity, stored_score: float, stream_state=None):
+        """Write one stored score (and the streaming state behind it, if any) to the store and derived indexes."""
+        self.store.add(entity, stored_score)
+        if self.rank_index is not None:
+            self.rank_index.insert(entity, stored_score)
+        if self.persistence is not None:
+            if stream_state is None:
+                self.persistence.log_put(entity, stored_score)
+            else:
+                self.persistence.log_put_stream(entity, stored_score, stream_state)
+            self._maybe_compact()
+
+    def _put_many(self, entities: list, stored_scores):
+        """Write many stored scores to the store and any derived indexes."""
+        self.store.add_many(entities, stored_scores)
+        if self.rank_index is not None:
+            for entity, score in zip(entities, stored_scores):
+                self.rank_index.insert(entity, score)
+        if self.persistence is not None:
+            self.persistence.log_puts(entities, stored_scores)
+            self._maybe_compact()
+
+    def _delete(self, entity) -> bool:
+        """Remove an entity from the store and any derived indexes."""
+        if not self.store.remove(entity):
+            return False
+        self.accumulators.pop(entity, None)
+        if self.rank_index is not None:
+            self.rank_index.remove(entity)
+        if self.persistence is not None:
+            self.persistence.log_remove(entity)
+            self._maybe_compact()
+        return True
+
+    def _replace_store(self, store: ScoreStore, streams: dict = None):
+        """Swap in a new store, dropping state derived from the old one and restoring any saved streams."""
+        self.store = store
+        self.accumulators.clear()
+        for entity, state in (streams or {}).items():
+            self._restore_stream(entity, state)
+        self.rank_index = None
+        if self.persistence is not None:
+            self.checkpoint(background=False)
+
+    def _restore_stream(self, entity, state):
+        accumulator = self.scoring_algorithm.create_accumulator()
+        accumulator.load_state(state)
+        self.accumulators[entity] = accumulator
+
+    def _stream_states(self) -> dict:
+        return {entity: accumulator.state() for entity, accumulator in self.accumulators.items()}
+
+    def _snapshot_metadata(self) -> dict:
+        return {'epoch': self.decay.epoch} if self.decay is not None else {}
+
+    def _maybe_compact(self):
+        if self.persistence.should_compact():
+            self.checkpoint()
+
+    def enable_persistence(self, directory: str, compact_bytes: int = 64 * 1024 * 1024, fsync: bool = False):
+        """Persist scores to a directory as a binary snapshot plus an append-only WAL.
+
+        If the directory already holds state, it replaces the in-memory
+        scores (snapshot load + WAL replay); otherwise the current scores
+        become its first snapshot. Every later write is appended to the WAL,
+        which is compacted into a new snapshot in the background once it
+        exceeds compact_bytes. Streaming accumulator state is persisted with
+        the scores, so ingest continues where it left off after a restart.
+        """
+        persistence = ScorePersistence(directory, compact_bytes=compact_bytes, fsync=fsync)
+        if persistence.has_state():
+            entities, scores, metadata, streams, records = persistence.recover()
+            self.persistence = None
+            self._replace_store(ScoreStore.from_arrays(entities, scores), streams)
+            if self.decay is not None and 'epoch' in metadata:
+                self.decay.epoch = metadata['epoch']
+            for op, key, value in records:
+                if op == OP_PUT:
+                    self.store.add(key, value)
+                    self.accumulators.pop(key, None)
+                elif op == OP_PUT_STREAM:
+                    entity, state = key
+                    self.store.add(entity, value)
+                    self._restore_stream(entity, state)
+                elif op == OP_REMOVE:
+                    self.store.remove(key)
+                    self.accumulators.pop(key, None)
+                elif op == OP_SCALE:
+                    self.store.scale(value)
+                    if self.decay is not None:
+                        self.decay.epoch = key
+        else:
+            persistence.initialize(self.store.entities(), self.store.scores(), self._snapshot_metadata())
+        self.persistence = persistence
+        logging.info("Persistence enabled in %s.", directory)
+        return persistence
+
+    def enable_score_cache(self, max_size: int = 10000, ttl: float = None) -> CachedScore:
+        """Memoize the scoring algorithm on (algorithm, parameters, data); returns the cache for its stats()."""
+        if not isinstance(self.scoring_algorithm, CachedScore):
+            self.scoring_algorithm = CachedScore(self.scoring_algorithm, max_size=max_size, ttl=ttl)
+            logging.info("Score cache enabled (max_size=%d, ttl=%s).", max_size, ttl)
+        return self.scoring_algorithm
+
+    def checkpoint(self, background: bool = True):
+        """Compact the WAL into a new snapshot of the current scores."""
+        if self.persistence is None:
+            logging.warning("Checkpoint requested but persistence is not enabled.")
+            return
+        self.persistence.compact(self.store.entities(), self.store.scores(),
+                                 self._snapshot_metadata(), background=background, streams=self._stream_states())
+
+    def close(self):
+        """Flush and close persistence and shut down the scoring pool."""
+        if self.persistence is not None:
+            self.persistence.close()
+            self.persistence = None
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown()
+            self._executor = None
+
+    def add_entity(self, entity: str, data: dict, ts: float = None):
         """Add an entity and its associated data for scoring."""
         try:
             score = self.scoring_algorithm.calculate_score(data)
-            self.scores = self.scores.append({'entity': entity, 'score': score}, ignore_index=True)
+            self._put(entity, score * self._store_factor(ts))
+            self.accumulators.pop(entity, None)
             logging.info("Entity %s added with score: %.2f", entity, score)
         except Exception as e:
             logging.error("Error adding entity %s: %s", entity, str(e))
 
-    def add_entities(self, entities: dict):
+    def _score_batch(self, records):
+        """Score many signal dicts in one vectorized pass, or return None to fall back to per-entity scoring."""
+        if not self.scoring_algorithm.supports_batch:
+            return None
+        try:
+            return self.scoring_algorithm.score_records(records)
+        except (TypeError, ValueError) as e:
+            logging.warning("Batch scoring failed, falling back to per-entity scoring: %s", str(e))
+            return None
+
+    def _score_parallel(self, items: dict):
+        """Score entities on the configured pool, or return None to fall back to serial scoring.
+
+        Returns (entities, scores) for the entities that scored successfully,
+        in input order; per-entity failures are logged and skipped. With a
+        score cache, hits are resolved here and only misses go to the pool.
+        """
+        if self.executor_type is None and self._executor is None:
+            return None
+        algorithm = self.scoring_algorithm
+        cache = algorithm if isinstance(algorithm, CachedScore) else None
+        records = list(items.values())
+        results = cache.lookup(records) if cache is not None else [None] * len(records)
+        missing = [i for i, score in enumerate(results) if score is None]
+        if missing:
+            entities = list(items)
+            pairs = [(entities[i], records[i]) for i in missing]
+            try:
+                if self._executor is None:
+                    self._executor = ScoringPool(self.executor_type, self.max_workers)
+                computed = self._executor.score(cache.algorithm if cache is not None else algorithm, pairs,
+                                                self.chunk_size)
+            except Exception as e:
+                logging.warning("Parallel scoring failed, falling back to serial scoring: %s", str(e))
+                return None
+            if cache is not None:
+                cache.store([records[i] for i in missing], computed)
+            for i, score in zip(missing, computed):
+                results[i] = score
+        scored = [(entity, score) for entity, score in zip(items, results) if score is not None]
+        return [entity for entity, _ in scored], np.array([score for _, score in scored], dtype=np.float64)
+
+    def _score_many(self, items: dict):
+        """Score many entities at once; returns (entities, scores) or None to use the per-entity path."""
+        scores = self._score_batch(items.values())
+        if scores is not None:
+            return list(items), scores
+        return self._score_parallel(items)
+
+    def add_entities(self, entities: dict, ts: float = None):
         """Add multiple entities and their associated data for scoring."""
-        for entity, data in entities.items():
-            self.add_entity(entity, data)
-
-    def get_score(self, entity: str):
-        """Get the reputation score for a specific entity."""
-        score_row = self.scores[self.scores['entity'] == entity]
-        if not score_row.empty:
-            score = score_row['score'].values[0]
+        scored = self._score_many(entities)
+        if scored is None:
+            for entity, data in entities.items():
+                self.add_entity(entity, data, ts)
+            return
+        names, scores = scored
+        self._put_many(names, scores * self._store_factor(ts))
+        self._reset_streams(names)
+        logging.info("Added %d entities in batch.", len(names))
+
+    def ingest(self, entity: str, signal, value: float, ts: float = None) -> float:
+        """Fold one streamed observation into an entity's running score in O(1).
+
+        The entity is created on its first observation. An entity scored
+        without streaming (add_entity, update_entity_score, load_scores from
+        CSV) continues from its current score, which counts as the running
+        state so far.
+        """
+        accumulator = self.accumulators.get(entity)
+        if accumulator is None:
+            accumulator = self.scoring_algorithm.create_accumulator()
+            stored = self.store.get(entity)
+            if stored is not None:
+                ref = None
+                if self.decay is not None:
+                    ref = ts if ts is not None else time.time()
+                accumulator.seed(stored * self._read_factor(ref), ref)
+            self.accumulators[entity] = accumulator
+        accumulator.update(signal, value, ts)
+        score = accumulator.score()
+        self._put(entity, score * self._store_factor(accumulator.reference_time()), accumulator.state())
+        logging.debug("Ingested %s=%s for %s, score: %.2f", signal, value, entity, score)
+        return score
+
+    def _reset_streams(self, entities):
+        """Drop streaming state for entities whose score was recomputed from full data."""
+        if self.accumulators:
+            for entity in entities:
+                self.accumulators.pop(entity, None)
+
+    def get_score(self, entity: str, now: float = None):
+        """Get the reputation score for a specific entity, decayed to `now` in time-based mode."""
+        score = self.store.get(entity)
+        if score is not None:
+            score *= self._read_factor(now)
             logging.info("Retrieved score for %s: %.2f", entity, score)
             return score
         else:
             logging.warning("Entity %s not found.", entity)
             return None
 
-    def get_all_scores(self):
+    def _scores_frame(self, now: float = None) -> pd.DataFrame:
+        """Build the ('entity', 'score') frame with scores as of now."""
+        frame = self.store.to_frame()
+        if self.decay is not None:
+            frame['score'] *= self._read_factor(now)
+        return frame
+
+    @property
+    def scores(self) -> pd.DataFrame:
+        """DataFrame view of the score store, kept for callers that expect a frame."""
+        return self._scores_frame()
+
+    def get_all_scores(self, now: float = None):
         """Get all reputation scores."""
         logging.info("Retrieved all scores.")
-        return self.scores
+        return self._scores_frame(now)
+
+    def _ranks(self) -> RankIndex:
+        """Return the rank index, building it from the store on first use."""
+        if self.rank_index is None:
+            self.rank_index = RankIndex.from_items(self.store.entities(), self.store.scores())
+            logging.info("Rank index built over %d entities.", len(self.rank_index))
+        return self.rank_index
 
-    def update_entity_score(self, entity: str, new_data: dict):
+    def top_k(self, k: int, now: float = None):
+        """Return the k highest-scoring (entity, score) pairs, best first."""
+        factor = self._read_factor(now)
+        return [(entity, score * factor) for entity, score in self._ranks().top_k(k)]
+
+    def rank(self, entity: str):
+        """Return an entity's 1-based rank (1 = highest score), or None if not found."""
+        rank = self._ranks().rank(entity)
+        if rank is None:
+            logging.warning("Entity %s not found.", entity)
+        return rank
+
+    def percentile(self, entity: str):
+        """Return the percentage of entities scoring at or below this entity, or None if not found."""
+        percentile = self._ranks().percentile(entity)
+        if percentile is None:
+            logging.warning("Entity %s not found.", entity)
+        return percentile
+
+    def count_above(self, score: float, now: float = None) -> int:
+        """Return the number of entities scoring strictly higher than score."""
+        return self._ranks().count_above(self._stored_threshold(score, now))
+
+    def count_at_most(self, score: float, now: float = None) -> int:
+        """Return the number of entities scoring at most score."""
+        return self._ranks().count_at_most(self._stored_threshold(score, now))
+
+    def percentile_of_score(self, score: float, now: float = None) -> float:
+        """Return the percentage of entities scoring at or below a given score."""
+        return self._ranks().percentile_of_score(self._stored_threshold(score, now))
+
+    def entities_in_range(self, min_score: float, max_score: float, now: float = None):
+        """Return (entity, score) pairs with min_score <= score <= max_score, lowest first."""
+        factor = self._read_factor(now)
+        low, high = self._stored_threshold(min_score, now), self._stored_threshold(max_score, now)
+        return [(entity, score * factor) for entity, score in self._ranks().range(low, high)]
+
+    def update_entity_score(self, entity: str, new_data: dict, ts: float = None):
         """Update the score for an existing entity."""
-        if entity in self.scores['entity'].values:
+        if entity in self.store:
             try:
                 new_score = self.scoring_algorithm.calculate_score(new_data)
-                self.scores.loc[self.scores['entity'] == entity, 'score'] = new_score
+                self._put(entity, new_score * self._store_factor(ts))
+                self.accumulators.pop(entity, None)
                 logging.info("Updated score for %s: %.2f", entity, new_score)
             except Exception as e:
                 logging.error("Error updating score for %s: %s", entity, str(e))
@@ -56,31 +376,59 @@ class ReputationManager:
 
     def remove_entity(self, entity: str):
         """Remove an entity from the reputation scores."""
-        if entity in self.scores['entity'].values:
-            self.scores = self.scores[self.scores['entity'] != entity]
+        if self._delete(entity):
             logging.info("Entity %s removed from scores.", entity)
         else:
             logging.warning("Entity %s not found for removal.", entity)
 
-    def batch_update_scores(self, updates: dict):
+    def batch_update_scores(self, updates: dict, ts: float = None):
         """Batch update scores for multiple entities."""
-        for entity, new_data in updates.items():
-            self.update_entity_score(entity, new_data)
+        known = {entity: new_data for entity, new_data in updates.items() if entity in self.store}
+        for entity in updates.keys() - known.keys():
+            logging.warning("Entity %s not found for update.", entity)
+        scored = self._score_many(known)
+        if scored is None:
+            for entity, new_data in known.items():
+                self.update_entity_score(entity, new_data, ts)
+            return
+        names, scores = scored
+        self._put_many(names, scores * self._store_factor(ts))
+        self._reset_streams(names)
+        logging.info("Updated %d entities in batch.", len(names))
 
-    def save_scores(self, file_path: str):
-        """Save the current scores to a CSV file."""
+    def save_scores(self, file_path: str, format: str = 'csv'):
+        """Save the current scores to a CSV file, or to a binary snapshot directory with format='snapshot'."""
         try:
-            self.scores.to_csv(file_path, index=False)
+            if format == 'snapshot':
+                write_snapshot(file_path, self.store.entities(), self.store.scores(), self._snapshot_metadata(),
+                               self._stream_states())
+            else:
+                self._scores_frame().to_csv(file_path, index=False)
             logging.info("Scores saved to %s.", file_path)
         except Exception as e:
             logging.error("Error saving scores to %s: %s", file_path, str(e))
 
-    def load_scores(self, file_path: str):
-        """Load scores from a CSV file."""
+    def load_scores(self, file_path: str, ts: float = None, format: str = 'csv'):
+        """Load scores from a CSV file; in time-based mode ts is when they were saved (default: now).
+
+        With format='snapshot', file_path is a directory written by
+        save_scores(format='snapshot'); its scores are memory-mapped and
+        bulk-copied, and ts is ignored because the snapshot records its epoch.
+        """
         try:
+            if format == 'snapshot':
+                entities, scores, metadata = read_snapshot(file_path)
+                if self.decay is not None and 'epoch' in metadata:
+                    self.decay.epoch = metadata['epoch']
+                self._replace_store(ScoreStore.from_arrays(entities, scores), read_stream_states(file_path, entities))
+                logging.info("Scores loaded from snapshot %s.", file_path)
+                return
             loaded_scores = pd.read_csv(file_path)
             if 'entity' in loaded_scores.columns and 'score' in loaded_scores.columns:
-                self.scores = loaded_scores
+                store = ScoreStore.from_frame(loaded_scores)
+                if self.decay is not None:
+                    store.scale(self._store_factor(ts))
+                self._replace_store(store)
                 logging.info("Scores loaded from %s.", file_path)
             else:
                 logging.error("Invalid format in %s. Required columns: 'entity', 'score'.", file_path)
@@ -0,0 +1,161 @@
+# reputation/score_cache.py
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+from .scoring_algorithm import ScoringAlgorithm
+
+def _parameter_fingerprint(algorithm: ScoringAlgorithm) -> str:
+    """Canonical text for an algorithm's class and configuration."""
+    parts = [f"{type(algorithm).__module__}.{type(algorithm).__qualname__}"]
+    for name, value in sorted(vars(algorithm).items()):
+        if callable(value):
+            value = f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', repr(value))}"
+        elif isinstance(value, dict):
+            value = sorted(value.items(), key=repr)
+        parts.append(f"{name}={value!r}")
+    return '|'.join(parts)
+
+class CachedScore(ScoringAlgorithm):
+    """Memoizing wrapper around any ScoringAlgorithm.
+
+    calculate_score results are cached under a BLAKE2 digest of the wrapped
+    algorithm's class and parameters, the data items in order and any call
+    arguments, in a bounded LRU with an optional TTL. score_records (the
+    manager's batch path) shares the same entries: cached rows are served
+    from the cache and only the misses go through the wrapped algorithm's
+    calculate_scores. Process pool workers receive an empty cache, so the
+    manager resolves hits with lookup() before dispatch and store()s what
+    the workers return. calculate_scores on a raw matrix and streaming
+    accumulators are delegated uncached. Call clear() after changing the
+    wrapped algorithm's parameters in place.
+    """
+
+    def __init__(self, algorithm: ScoringAlgorithm, max_size: int = 10000, ttl: float = None):
+        self.algorithm = algorithm
+        self.max_size = max_size
+        self.ttl = ttl  # Seconds an entry stays valid; None keeps entries until evicted
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # digest -> (score, expires_at)
+        self._lock = threading.Lock()
+        self._fingerprint = None
+
+    def __getattr__(self, name):
+        # Expose the wrapped algorithm's configuration (decay_rate, time_based, weights, ...).
+        if name == 'algorithm':
+            raise AttributeError(name)
+        return getattr(self.algorithm, name)
+
+    def __getstate__(self):
+        # Worker processes get an empty cache of their own; locks cannot be pickled.
+        state = self.__dict__.copy()
+        state['_entries'] = OrderedDict()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _key(self, data: dict, kwargs: dict) -> bytes:
+        if self._fingerprint is None:
+            self._fingerprint = _parameter_fingerprint(self.algorithm)
+        text = f"{self._fingerprint}#{tuple(data.items())!r}#{sorted(kwargs.items())!r}"
+        return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+    def _get(self, key: bytes, now: float):
+        """Cached score for key, or None on a miss; caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is not None and (entry[1] is None or entry[1] > now):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self.misses += 1
+        return None
+
+    def _set(self, key: bytes, score: float, now: float):
+        """Cache score under key; caller holds the lock."""
+        self._entries[key] = (score, now + self.ttl if self.ttl is not None else None)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def calculate_score(self, data: dict, **kwargs) -> float:
+        """Return the cached score for identical input, computing and caching it on a miss."""
+        key = self._key(data, kwargs)
+        now = time.monotonic()
+        with self._lock:
+            score = self._get(key, now)
+        if score is not None:
+            return score
+        score = self.algorithm.calculate_score(data, **kwargs)
+        with self._lock:
+            self._set(key, score, now)
+        return score
+
+    def lookup(self, records) -> list:
+        """Cached score for each signal dict, None where it is not cached."""
+        keys = [self._key(data, {}) for data in records]
+        now = time.monotonic()
+        with self._lock:
+            return [self._get(key, now) for key in keys]
+
+    def store(self, records, scores):
+        """Cache scores computed elsewhere (e.g. by pool workers); None scores are skipped."""
+        pairs = [(self._key(data, {}), score) for data, score in zip(records, scores) if score is not None]
+        now = time.monotonic()
+        with self._lock:
+            for key, score in pairs:
+                self._set(key, float(score), now)
+
+    def score_records(self, records) -> np.ndarray:
+        """Batch-score signal dicts, computing only the rows that miss the cache."""
+        records = list(records)
+        scores = self.lookup(records)
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+            misses = [records[i] for i in missing]
+            computed = self.algorithm.score_records(misses)
+            self.store(misses, computed)
+            for i, score in zip(missing, computed):
+                scores[i] = score
+        return np.array(scores, dtype=np.float64)
+
+    def calculate_scores(self, data, **kwargs):
+        """Delegate batch scoring to the wrapped algorithm."""
+        return self.algorithm.calculate_scores(data, **kwargs)
+
+    def create_accumulator(self):
+        return self.algorithm.create_accumulator()
+
+    @property
+    def supports_batch(self) -> bool:
+        return self.algorithm.supports_batch
+
+    @property
+    def signals_by_key(self) -> bool:
+        return self.algorithm.signals_by_key
+
+    def clear(self):
+        """Drop all cached scores and the parameter fingerprint."""
+        with self._lock:
+            self._entries.clear()
+            self._fingerprint = None
+        logging.info("Score cache cleared.")
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters and current size."""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries),
+            'hit_rate': self.hits / total if total else 0.0,
+        }
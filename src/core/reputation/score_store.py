@@ -0,0 +1,156 @@
+# reputation/score_store.py
+
+import logging
+import numpy as np
+import pandas as pd
+
+class ScoreStore:
+    """Columnar score storage backed by NumPy arrays with an entity -> slot index."""
+
+    def __init__(self, initial_capacity: int = 1024):
+        capacity = max(int(initial_capacity), 1)
+        self._entities = np.empty(capacity, dtype=object)
+        self._scores = np.zeros(capacity, dtype=np.float64)
+        self._occupied = np.zeros(capacity, dtype=bool)
+        self._index = {}  # entity -> slot
+        self._free_slots = []  # slots released by remove(), reused before growing
+        self._high_water = 0  # number of slots ever handed out
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, entity):
+        return entity in self._index
+
+    @property
+    def capacity(self) -> int:
+        """Number of slots currently allocated."""
+        return len(self._scores)
+
+    def _grow(self, min_capacity: int):
+        """Grow the backing arrays geometrically to hold at least min_capacity slots."""
+        new_capacity = max(min_capacity, 2 * self.capacity)
+        entities = np.empty(new_capacity, dtype=object)
+        scores = np.zeros(new_capacity, dtype=np.float64)
+        occupied = np.zeros(new_capacity, dtype=bool)
+        entities[:self._high_water] = self._entities[:self._high_water]
+        scores[:self._high_water] = self._scores[:self._high_water]
+        occupied[:self._high_water] = self._occupied[:self._high_water]
+        self._entities, self._scores, self._occupied = entities, scores, occupied
+        logging.debug("ScoreStore grown to %d slots.", new_capacity)
+
+    def _allocate_slot(self) -> int:
+        """Return a free slot, reusing released slots before extending the arrays."""
+        if self._free_slots:
+            return self._free_slots.pop()
+        if self._high_water == self.capacity:
+            self._grow(self._high_water + 1)
+        slot = self._high_water
+        self._high_water += 1
+        return slot
+
+    def slot_of(self, entity):
+        """Return the slot holding an entity, or None if it is not stored."""
+        return self._index.get(entity)
+
+    def add(self, entity, score: float) -> int:
+        """Insert an entity, or overwrite its score if it already exists. Returns its slot."""
+        slot = self._index.get(entity)
+        if slot is None:
+            slot = self._allocate_slot()
+            self._index[entity] = slot
+            self._entities[slot] = entity
+            self._occupied[slot] = True
+        self._scores[slot] = score
+        return slot
+
+    def add_many(self, entities, scores) -> np.ndarray:
+        """Insert or overwrite many entities at once. Returns the slots written."""
+        scores = np.asarray(scores, dtype=np.float64)
+        if len(entities) != len(scores):
+            raise ValueError("entities and scores must have the same length.")
+        new_count = sum(1 for entity in entities if entity not in self._index)
+        shortfall = new_count - len(self._free_slots) - (self.capacity - self._high_water)
+        if shortfall > 0:
+            self._grow(self.capacity + shortfall)
+        slots = np.fromiter((self.add(entity, 0.0) for entity in entities),
+                            dtype=np.int64, count=len(entities))
+        self._scores[slots] = scores
+        return slots
+
+    def get(self, entity):
+        """Return the score for an entity, or None if it is not stored."""
+        slot = self._index.get(entity)
+        if slot is None:
+            return None
+        return float(self._scores[slot])
+
+    def update(self, entity, score: float) -> bool:
+        """Overwrite the score of an existing entity. Returns False if it is not stored."""
+        slot = self._index.get(entity)
+        if slot is None:
+            return False
+        self._scores[slot] = score
+        return True
+
+    def remove(self, entity) -> bool:
+        """Remove an entity and release its slot. Returns False if it is not stored."""
+        slot = self._index.pop(entity, None)
+        if slot is None:
+            return False
+        self._entities[slot] = None
+        self._scores[slot] = 0.0
+        self._occupied[slot] = False
+        self._free_slots.append(slot)
+        return True
+
+    def scale(self, factor: float):
+        """Multiply every stored score by factor."""
+        self._scores[:self._high_water] *= factor
+
+    def clear(self):
+        """Remove every entity while keeping the allocated capacity."""
+        self._entities[:] = None
+        self._scores[:] = 0.0
+        self._occupied[:] = False
+        self._index.clear()
+        self._free_slots.clear()
+        self._high_water = 0
+
+    def active_slots(self) -> np.ndarray:
+        """Return the occupied slots in slot order."""
+        return np.flatnonzero(self._occupied[:self._high_water])
+
+    def entities(self) -> np.ndarray:
+        """Return the stored entities in slot order."""
+        return self._entities[self.active_slots()]
+
+    def scores(self) -> np.ndarray:
+        """Return the stored scores in slot order."""
+        return self._scores[self.active_slots()]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the stored scores as an ('entity', 'score') DataFrame."""
+        slots = self.active_slots()
+        return pd.DataFrame({'entity': self._entities[slots], 'score': self._scores[slots]})
+
+    @classmethod
+    def from_arrays(cls, entities, scores, initial_capacity: int = 1024):
+        """Build a store from parallel sequences of unique entities and scores with bulk copies."""
+        count = len(entities)
+        store = cls(max(initial_capacity, count))
+        store._index = dict(zip(entities, range(count)))
+        if len(store._index) != count:
+            raise ValueError("from_arrays requires unique entities.")
+        store._entities[:count] = entities
+        store._scores[:count] = scores
+        store._occupied[:count] = True
+        store._high_water = count
+        return store
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, initial_capacity: int = 1024):
+        """Build a store from an ('entity', 'score') DataFrame; later rows win on duplicates."""
+        store = cls(max(initial_capacity, len(frame)))
+        store.add_many(frame['entity'].tolist(), frame['score'].to_numpy(dtype=np.float64))
+        return store
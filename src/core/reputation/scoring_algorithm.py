@@ -1,14 +1,100 @@
 # reputation/scoring_algorithm.py
 
-import numpy as np
+import itertools
 import logging
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from .accumulators import Accumulator, AverageAccumulator, WeightedAccumulator, DecayAccumulator
+
+def signals_to_matrix(records) -> np.ndarray:
+    """Pack a sequence of signal dicts into an N x M float matrix, left-aligned and NaN-padded.
+
+    Column j holds each dict's j-th value in insertion order, which is the
+    position the per-dict scorers (notably ExponentialDecayScore) already use.
+    """
+    records = list(records)
+    lengths = np.fromiter((len(record) for record in records), dtype=np.intp, count=len(records))
+    width = int(lengths.max()) if len(records) else 0
+    flat = np.fromiter(itertools.chain.from_iterable(record.values() for record in records),
+                       dtype=np.float64, count=int(lengths.sum()))
+    matrix = np.full((len(records), width), np.nan)
+    matrix[np.arange(width) < lengths[:, None]] = flat
+    return matrix
+
+def signals_to_frame(records) -> pd.DataFrame:
+    """Pack a sequence of signal dicts into an N x K DataFrame with one column per distinct key.
+
+    Columns follow first appearance; a key missing from a dict is NaN. Use
+    this for scorers that match signals by name (WeightedScore with dict
+    weights) rather than by position.
+    """
+    records = list(records)
+    columns = {}
+    for record in records:
+        for key in record:
+            if key not in columns:
+                columns[key] = len(columns)
+    lengths = np.fromiter((len(record) for record in records), dtype=np.intp, count=len(records))
+    total = int(lengths.sum())
+    flat = np.fromiter(itertools.chain.from_iterable(record.values() for record in records),
+                       dtype=np.float64, count=total)
+    cols = np.fromiter((columns[key] for record in records for key in record), dtype=np.intp, count=total)
+    matrix = np.full((len(records), len(columns)), np.nan)
+    matrix[np.repeat(np.arange(len(records)), lengths), cols] = flat
+    return pd.DataFrame(matrix, columns=list(columns), copy=False)
+
+def _as_matrix(data):
+    """Return (values, columns) for a 2-D array or DataFrame of signals; columns is None for arrays."""
+    if isinstance(data, pd.DataFrame):
+        return data.to_numpy(dtype=np.float64), list(data.columns)
+    values = np.asarray(data, dtype=np.float64)
+    if values.ndim != 2:
+        raise ValueError("Batch scoring expects a 2-D matrix of signals.")
+    return values, None
+
+@lru_cache(maxsize=64)
+def _decay_kernel(length: int, decay_rate: float) -> np.ndarray:
+    """Precomputed exp(-decay_rate * idx) weights for idx in [0, length)."""
+    kernel = np.exp(-decay_rate * np.arange(length, dtype=np.float64))
+    kernel.setflags(write=False)
+    return kernel
 
 class ScoringAlgorithm:
     """Base class for scoring algorithms."""
+    signals_by_key = False  # True if calculate_scores matches signals by name, so batches need signals_to_frame
     def calculate_score(self, data: dict) -> float:
         """Calculate the reputation score based on input data."""
         raise NotImplementedError("Subclasses should implement this method.")
 
+    def calculate_scores(self, data, **kwargs) -> np.ndarray:
+        """Score N entities x M signals at once; NaN marks a missing signal.
+
+        The base implementation calls calculate_score once per row. Subclasses
+        override it with a single vectorized NumPy pass.
+        """
+        values, columns = _as_matrix(data)
+        keys = columns if columns is not None else range(values.shape[1])
+        scores = np.empty(len(values), dtype=np.float64)
+        for i, row in enumerate(values):
+            row_data = {key: value for key, value in zip(keys, row) if not np.isnan(value)}
+            scores[i] = self.calculate_score(row_data, **kwargs)
+        return scores
+
+    def score_records(self, records) -> np.ndarray:
+        """Score a sequence of signal dicts with calculate_scores, packed the way this algorithm reads them."""
+        pack = signals_to_frame if self.signals_by_key else signals_to_matrix
+        return self.calculate_scores(pack(records))
+
+    def create_accumulator(self) -> Accumulator:
+        """Create the running-state accumulator used for streaming ingestion."""
+        raise NotImplementedError(f"{self.__class__.__name__} does not support streaming ingestion.")
+
+    @property
+    def supports_batch(self) -> bool:
+        """True when calculate_scores is a vectorized override rather than the per-row fallback."""
+        return type(self).calculate_scores is not ScoringAlgorithm.calculate_scores
+
 class SimpleAverageScore(ScoringAlgorithm):
     """Simple average scoring algorithm."""
     def calculate_score(self, data: dict) -> float:
@@ -24,10 +110,31 @@ class SimpleAverageScore(ScoringAlgorithm):
             logging.error("Error calculating Simple Average Score: %s", str(e))
             return 0.0
 
+    def calculate_scores(self, data) -> np.ndarray:
+        """Calculate row means over the present (non-NaN) signals; empty rows score 0.0."""
+        values, _ = _as_matrix(data)
+        present = ~np.isnan(values)
+        counts = present.sum(axis=1)
+        sums = np.where(present, values, 0.0).sum(axis=1)
+        scores = np.divide(sums, counts, out=np.zeros(len(values)), where=counts > 0)
+        logging.info("Calculated Simple Average Scores for %d entities.", len(scores))
+        return scores
+
+    def create_accumulator(self) -> Accumulator:
+        """Running count/sum accumulator."""
+        return AverageAccumulator()
+
 class WeightedScore(ScoringAlgorithm):
     """Weighted scoring algorithm."""
+    signals_by_key = True
+
+    def __init__(self, weights: dict = None):
+        self.weights = weights  # Used when no weights are passed per call
+
     def calculate_score(self, data: dict, weights: dict = None) -> float:
         """Calculate score as a weighted sum of the values in the data dictionary."""
+        if weights is None:
+            weights = self.weights
         if weights is None:
             weights = {key: 1 for key in data.keys()}  # Default weights
         try:
@@ -38,10 +145,45 @@ class WeightedScore(ScoringAlgorithm):
             logging.error("Error calculating Weighted Score: %s", str(e))
             return 0.0
 
+    def calculate_scores(self, data, weights=None) -> np.ndarray:
+        """Calculate weighted row sums as a single matrix-vector product.
+
+        weights may be a dict keyed by DataFrame column (missing keys weigh 0,
+        as in calculate_score) or a sequence with one weight per column.
+        """
+        values, columns = _as_matrix(data)
+        if weights is None:
+            weights = self.weights
+        if weights is None:
+            weight_vector = np.ones(values.shape[1])
+        elif isinstance(weights, dict):
+            if columns is None:
+                raise ValueError("Dict weights require a DataFrame with named columns.")
+            weight_vector = np.array([weights.get(column, 0) for column in columns], dtype=np.float64)
+        else:
+            weight_vector = np.asarray(weights, dtype=np.float64)
+            if weight_vector.shape != (values.shape[1],):
+                raise ValueError("Weight vector length must match the number of signal columns.")
+        scores = np.nan_to_num(values, nan=0.0) @ weight_vector
+        logging.info("Calculated Weighted Scores for %d entities.", len(scores))
+        return scores
+
+    def create_accumulator(self) -> Accumulator:
+        """Running weighted-sum accumulator using the configured weights."""
+        return WeightedAccumulator(self.weights)
+
 class ExponentialDecayScore(ScoringAlgorithm):
     """Exponential decay scoring algorithm."""
-    def calculate_score(self, data: dict, decay_rate: float = 0.1) -> float:
+    def __init__(self, decay_rate: float = 0.1, time_based: bool = False, time_decay_rate: float = None):
+        self.decay_rate = decay_rate  # Per position in dict data
+        self.time_based = time_based  # Managers also decay stored scores lazily by wall-clock time
+        # Per time unit, for streamed observations and time-based managers (defaults to decay_rate)
+        self.time_decay_rate = decay_rate if time_decay_rate is None else time_decay_rate
+
+    def calculate_score(self, data: dict, decay_rate: float = None) -> float:
         """Calculate score using an exponential decay formula."""
+        if decay_rate is None:
+            decay_rate = self.decay_rate
         if not data:
             logging.warning("No data provided for scoring.")
             return 0.0
@@ -54,6 +196,20 @@ class ExponentialDecayScore(ScoringAlgorithm):
             logging.error("Error calculating Exponential Decay Score: %s", str(e))
             return 0.0
 
+    def calculate_scores(self, data, decay_rate: float = None) -> np.ndarray:
+        """Calculate decayed row sums against a cached exp(-decay_rate * idx) kernel."""
+        if decay_rate is None:
+            decay_rate = self.decay_rate
+        values, _ = _as_matrix(data)
+        kernel = _decay_kernel(values.shape[1], float(decay_rate))
+        scores = np.nan_to_num(values, nan=0.0) @ kernel
+        logging.info("Calculated Exponential Decay Scores for %d entities.", len(scores))
+        return scores
+
+    def create_accumulator(self) -> Accumulator:
+        """Running time-decayed sum accumulator."""
+        return DecayAccumulator(self.time_decay_rate)
+
 class CustomScore(ScoringAlgorithm):
     """Custom scoring algorithm that allows for user-defined scoring logic."""
     def __init__(self, scoring_function):
@@ -0,0 +1,160 @@
+# reputation/sharded_manager.py
+
+import heapq
+import logging
+import os
+import threading
+import time
+import zlib
+from contextlib import ExitStack
+import pandas as pd
+from .reputation_manager import ReputationManager
+from .scoring_algorithm import ScoringAlgorithm
+from .parallel import ScoringPool
+
+class ShardedReputationManager:
+    """Thread-safe ReputationManager partitioned into independently locked shards.
+
+    Entities are assigned to shards by a stable CRC32 of their string form.
+    Single-entity operations lock only their shard, so writers on different
+    shards run concurrently. Cross-shard reads (get_all_scores, top_k, rank,
+    percentile) lock every shard in a fixed order to read a consistent
+    snapshot; batch writes lock one shard at a time.
+
+    With executor='process' or 'thread', a single scoring pool of
+    max_workers is created here and shared by every shard.
+    """
+
+    def __init__(self, scoring_algorithm: ScoringAlgorithm, num_shards: int = 16,
+                 initial_capacity: int = 1024, executor: str = None, max_workers: int = None,
+                 **manager_options):
+        if num_shards < 1:
+            raise ValueError("num_shards must be at least 1.")
+        self.scoring_algorithm = scoring_algorithm
+        self.pool = ScoringPool(executor, max_workers) if executor is not None else None
+        self.shards = [
+            ReputationManager(scoring_algorithm, initial_capacity=max(initial_capacity // num_shards, 1),
+                              pool=self.pool, **manager_options)
+            for _ in range(num_shards)
+        ]
+        self.locks = [threading.Lock() for _ in range(num_shards)]
+        logging.info("ShardedReputationManager initialized with %d shards.", num_shards)
+
+    def __len__(self):
+        with self._all_shards():
+            return sum(len(shard.store) for shard in self.shards)
+
+    def shard_index(self, entity) -> int:
+        """Shard that owns an entity."""
+        return zlib.crc32(str(entity).encode('utf-8')) % len(self.shards)
+
+    def _partition(self, items: dict):
+        """Split an entity -> value dict into one dict per shard index."""
+        parts = {}
+        for entity, value in items.items():
+            parts.setdefault(self.shard_index(entity), {})[entity] = value
+        return parts
+
+    def _all_shards(self) -> ExitStack:
+        """Context manager holding every shard lock, acquired in index order."""
+        stack = ExitStack()
+        for lock in self.locks:
+            stack.enter_context(lock)
+        return stack
+
+    def add_entity(self, entity: str, data: dict, ts: float = None):
+        i = self.shard_index(entity)
+        with self.locks[i]:
+            self.shards[i].add_entity(entity, data, ts)
+
+    def add_entities(self, entities: dict, ts: float = None):
+        for i, part in self._partition(entities).items():
+            with self.locks[i]:
+                self.shards[i].add_entities(part, ts)
+
+    def ingest(self, entity: str, signal, value: float, ts: float = None) -> float:
+        i = self.shard_index(entity)
+        with self.locks[i]:
+            return self.shards[i].ingest(entity, signal, value, ts)
+
+    def get_score(self, entity: str, now: float = None):
+        i = self.shard_index(entity)
+        with self.locks[i]:
+            return self.shards[i].get_score(entity, now)
+
+    def update_entity_score(self, entity: str, new_data: dict, ts: float = None):
+        i = self.shard_index(entity)
+        with self.locks[i]:
+            self.shards[i].update_entity_score(entity, new_data, ts)
+
+    def batch_update_scores(self, updates: dict, ts: float = None):
+        for i, part in self._partition(updates).items():
+            with self.locks[i]:
+                self.shards[i].batch_update_scores(part, ts)
+
+    def remove_entity(self, entity: str):
+        i = self.shard_index(entity)
+        with self.locks[i]:
+            self.shards[i].remove_entity(entity)
+
+    def get_all_scores(self, now: float = None) -> pd.DataFrame:
+        """Consistent snapshot of all scores across shards."""
+        now = time.time() if now is None else now
+        with self._all_shards():
+            frames = [shard.get_all_scores(now) for shard in self.shards]
+        return pd.concat(frames, ignore_index=True)
+
+    @property
+    def scores(self) -> pd.DataFrame:
+        return self.get_all_scores()
+
+    def top_k(self, k: int, now: float = None):
+        """The k highest-scoring (entity, score) pairs across all shards, best first."""
+        now = time.time() if now is None else now
+        with self._all_shards():
+            per_shard = [shard.top_k(k, now) for shard in self.shards]
+        merged = heapq.merge(*per_shard, key=lambda item: item[1], reverse=True)
+        return [item for item, _ in zip(merged, range(k))]
+
+    def rank(self, entity: str, now: float = None):
+        """1-based rank across all shards (1 = highest score), or None if not found."""
+        now = time.time() if now is None else now
+        owner = self.shard_index(entity)
+        with self._all_shards():
+            local_rank = self.shards[owner].rank(entity)
+            if local_rank is None:
+                return None
+            score = self.shards[owner].get_score(entity, now)
+            return local_rank + sum(shard.count_above(score, now)
+                                    for i, shard in enumerate(self.shards) if i != owner)
+
+    def percentile(self, entity: str, now: float = None):
+        """Percentage of entities across all shards scoring at or below this entity, or None."""
+        now = time.time() if now is None else now
+        owner = self.shard_index(entity)
+        with self._all_shards():
+            owner_shard = self.shards[owner]
+            local_rank = owner_shard.rank(entity)
+            if local_rank is None:
+                return None
+            score = owner_shard.get_score(entity, now)
+            # Exact count in the owner shard: everything not strictly above the entity
+            at_most = len(owner_shard.store) - (local_rank - 1)
+            at_most += sum(shard.count_at_most(score, now)
+                           for i, shard in enumerate(self.shards) if i != owner)
+            total = sum(len(shard.store) for shard in self.shards)
+        return 100.0 * at_most / total
+
+    def enable_persistence(self, directory: str, **options):
+        """Persist each shard to its own subdirectory (snapshot + WAL)."""
+        for i, shard in enumerate(self.shards):
+            with self.locks[i]:
+                shard.enable_persistence(os.path.join(directory, f"shard-{i:03d}"), **options)
+
+    def close(self):
+        for i, shard in enumerate(self.shards):
+            with self.locks[i]:
+                shard.close()
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
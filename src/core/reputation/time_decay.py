@@ -0,0 +1,65 @@
+# reputation/time_decay.py
+
+import logging
+import math
+import time
+
+_MAX_EXP = math.log(1.7976931348623157e308)
+
+def _scaled(value: float, exponent: float) -> float:
+    """value * exp(exponent), computed in log space so huge exponents saturate instead of overflowing."""
+    if value == 0:
+        return 0.0
+    log_magnitude = math.log(abs(value)) + exponent
+    if log_magnitude >= _MAX_EXP:
+        return math.copysign(math.inf, value)
+    return math.copysign(math.exp(log_magnitude), value)
+
+class ForwardDecay:
+    """Lazy exponential time decay against a shared reference epoch.
+
+    A score `value` observed at `ref_time` is stored as
+    value * exp(decay_rate * (ref_time - epoch)), i.e. normalized to the
+    epoch. Reading at time `now` multiplies by exp(-decay_rate * (now - epoch)),
+    the same factor for every entity, so stored values order exactly like
+    the decayed ones and can be ranked without touching the clock.
+
+    Comparing a decayed score against stored values goes the other way:
+    normalize(score, now) is the stored value that decays to score at now.
+    It is computed in log space, so a `now` far past the epoch (where the
+    read factor underflows to 0) yields +/-inf rather than dividing by zero.
+    """
+
+    def __init__(self, decay_rate: float, epoch: float = None, max_exponent: float = 200.0):
+        if decay_rate < 0:
+            raise ValueError("decay_rate must be non-negative.")
+        self.decay_rate = decay_rate
+        self.epoch = time.time() if epoch is None else epoch
+        self.max_exponent = max_exponent  # Rebase before normalized values risk overflowing float64
+
+    def normalize(self, value: float, ref_time: float = None) -> float:
+        """Express a score observed at ref_time (default: now) relative to the epoch."""
+        if ref_time is None:
+            ref_time = time.time()
+        return _scaled(value, self.decay_rate * (ref_time - self.epoch))
+
+    def factor_at(self, now: float = None) -> float:
+        """Multiplier that turns normalized values into scores decayed to `now`."""
+        if now is None:
+            now = time.time()
+        return _scaled(1.0, -self.decay_rate * (now - self.epoch))
+
+    def decayed(self, normalized: float, now: float = None) -> float:
+        """Decay a normalized value to `now` (default: current time)."""
+        return normalized * self.factor_at(now)
+
+    def needs_rebase(self, ref_time: float) -> bool:
+        """True when normalizing at ref_time would exceed the exponent budget."""
+        return self.decay_rate * (ref_time - self.epoch) > self.max_exponent
+
+    def rebase(self, new_epoch: float) -> float:
+        """Move the epoch forward; returns the factor every stored normalized value must be multiplied by."""
+        factor = math.exp(-self.decay_rate * (new_epoch - self.epoch))
+        logging.info("Rebasing decay epoch from %.3f to %.3f.", self.epoch, new_epoch)
+        self.epoch = new_epoch
+        return factor
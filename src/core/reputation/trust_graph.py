@@ -0,0 +1,172 @@
+# reputation/trust_graph.py
+
+import logging
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+class TrustGraph:
+    """Transitive trust over rater -> ratee edges (EigenTrust / personalized PageRank).
+
+    Ratings are held in a sparse CSR matrix (new edges are buffered as COO
+    and merged on the next computation). Local trust is each rater's
+    non-negative ratings normalized to sum to 1; global trust is the
+    stationary vector of that walk with teleportation to a personalization
+    (pre-trust) vector, computed by power iteration and warm-started from
+    the previous result. As in PageRank, damping is the probability of
+    following a trust edge; with probability 1 - damping the walk teleports
+    to the personalization vector.
+    """
+
+    def __init__(self, damping: float = 0.85, tol: float = 1e-8, max_iter: int = 100):
+        if not 0.0 <= damping < 1.0:
+            raise ValueError("damping must be in [0, 1).")
+        self.damping = damping  # Probability of following a trust edge rather than teleporting
+        self.tol = tol  # L1 change between iterations that counts as converged
+        self.max_iter = max_iter
+        self._ids = {}  # entity -> node id
+        self._entities = []  # node id -> entity
+        self._matrix = sp.csr_matrix((0, 0), dtype=np.float64)
+        self._pending = []  # buffered (rows, cols, weights) arrays
+        self._transition = None  # column-stochastic transpose of local trust, None when stale
+        self._dangling = None  # mask of raters with no positive outgoing trust
+        self.trust = None  # last global trust vector, indexed by node id
+        self.iterations = 0  # iterations used by the last computation
+
+    def __len__(self):
+        return len(self._entities)
+
+    @property
+    def edge_count(self) -> int:
+        """Number of stored (rater, ratee) edges, after merging buffered ratings."""
+        self._materialize()
+        return self._matrix.nnz
+
+    def _node_ids(self, entities) -> np.ndarray:
+        ids = np.empty(len(entities), dtype=np.int64)
+        for i, entity in enumerate(entities):
+            node = self._ids.get(entity)
+            if node is None:
+                node = len(self._entities)
+                self._ids[entity] = node
+                self._entities.append(entity)
+            ids[i] = node
+        return ids
+
+    def add_rating(self, rater, ratee, weight: float = 1.0):
+        """Add weight to the rater -> ratee edge."""
+        self.add_ratings([rater], [ratee], [weight])
+
+    def add_ratings(self, raters, ratees, weights=None):
+        """Add many rater -> ratee edges at once; weights on repeated edges are summed."""
+        if len(raters) != len(ratees):
+            raise ValueError("raters and ratees must have the same length.")
+        weights = np.ones(len(raters)) if weights is None else np.asarray(weights, dtype=np.float64)
+        self._pending.append((self._node_ids(raters), self._node_ids(ratees), weights))
+        self._transition = None
+
+    def remove_ratings(self, raters, ratees):
+        """Delete the given rater -> ratee edges; unknown edges are ignored."""
+        self._materialize()
+        rows = np.array([self._ids.get(rater, -1) for rater in raters], dtype=np.int64)
+        cols = np.array([self._ids.get(ratee, -1) for ratee in ratees], dtype=np.int64)
+        known = (rows >= 0) & (cols >= 0)
+        rows, cols = rows[known], cols[known]
+        if not len(rows):
+            return
+        current = np.asarray(self._matrix[rows, cols]).ravel()
+        n = len(self._entities)
+        self._matrix = self._matrix - sp.csr_matrix((current, (rows, cols)), shape=(n, n))
+        self._matrix.eliminate_zeros()
+        self._transition = None
+
+    def _materialize(self):
+        """Merge buffered ratings into the CSR matrix."""
+        n = len(self._entities)
+        if self._matrix.shape != (n, n):
+            self._matrix.resize((n, n))
+        if self._pending:
+            rows = np.concatenate([rows for rows, _, _ in self._pending])
+            cols = np.concatenate([cols for _, cols, _ in self._pending])
+            weights = np.concatenate([weights for _, _, weights in self._pending])
+            self._matrix = (self._matrix + sp.csr_matrix((weights, (rows, cols)), shape=(n, n))).tocsr()
+            self._pending = []
+
+    def _prepare(self):
+        """Build the transposed, row-normalized transition matrix if edges changed."""
+        if self._transition is not None:
+            return
+        self._materialize()
+        local = self._matrix.copy()
+        np.maximum(local.data, 0.0, out=local.data)  # EigenTrust ignores negative local trust
+        row_sums = np.asarray(local.sum(axis=1)).ravel()
+        self._dangling = row_sums <= 0
+        inverse = np.divide(1.0, row_sums, out=np.zeros_like(row_sums), where=~self._dangling)
+        self._transition = (sp.diags(inverse) @ local).T.tocsr()
+
+    def _personalization_vector(self, personalization) -> np.ndarray:
+        n = len(self._entities)
+        if personalization is None:
+            return np.full(n, 1.0 / n)
+        if isinstance(personalization, dict):
+            vector = np.zeros(n)
+            for entity, weight in personalization.items():
+                node = self._ids.get(entity)
+                if node is None:
+                    logging.warning("Personalization entity %s is not in the trust graph.", entity)
+                else:
+                    vector[node] = weight
+        else:
+            vector = np.asarray(personalization, dtype=np.float64)
+            if vector.shape != (n,):
+                raise ValueError("Personalization vector length must match the number of entities.")
+        if (vector < 0).any() or vector.sum() <= 0:
+            raise ValueError("Personalization weights must be non-negative with a positive sum.")
+        return vector / vector.sum()
+
+    def compute(self, personalization=None, tol: float = None, max_iter: int = None,
+                warm_start: bool = True) -> np.ndarray:
+        """Compute global trust by power iteration. Returns the trust vector (sums to 1).
+
+        personalization may be None (uniform), a dict of entity -> pre-trust
+        weight or an array indexed like the graph's entities.
+        """
+        tol = self.tol if tol is None else tol
+        max_iter = self.max_iter if max_iter is None else max_iter
+        n = len(self._entities)
+        if n == 0:
+            self.trust = np.zeros(0)
+            return self.trust
+        self._prepare()
+        p = self._personalization_vector(personalization)
+        if warm_start and self.trust is not None and len(self.trust):
+            t = np.concatenate([self.trust, p[len(self.trust):]])
+            t /= t.sum()
+        else:
+            t = p.copy()
+        delta = np.inf
+        for iteration in range(1, max_iter + 1):
+            updated = self.damping * (self._transition @ t + t[self._dangling].sum() * p) + (1.0 - self.damping) * p
+            delta = np.abs(updated - t).sum()
+            t = updated
+            if delta < tol:
+                break
+        self.trust = t
+        self.iterations = iteration
+        if delta >= tol:
+            logging.warning("Trust computation did not converge in %d iterations (delta %.3g).", iteration, delta)
+        else:
+            logging.info("Trust computation converged in %d iterations.", iteration)
+        return t
+
+    def trust_of(self, entity):
+        """Global trust of an entity from the last computation, or None."""
+        node = self._ids.get(entity)
+        if node is None or self.trust is None or node >= len(self.trust):
+            return None
+        return float(self.trust[node])
+
+    def get_all_trust(self) -> pd.DataFrame:
+        """Global trust from the last computation as an ('entity', 'trust') DataFrame."""
+        trust = self.trust if self.trust is not None else np.zeros(0)
+        return pd.DataFrame({'entity': self._entities[:len(trust)], 'trust': trust})
@@ -1,11 +1,17 @@
 # src/core/risk_assessment/__init__.py
 
 import logging
+import pandas as pd
 
 from .risk_analyzer import RiskAnalyzer
 from .anomaly_detection import AnomalyDetector
+from .batching import PredictionBatcher
+from .compiled_model import CompiledRiskModel, CompiledAnomalyModel
+from .model_registry import ModelRegistry
+from .streaming_detection import StreamingAnomalyDetector
 
-__all__ = ['RiskAnalyzer', 'AnomalyDetector']
+__all__ = ['RiskAnalyzer', 'AnomalyDetector', 'PredictionBatcher', 'CompiledRiskModel', 'CompiledAnomalyModel',
+           'ModelRegistry', 'StreamingAnomalyDetector']
 
 # Set up logging for the risk assessment module
 logging.basicConfig(
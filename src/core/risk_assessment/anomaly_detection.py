@@ -3,9 +3,11 @@
 import numpy as np
 import pandas as pd
 import logging
-from sklearn.ensemble import IsolationForest, LocalOutlierFactor
+from sklearn.ensemble import IsolationForest
+from sklearn.neighbors import LocalOutlierFactor
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import classification_report, confusion_matrix
+from .streaming_detection import StreamingAnomalyDetector
 
 class AnomalyDetector:
     """Class for detecting anomalies in data using various algorithms."""
@@ -22,20 +24,45 @@ class AnomalyDetector:
             return IsolationForest(contamination=0.05, random_state=42)
         elif self.model_type == 'LocalOutlierFactor':
             return LocalOutlierFactor(n_neighbors=20)
+        elif self.model_type == 'Streaming':
+            return StreamingAnomalyDetector(contamination=0.05, random_state=42)
         else:
             logging.error("Unsupported model type: %s", self.model_type)
             raise ValueError(f"Unsupported model type: {self.model_type}")
 
+    def _scale(self, data, fit=False):
+        if self.model_type == 'Streaming':
+            return data  # Standardizes internally, so single events skip the scaler
+        return self.scaler.fit_transform(data) if fit else self.scaler.transform(data)
+
     def fit(self, data):
         """Fit the anomaly detection model to the data."""
-        scaled_data = self.scaler.fit_transform(data)
+        scaled_data = self._scale(data, fit=True)
         self.model.fit(scaled_data)
         logging.info("Anomaly detection model fitted to data.")
 
+    def _streaming_model(self):
+        if self.model_type != 'Streaming':
+            logging.error("Per-event scoring is only supported for the Streaming model.")
+            raise ValueError("Per-event scoring is only supported for the Streaming model.")
+        return self.model
+
+    def score_one(self, event):
+        """Anomaly score of a single event (Streaming model; higher is more anomalous)."""
+        return self._streaming_model().score_one(event)
+
+    def update(self, event):
+        """Add a single event to the Streaming model's window."""
+        self._streaming_model().update(event)
+
+    def score_and_update(self, event):
+        """Score a single event, then add it to the Streaming model's window."""
+        return self._streaming_model().score_and_update(event)
+
     def detect_anomalies(self, new_data):
         """Detect anomalies in new data."""
-        scaled_data = self.scaler.transform(new_data)
-        if self.model_type == 'IsolationForest':
+        scaled_data = self._scale(new_data)
+        if self.model_type in ('IsolationForest', 'Streaming'):
             predictions = self.model.predict(scaled_data)
             anomalies = np.where(predictions == -1, True, False)
         elif self.model_type == 'LocalOutlierFactor':
@@ -50,9 +77,11 @@ class AnomalyDetector:
 
     def get_anomaly_scores(self, new_data):
         """Get anomaly scores for new data."""
-        scaled_data = self.scaler.transform(new_data)
+        scaled_data = self._scale(new_data)
         if self.model_type == 'IsolationForest':
             scores = self.model.decision_function(scaled_data)
+        elif self.model_type == 'Streaming':
+            scores = self.model.score_samples(scaled_data)
         elif self.model_type == 'LocalOutlierFactor':
             scores = -self.model.negative_outlier_factor_
         else:
@@ -80,23 +109,26 @@ class AnomalyDetector:
         best_contamination = None
         best_score = -np.inf
 
-        for contamination in contamination_range:
-            model = IsolationForest(contamination=contamination, random_state=42)
-            scaled_data = self.scaler.fit_transform(data)
-            model.fit(scaled_data)
+        # Contamination only sets the score threshold (offset_), not the trees, so
+        # the data is scaled and one forest fitted once for the whole range.
+        scaled_data = self.scaler.fit_transform(data)
+        model = IsolationForest(contamination='auto', random_state=42).fit(scaled_data)
+        sample_scores = model.score_samples(scaled_data)
 
-            # Evaluate the model using cross-validation
-            predictions = model.predict(scaled_data)
-            score = np.mean(predictions == -1)  # Proportion of detected anomalies
+        for contamination in contamination_range:
+            offset = np.percentile(sample_scores, 100.0 * contamination)
+            score = np.mean(sample_scores < offset)  # Proportion of detected anomalies
 
             if score > best_score:
                 best_score = score
                 best_contamination = contamination
+                best_offset = offset
 
         logging.info("Hyperparameter tuning completed.")
         logging.info("Best Contamination: %.2f", best_contamination)
         logging.info("Best Score: %.2f", best_score)
 
-        # Update the model with the best contamination
-        self.model = IsolationForest(contamination=best_contamination, random_state=42)
-        self.fit(data)  # Re-fit the model with the best contamination
+        # Reuse the fitted forest with the best contamination's threshold
+        model.set_params(contamination=best_contamination)
+        model.offset_ = best_offset
+        self.model = model
@@ -0,0 +1,168 @@
+# src/core/risk_assessment/batching.py
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+import pandas as pd
+
+_STOP = object()
+
+class PredictionBatcher:
+    """Coalesces concurrent predict_risk requests into vectorized batches.
+
+    Callers submit one row (or a small block of rows) and get a Future. A
+    worker thread takes the first waiting request, keeps collecting until
+    max_batch_size rows are queued or max_delay seconds have passed, then
+    runs a single scaler transform + predict over the whole batch and
+    resolves each caller's Future with its slice of the predictions. A
+    request therefore waits at most max_delay plus one batch's inference.
+
+    When the model was fitted on named columns, DataFrame blocks are
+    reordered to those columns and array blocks are taken to be in that
+    order, so a batch mixing both keeps its feature names. If a batch
+    fails, each block is retried on its own so that a malformed request
+    only fails its own caller's Future.
+    """
+
+    def __init__(self, analyzer, max_batch_size: int = 64, max_delay: float = 0.002):
+        self.analyzer = analyzer
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.batches = 0  # batches run so far
+        self._requests = queue.SimpleQueue()
+        self._closed = False
+        self._lock = threading.Lock()  # Orders submit() against close(), so nothing is queued behind the stop marker
+        self._worker = threading.Thread(target=self._run, name='prediction-batcher', daemon=True)
+        self._worker.start()
+        logging.info("PredictionBatcher started (max batch %d, max delay %.1f ms).", max_batch_size, max_delay * 1000)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @staticmethod
+    def _as_block(rows):
+        """A request as a 2-D block plus its row count."""
+        if isinstance(rows, pd.DataFrame):
+            return rows, len(rows)
+        if isinstance(rows, pd.Series):
+            return rows.to_frame().T, 1
+        block = np.asarray(rows, dtype=float)
+        if block.ndim == 1:
+            block = block.reshape(1, -1)
+        return block, len(block)
+
+    def submit(self, rows) -> Future:
+        """Queue one row (1-D) or a block of rows; the Future resolves to their predictions."""
+        future = Future()
+        block, count = self._as_block(rows)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("PredictionBatcher is closed.")
+            self._requests.put((block, count, future))
+        return future
+
+    def predict(self, rows, timeout: float = None):
+        """Submit and wait for the predictions."""
+        return self.submit(rows).result(timeout)
+
+    def _collect(self, first):
+        batch = [first]
+        rows = first[1]
+        deadline = time.monotonic() + self.max_delay
+        while rows < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self._requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if request is _STOP:
+                self._requests.put(_STOP)  # Finish this batch, stop on the next loop
+                break
+            batch.append(request)
+            rows += request[1]
+        return batch
+
+    def _run(self):
+        while True:
+            request = self._requests.get()
+            if request is _STOP:
+                self._reject_pending()
+                return
+            batch = self._collect(request)
+            live = [request for request in batch if request[2].set_running_or_notify_cancel()]
+            if not live:
+                continue
+            analyzer = self.analyzer  # Read once, so a model swapped mid-batch applies from the next batch
+            feature_names = self._feature_names(analyzer)
+            try:
+                data = self._stack([block for block, _, _ in live], feature_names)
+                predictions = analyzer.predict_risk(data)
+            except Exception as e:
+                if len(live) == 1:
+                    logging.error("Batched prediction failed: %s", str(e))
+                    live[0][2].set_exception(e)
+                else:
+                    logging.warning("Batched prediction failed, retrying %d requests one by one: %s", len(live), str(e))
+                    self._run_each(live, analyzer, feature_names)
+                continue
+            self.batches += 1
+            start = 0
+            for _, count, future in live:
+                future.set_result(predictions[start:start + count])
+                start += count
+
+    def _run_each(self, requests, analyzer, feature_names):
+        """Predict each request on its own, so errors reach only the request that caused them."""
+        for block, _, future in requests:
+            try:
+                future.set_result(analyzer.predict_risk(self._stack([block], feature_names)))
+            except Exception as e:
+                logging.error("Prediction failed: %s", str(e))
+                future.set_exception(e)
+
+    @staticmethod
+    def _feature_names(analyzer):
+        """Column order the model was fitted on (RiskAnalyzer or compiled model), or None."""
+        names = getattr(analyzer, 'feature_names', None)
+        if names is None:
+            names = getattr(getattr(analyzer, 'scaler', None), 'feature_names_in_', None)
+        return list(names) if names is not None else None
+
+    @staticmethod
+    def _stack(blocks, feature_names):
+        """One 2-D input for a batch, with every block in the model's column order."""
+        if feature_names is None:
+            if all(isinstance(block, pd.DataFrame) for block in blocks):
+                return pd.concat(blocks, ignore_index=True)
+            return np.vstack([np.asarray(block, dtype=float) for block in blocks])
+        values = [block[feature_names].to_numpy(dtype=float) if isinstance(block, pd.DataFrame) else block
+                  for block in blocks]
+        return pd.DataFrame(np.vstack(values), columns=feature_names)
+
+    def _reject_pending(self):
+        """Fail any requests still queued behind the stop marker."""
+        while True:
+            try:
+                request = self._requests.get_nowait()
+            except queue.Empty:
+                return
+            if request is not _STOP and request[2].set_running_or_notify_cancel():
+                request[2].set_exception(RuntimeError("PredictionBatcher is closed."))
+
+    def close(self, wait: bool = True):
+        """Stop accepting requests; queued requests are still served."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._requests.put(_STOP)
+        if wait:
+            self._worker.join()
@@ -0,0 +1,280 @@
+# src/core/risk_assessment/compiled_model.py
+
+import logging
+import numpy as np
+
+ROW_CHUNK = 2048  # Rows traversed at once; bounds the (rows x trees) index matrix
+
+def _scaler_arrays(scaler, n_features):
+    mean = scaler.mean_ if scaler.with_mean else np.zeros(n_features)
+    scale = scaler.scale_ if scaler.with_std else np.ones(n_features)
+    return np.asarray(mean, dtype=np.float64), np.asarray(scale, dtype=np.float64)
+
+def _flatten_trees(trees, feature_maps=None) -> dict:
+    """Concatenate sklearn Tree objects into shared node arrays with per-tree root offsets.
+
+    Leaves become self-loops. feature_maps optionally maps each tree's local
+    feature indices to input columns (for trees fitted on feature subsets).
+    """
+    sizes = [tree.node_count for tree in trees]
+    roots = np.zeros(len(trees), dtype=np.int32)
+    roots[1:] = np.cumsum(sizes)[:-1]
+    features = []
+    for i, tree in enumerate(trees):
+        local = np.maximum(tree.feature, 0)
+        features.append(local if feature_maps is None else np.asarray(feature_maps[i])[local])
+    threshold64 = np.concatenate([tree.threshold for tree in trees])
+    threshold = threshold64.astype(np.float32)
+    above = threshold.astype(np.float64) > threshold64
+    threshold[above] = np.nextafter(threshold[above], np.float32(-np.inf))
+    return {
+        'roots': roots,
+        'feature': np.concatenate(features).astype(np.int32),
+        'threshold': threshold,
+        'left': np.concatenate([np.where(tree.children_left < 0, np.arange(tree.node_count), tree.children_left) + root
+                                for tree, root in zip(trees, roots)]).astype(np.int32),
+        'right': np.concatenate([np.where(tree.children_right < 0, np.arange(tree.node_count), tree.children_right) + root
+                                 for tree, root in zip(trees, roots)]).astype(np.int32),
+        'missing_left': np.concatenate([np.asarray(getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count)),
+                                                   dtype=bool) for tree in trees]),
+    }
+
+class CompiledTrees:
+    """Shared storage and batched traversal for tree ensembles flattened into NumPy arrays.
+
+    All trees share one set of node arrays (feature, threshold, left/right
+    child, missing-value direction) with per-tree root offsets. A batch
+    walks all (tree, row) pairs in lockstep, one level per step, dropping
+    pairs as they reach a leaf, so there is no per-node Python and the
+    work is the total path length. Inputs are scaled in float64 and cast
+    to float32 as sklearn does, and thresholds are stored as the largest
+    float32 not above sklearn's float64 threshold, which gives the same
+    decision for any float32 input. Prediction needs only NumPy.
+
+    This is meant for online serving: per call overhead is a fraction of
+    sklearn's, but for bulk scoring of thousands of rows sklearn's compiled
+    traversal is faster, so offline jobs should keep using sklearn.
+    """
+
+    ARRAY_NAMES = ('mean', 'scale', 'roots', 'feature', 'threshold', 'left', 'right', 'missing_left')
+
+    def __init__(self, arrays, metadata):
+        for name in self.ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+        self.metadata = dict(metadata)
+        self.feature_names = metadata.get('feature_names')
+        self.n_trees = len(self.roots)
+        self._is_leaf = self.left == np.arange(len(self.left))  # Leaves are stored as self-loops
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, name).nbytes for name in self.ARRAY_NAMES)
+
+    def to_arrays(self) -> tuple:
+        """The arrays plus JSON-serializable metadata, e.g. for saving with numpy."""
+        return {name: getattr(self, name) for name in self.ARRAY_NAMES}, dict(self.metadata)
+
+    @classmethod
+    def from_arrays(cls, arrays, metadata):
+        return cls(arrays, metadata)
+
+    def _scaled(self, data) -> np.ndarray:
+        if self.feature_names is not None and hasattr(data, 'columns'):
+            data = data[self.feature_names]
+        X = np.asarray(data, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != len(self.mean):
+            raise ValueError(f"Expected {len(self.mean)} features, got {X.shape[1]}.")
+        return ((X - self.mean) / self.scale).astype(np.float32)
+
+    def _leaves(self, X) -> np.ndarray:
+        """Leaf node index per (tree, row)."""
+        has_nan = bool(np.isnan(X).any())
+        flat_X = X.ravel()
+        nodes = np.repeat(self.roots, len(X))  # Pair i is tree i // rows, row i % rows; keeps each tree's nodes hot
+        active = np.flatnonzero(~self._is_leaf[nodes])
+        current = nodes[active]
+        row_offsets = (active % len(X)) * X.shape[1]
+        while active.size:
+            x = flat_X[row_offsets + self.feature[current]]
+            go_left = x <= self.threshold[current]
+            if has_nan:
+                go_left = np.where(np.isnan(x), self.missing_left[current], go_left)
+            current = np.where(go_left, self.left[current], self.right[current])
+            done = self._is_leaf[current]
+            if done.any():
+                nodes[active[done]] = current[done]
+                keep = ~done
+                active, current, row_offsets = active[keep], current[keep], row_offsets[keep]
+        return nodes.reshape(self.n_trees, len(X))
+
+    def _accumulate(self, X) -> np.ndarray:
+        raise ValueError(f"{type(self).__name__} stores trees but has no prediction rule; "
+                         "load it as a CompiledRiskModel or CompiledAnomalyModel.")
+
+    def _chunked(self, data) -> np.ndarray:
+        X = self._scaled(data)
+        return np.concatenate([self._accumulate(X[start:start + ROW_CHUNK])
+                               for start in range(0, max(len(X), 1), ROW_CHUNK)])[:len(X)]
+
+class CompiledRiskModel(CompiledTrees):
+    """A fitted RiskAnalyzer (RandomForest or GradientBoosting) as a CompiledTrees model.
+
+    Leaf values keep float64 and are accumulated in sklearn's tree order,
+    so predictions match RiskAnalyzer.predict_risk exactly.
+    """
+
+    ARRAY_NAMES = CompiledTrees.ARRAY_NAMES + ('values', 'classes', 'baseline')
+
+    def __init__(self, arrays, metadata):
+        super().__init__(arrays, metadata)
+        self.kind = metadata['kind']  # 'forest' (averaged class probabilities) or 'boosting' (summed raw scores)
+        self.learning_rate = float(metadata['learning_rate'])
+
+    @classmethod
+    def from_analyzer(cls, analyzer) -> 'CompiledRiskModel':
+        """Compile a trained RiskAnalyzer."""
+        import sklearn  # Only the export step touches sklearn objects
+        model = analyzer.model
+        if analyzer.model_type not in ('RandomForest', 'GradientBoosting'):
+            raise ValueError(f"Cannot compile {type(model).__name__} ({analyzer.model_type}) models; "
+                             "only RandomForest and GradientBoosting are supported.")
+        if not hasattr(model, 'estimators_'):
+            raise ValueError("The model must be trained before it can be compiled.")
+
+        if analyzer.model_type == 'RandomForest':
+            kind, learning_rate = 'forest', 1.0
+            trees = [estimator.tree_ for estimator in model.estimators_]
+            n_classes = len(model.classes_)
+            # sklearn >= 1.4 stores class fractions in tree_.value; older versions store counts.
+            normalize = tuple(int(part) for part in sklearn.__version__.split('.')[:2]) < (1, 4)
+            leaf_values = []
+            for tree in trees:
+                proba = tree.value[:, 0, :n_classes].astype(np.float64)
+                if normalize:
+                    normalizer = proba.sum(axis=1)[:, np.newaxis]
+                    normalizer[normalizer == 0.0] = 1.0
+                    proba = proba / normalizer
+                leaf_values.append(proba)
+            baseline = np.zeros(0)
+        else:
+            kind, learning_rate = 'boosting', model.learning_rate
+            if not (model.init_ == 'zero' or type(model.init_).__name__ == 'DummyClassifier'):
+                raise ValueError("Only constant (default or 'zero') init estimators can be compiled, "
+                                 f"got {type(model.init_).__name__}.")
+            # estimators_ is (stages, trees per stage); flattened row-major to keep sklearn's summation order
+            trees = [estimator.tree_ for estimator in model.estimators_.ravel()]
+            leaf_values = [tree.value[:, 0, :1].astype(np.float64) for tree in trees]
+            baseline = model._raw_predict_init(np.zeros((1, model.n_features_in_)))[0].astype(np.float64)
+
+        arrays = _flatten_trees(trees)
+        arrays['mean'], arrays['scale'] = _scaler_arrays(analyzer.scaler, model.n_features_in_)
+        arrays['values'] = np.concatenate(leaf_values)
+        arrays['classes'] = np.asarray(model.classes_)
+        arrays['baseline'] = baseline
+        feature_names = getattr(analyzer.scaler, 'feature_names_in_', None)
+        compiled = cls(arrays, {'kind': kind, 'learning_rate': float(learning_rate),
+                                'feature_names': list(feature_names) if feature_names is not None else None})
+        logging.info("Compiled %d trees (%d nodes, %.1f MB) for %s.", len(trees), len(arrays['feature']),
+                     compiled.nbytes / 1e6, analyzer.model_type)
+        return compiled
+
+    def _accumulate(self, X) -> np.ndarray:
+        """Averaged class probabilities (forest) or raw scores (boosting) for scaled rows."""
+        leaves = self._leaves(X)
+        if self.kind == 'forest':
+            total = np.zeros((len(X), self.values.shape[1]))
+            for tree in range(self.n_trees):
+                total += self.values[leaves[tree]]
+            return total / self.n_trees
+        total = np.tile(self.baseline, (len(X), 1))
+        per_stage = len(self.baseline)
+        for tree in range(self.n_trees):
+            total[:, tree % per_stage] += self.learning_rate * self.values[leaves[tree], 0]
+        return total
+
+    def decision(self, data) -> np.ndarray:
+        """Class probabilities (forest) or raw decision scores (boosting)."""
+        return self._chunked(data)
+
+    def predict(self, data) -> np.ndarray:
+        """Predicted classes, identical to RiskAnalyzer.predict_risk."""
+        scores = self.decision(data)
+        if self.kind == 'forest':
+            return self.classes.take(np.argmax(scores, axis=1), axis=0)
+        if scores.shape[1] == 1:
+            return self.classes[(scores[:, 0] >= 0).astype(int)]
+        return self.classes[np.argmax(scores, axis=1)]
+
+    def predict_risk(self, data) -> np.ndarray:
+        """Alias of predict, so a compiled model can stand in for a RiskAnalyzer when serving."""
+        return self.predict(data)
+
+class CompiledAnomalyModel(CompiledTrees):
+    """A fitted IsolationForest AnomalyDetector as a CompiledTrees model.
+
+    Each leaf stores its isolation depth (path length plus the expected
+    remaining depth for its sample count), so scores and anomaly flags
+    match AnomalyDetector.get_anomaly_scores/detect_anomalies exactly.
+    """
+
+    ARRAY_NAMES = CompiledTrees.ARRAY_NAMES + ('leaf_depths',)
+
+    def __init__(self, arrays, metadata):
+        super().__init__(arrays, metadata)
+        self.offset = float(metadata['offset'])
+        self.denominator = float(metadata['denominator'])
+
+    @classmethod
+    def from_detector(cls, detector) -> 'CompiledAnomalyModel':
+        """Compile a fitted IsolationForest AnomalyDetector."""
+        from sklearn.ensemble._iforest import _average_path_length
+        model = detector.model
+        if detector.model_type != 'IsolationForest':
+            raise ValueError(f"Only IsolationForest detectors can be compiled, got {detector.model_type}.")
+        if not hasattr(model, 'estimators_'):
+            raise ValueError("The model must be fitted before it can be compiled.")
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        leaf_depths = []
+        for i, tree in enumerate(trees):
+            if hasattr(model, '_decision_path_lengths'):
+                path_lengths = model._decision_path_lengths[i]
+                average_path_lengths = model._average_path_length_per_tree[i]
+            else:
+                path_lengths = tree.compute_node_depths()
+                average_path_lengths = _average_path_length(tree.n_node_samples)
+            leaf_depths.append(path_lengths + average_path_lengths - 1.0)
+        arrays = _flatten_trees(trees, model.estimators_features_)
+        arrays['mean'], arrays['scale'] = _scaler_arrays(detector.scaler, model.n_features_in_)
+        arrays['leaf_depths'] = np.concatenate(leaf_depths).astype(np.float64)
+        feature_names = getattr(detector.scaler, 'feature_names_in_', None)
+        metadata = {
+            'offset': float(model.offset_),
+            'denominator': float(len(trees) * _average_path_length([model._max_samples])[0]),
+            'feature_names': list(feature_names) if feature_names is not None else None,
+        }
+        compiled = cls(arrays, metadata)
+        logging.info("Compiled %d isolation trees (%d nodes, %.1f MB).", len(trees), len(arrays['feature']),
+                     compiled.nbytes / 1e6)
+        return compiled
+
+    def _accumulate(self, X) -> np.ndarray:
+        leaves = self._leaves(X)
+        depths = np.zeros(len(X))
+        for tree in range(self.n_trees):
+            depths += self.leaf_depths[leaves[tree]]
+        return depths
+
+    def get_anomaly_scores(self, data) -> np.ndarray:
+        """IsolationForest decision_function values (negative means anomalous)."""
+        depths = self._chunked(data)
+        if self.denominator != 0:
+            scores = 2 ** -(depths / self.denominator)
+        else:
+            scores = 2 ** -np.ones_like(depths)  # A single training sample scores 0.5, as in sklearn
+        return -scores - self.offset
+
+    def detect_anomalies(self, data) -> np.ndarray:
+        """Boolean anomaly flags, identical to AnomalyDetector.detect_anomalies."""
+        return self.get_anomaly_scores(data) < 0
@@ -0,0 +1,203 @@
+# src/core/risk_assessment/model_registry.py
+
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import numpy as np
+from .compiled_model import CompiledTrees, CompiledRiskModel, CompiledAnomalyModel
+
+COMPILED_TYPES = {cls.__name__: cls for cls in (CompiledRiskModel, CompiledAnomalyModel)}
+ACTIVE_FILE = 'ACTIVE'
+
+def compile_model(model) -> CompiledTrees:
+    """Compile a trained RiskAnalyzer or IsolationForest AnomalyDetector (compiled models pass through)."""
+    if isinstance(model, CompiledTrees):
+        return model
+    if hasattr(model, 'predict_risk'):
+        return CompiledRiskModel.from_analyzer(model)
+    if hasattr(model, 'detect_anomalies'):
+        return CompiledAnomalyModel.from_detector(model)
+    raise ValueError(f"Cannot compile model of type {type(model).__name__}")
+
+class ModelRegistry:
+    """Versioned on-disk store of compiled models with atomic activation.
+
+    Each version is a directory of .npy arrays plus meta.json (and,
+    optionally, the original object as source.joblib for retraining).
+    Arrays are opened with mmap_mode='r', so loading takes milliseconds and
+    every worker process serving the same version shares one page-cache
+    copy. Versions are written to a temporary directory and renamed into
+    place, so readers never see a partial version.
+
+    activate() loads a version and swaps the live model reference in one
+    assignment; callers take the reference once per request (get() or
+    predict()), so in-flight predictions finish on the model they started
+    with. The active version is also recorded in an ACTIVE file that other
+    processes pick up with refresh().
+
+    Published RiskAnalyzer/AnomalyDetector objects are never modified by an
+    activation. Code serving predictions should go through get()/predict(),
+    or hold a consumer that follows swaps: subscribe() calls back with each
+    newly live model, and batcher() returns a PredictionBatcher whose model
+    is replaced on every activate() or refresh().
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._live = {}  # name -> (version, compiled model)
+        self._subscribers = {}  # name -> callbacks taking the newly live model
+        self._lock = threading.Lock()
+        # Held across each swap and its callbacks, so subscribers see activations in the order they
+        # became live; reentrant so a callback may itself activate a model.
+        self._swap_lock = threading.RLock()
+
+    def _model_dir(self, name: str) -> str:
+        if not re.fullmatch(r'[A-Za-z0-9_.-]+', name) or name.startswith('.'):
+            raise ValueError(f"Invalid model name: {name!r}")
+        return os.path.join(self.directory, name)
+
+    def _version_dir(self, name: str, version: int) -> str:
+        return os.path.join(self._model_dir(name), f"v{version:06d}")
+
+    def versions(self, name: str) -> list:
+        """Published versions of a model, oldest first."""
+        model_dir = self._model_dir(name)
+        if not os.path.isdir(model_dir):
+            return []
+        return sorted(int(entry[1:]) for entry in os.listdir(model_dir) if re.fullmatch(r'v\d{6}', entry))
+
+    def publish(self, name: str, model, include_source: bool = True) -> int:
+        """Compile and store a new version of a model; returns its version number."""
+        compiled = compile_model(model)
+        arrays, metadata = compiled.to_arrays()
+        model_dir = self._model_dir(name)
+        os.makedirs(model_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.staging-', dir=model_dir)
+        text_arrays = []  # Object arrays of strings (e.g. class labels), stored as fixed-width '<U'
+        try:
+            for array_name, array in arrays.items():
+                if array.dtype == object:
+                    if not all(isinstance(value, str) for value in array.ravel()):
+                        raise ValueError(f"Array '{array_name}' has object dtype and cannot be memory-mapped.")
+                    array = array.astype(str)
+                    text_arrays.append(array_name)
+                np.save(os.path.join(staging, f"{array_name}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+            if include_source and not isinstance(model, CompiledTrees):
+                import joblib
+                joblib.dump(model, os.path.join(staging, 'source.joblib'))
+            with open(os.path.join(staging, 'meta.json'), 'w') as f:
+                json.dump({'type': type(compiled).__name__, 'metadata': metadata,
+                           'arrays': sorted(arrays), 'text_arrays': text_arrays, 'created': time.time()}, f)
+            while True:  # Another process may claim the same number first
+                version = (self.versions(name) or [0])[-1] + 1
+                try:
+                    os.rename(staging, self._version_dir(name, version))
+                    break
+                except OSError:
+                    if not os.path.isdir(self._version_dir(name, version)):
+                        raise
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        logging.info("Published %s version %d (%.1f MB).", name, version, compiled.nbytes / 1e6)
+        return version
+
+    def load(self, name: str, version: int = None, mmap: bool = True) -> CompiledTrees:
+        """Open a stored version (the latest by default) as a compiled model."""
+        version = version if version is not None else (self.versions(name) or [None])[-1]
+        if version is None:
+            raise KeyError(f"No versions published for {name}")
+        version_dir = self._version_dir(name, version)
+        with open(os.path.join(version_dir, 'meta.json')) as f:
+            meta = json.load(f)
+        arrays = {array_name: np.load(os.path.join(version_dir, f"{array_name}.npy"),
+                                      mmap_mode='r' if mmap else None, allow_pickle=False)
+                  for array_name in meta['arrays']}
+        for array_name in meta.get('text_arrays', []):
+            arrays[array_name] = arrays[array_name].astype(object)  # Labels come back as Python str, as published
+        return COMPILED_TYPES[meta['type']].from_arrays(arrays, meta['metadata'])
+
+    def load_source(self, name: str, version: int):
+        """The original RiskAnalyzer/AnomalyDetector stored with a version."""
+        import joblib
+        return joblib.load(os.path.join(self._version_dir(name, version), 'source.joblib'))
+
+    def activate(self, name: str, version: int = None) -> int:
+        """Make a version (the latest by default) the live model for name; returns the version."""
+        version = version if version is not None else (self.versions(name) or [None])[-1]
+        if version is None:
+            raise KeyError(f"No versions published for {name}")
+        self._swap(name, version)
+        active_path = os.path.join(self._model_dir(name), ACTIVE_FILE)
+        with open(active_path + '.tmp', 'w') as f:
+            f.write(str(version))
+        os.replace(active_path + '.tmp', active_path)
+        logging.info("Activated %s version %d.", name, version)
+        return version
+
+    def _swap(self, name, version):
+        model = self.load(name, version)  # Loaded before the swap, so callers never wait on I/O
+        with self._swap_lock:
+            with self._lock:
+                self._live[name] = (version, model)
+                callbacks = list(self._subscribers.get(name, ()))
+            for callback in callbacks:
+                callback(model)
+
+    def subscribe(self, name: str, callback):
+        """Call callback(model) with the live model for name now (if any) and after every activation or refresh."""
+        with self._swap_lock:
+            with self._lock:
+                self._subscribers.setdefault(name, []).append(callback)
+                live = self._live.get(name)
+            if live is not None:
+                callback(live[1])
+
+    def batcher(self, name: str, **options):
+        """A PredictionBatcher serving the live risk model for name and following later activations."""
+        from .batching import PredictionBatcher
+        batcher = PredictionBatcher(self.get(name), **options)
+        self.subscribe(name, lambda model: setattr(batcher, 'analyzer', model))
+        return batcher
+
+    def active_version(self, name: str):
+        """Version recorded in the ACTIVE file, or None."""
+        try:
+            with open(os.path.join(self._model_dir(name), ACTIVE_FILE)) as f:
+                return int(f.read())
+        except FileNotFoundError:
+            return None
+
+    def refresh(self, name: str) -> bool:
+        """Follow an activation made by another process. Returns True if the live model changed."""
+        version = self.active_version(name)
+        live = self._live.get(name)
+        if version is None or (live is not None and live[0] == version):
+            return False
+        self._swap(name, version)
+        logging.info("Switched %s to version %d.", name, version)
+        return True
+
+    def live_version(self, name: str):
+        live = self._live.get(name)
+        return live[0] if live is not None else None
+
+    def get(self, name: str) -> CompiledTrees:
+        """The live model for name."""
+        live = self._live.get(name)
+        if live is None:
+            raise KeyError(f"No active version for {name}")
+        return live[1]
+
+    def predict(self, name: str, data) -> np.ndarray:
+        """Risk predictions or anomaly flags from the live model."""
+        model = self.get(name)
+        if isinstance(model, CompiledAnomalyModel):
+            return model.detect_anomalies(data)
+        return model.predict(data)
@@ -3,8 +3,10 @@
 import numpy as np
 import pandas as pd
 import logging
+from sklearn.base import clone
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.model_selection import train_test_split, GridSearchCV
+from sklearn.linear_model import SGDClassifier
+from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix
 from sklearn.preprocessing import StandardScaler
 
@@ -23,6 +25,8 @@ class RiskAnalyzer:
             return RandomForestClassifier(n_estimators=100, random_state=42)
         elif self.model_type == 'GradientBoosting':
             return GradientBoostingClassifier(n_estimators=100, random_state=42)
+        elif self.model_type == 'SGD':
+            return SGDClassifier(loss='log_loss', random_state=42)
         else:
             logging.error("Unsupported model type: %s", self.model_type)
             raise ValueError(f"Unsupported model type: {self.model_type}")
@@ -47,6 +51,67 @@ class RiskAnalyzer:
         logging.info("Classification Report:\n%s", report)
         logging.info("Confusion Matrix:\n%s", cm)
 
+    def train_model_streaming(self, source, target_column, chunksize=50000, holdout_fraction=0.2, epochs=1,
+                              classes=None):
+        """Train out of core on a CSV/Parquet file (or chunk factory) read chunksize rows at a time.
+
+        Needs an incremental model (model_type='SGD', or any model with
+        partial_fit). One pass fits the scaler from partial statistics, each
+        epoch is one partial_fit pass, and a final pass scores the holdout
+        rows, so memory stays bounded by the chunk size. Returns the holdout
+        metrics.
+        """
+        from .streaming import iter_splits
+        if not hasattr(self.model, 'partial_fit'):
+            raise ValueError(f"{self.model_type} does not support incremental training; use model_type='SGD'.")
+        splits = lambda: iter_splits(source, target_column, chunksize, holdout_fraction)
+        self.scaler = StandardScaler()
+        self.model = clone(self.model)
+        seen = set()
+        train_rows = 0
+        for X_train, y_train, _, _ in splits():
+            if len(X_train):
+                self.scaler.partial_fit(X_train)
+                seen.update(np.unique(y_train).tolist())
+                train_rows += len(X_train)
+        if not train_rows:
+            raise ValueError("No training rows found in the data source.")
+        classes = np.asarray(sorted(seen) if classes is None else classes)
+
+        for epoch in range(epochs):
+            for X_train, y_train, _, _ in splits():
+                if len(X_train):
+                    self.model.partial_fit(self.scaler.transform(X_train), y_train, classes=classes)
+            logging.info("Streaming epoch %d/%d completed on %d rows.", epoch + 1, epochs, train_rows)
+
+        cm = np.zeros((len(classes), len(classes)), dtype=np.int64)
+        for _, _, X_test, y_test in splits():
+            if len(X_test):
+                cm += confusion_matrix(y_test, self.model.predict(self.scaler.transform(X_test)), labels=classes)
+        return self._streamed_evaluation(cm, classes, train_rows)
+
+    def _streamed_evaluation(self, cm, classes, train_rows):
+        """Holdout metrics from an accumulated confusion matrix."""
+        support = cm.sum(axis=1)
+        predicted = cm.sum(axis=0)
+        correct = np.diag(cm)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            precision = np.where(predicted > 0, correct / predicted, 0.0)
+            recall = np.where(support > 0, correct / support, 0.0)
+        holdout_rows = int(cm.sum())
+        metrics = {
+            'accuracy': correct.sum() / holdout_rows if holdout_rows else float('nan'),
+            'precision': dict(zip(classes.tolist(), precision.tolist())),
+            'recall': dict(zip(classes.tolist(), recall.tolist())),
+            'confusion_matrix': cm,
+            'train_rows': train_rows,
+            'holdout_rows': holdout_rows,
+        }
+        logging.info("Model evaluation completed.")
+        logging.info("Holdout accuracy: %.4f on %d rows.", metrics['accuracy'], holdout_rows)
+        logging.info("Confusion Matrix:\n%s", cm)
+        return metrics
+
     def predict_risk(self, new_data):
         """Predict risk for new data."""
         new_data_scaled = self.scaler.transform(new_data)
@@ -54,6 +119,11 @@ class RiskAnalyzer:
         logging.info("Risk predictions made for new data.")
         return predictions
 
+    def compile(self):
+        """Export the trained scaler and ensemble as a NumPy-only CompiledRiskModel."""
+        from .compiled_model import CompiledRiskModel
+        return CompiledRiskModel.from_analyzer(self)
+
     def feature_importance(self, feature_names):
         """Get feature importance from the trained model."""
         importance = self.model.feature_importances_
@@ -62,20 +132,23 @@ class RiskAnalyzer:
         logging.info("Feature importance calculated.")
         return feature_importance
 
-    def hyperparameter_tuning(self, data, target, param_grid):
-        """Perform hyperparameter tuning using GridSearchCV."""
+    def hyperparameter_tuning(self, data, target, param_grid, factor=3, max_workers=None):
+        """Perform hyperparameter tuning with a parallel successive-halving search (see HyperparameterSearch)."""
+        from .tuning import HyperparameterSearch
         X_train, X_test, y_train, y_test = train_test_split(data, target, test_size=0.2, random_state=42)
-        X_train_scaled = self.scaler.fit_transform(X_train)
 
-        grid_search = GridSearchCV(self.model, param_grid, cv=5, scoring='accuracy')
-        grid_search.fit(X_train_scaled, y_train)
+        search = HyperparameterSearch(self.model, param_grid, cv=5, scoring='accuracy', factor=factor,
+                                      max_workers=max_workers)
+        search.fit(X_train, y_train)
 
-        best_params = grid_search.best_params_
-        best_score = grid_search.best_score_
+        best_params = search.best_params_
+        best_score = search.best_score_
         logging.info("Hyperparameter tuning completed.")
         logging.info("Best Parameters: %s", best_params)
         logging.info("Best Cross-Validation Score: %.2f", best_score)
 
-        # Update the model with the best parameters
-        self.model.set_params(**best_params)
-        self.train_model(data, target)  # Re-train with the best parameters
+        # Keep the best fold's model and scaler instead of re-training
+        self.model = search.best_estimator_
+        self.scaler = search.best_scaler_
+        self.evaluate_model(X_test, y_test)
+        return best_params
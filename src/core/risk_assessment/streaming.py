@@ -0,0 +1,47 @@
+# src/core/risk_assessment/streaming.py
+
+import os
+import numpy as np
+import pandas as pd
+
+PARQUET_SUFFIXES = ('.parquet', '.pq')
+
+def iter_chunks(source, chunksize: int = 50000, columns=None):
+    """Yield a dataset as DataFrames of at most chunksize rows.
+
+    source is a CSV or Parquet path, or a callable returning a fresh iterable
+    of DataFrames (streaming training reads the data more than once).
+    Parquet files are read batch by batch and need pyarrow.
+    """
+    if callable(source):
+        yield from source()
+        return
+    path = os.fspath(source)
+    if path.lower().endswith(PARQUET_SUFFIXES):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Reading Parquet files in chunks requires pyarrow.") from e
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        with pd.read_csv(path, chunksize=chunksize, usecols=columns) as reader:
+            yield from reader
+
+def holdout_mask(row_ids: np.ndarray, fraction: float, seed: int = 42) -> np.ndarray:
+    """Deterministic per-row holdout assignment, so every pass sees the same split."""
+    with np.errstate(over='ignore'):
+        mixed = (row_ids.astype(np.uint64) + np.uint64(seed)) * np.uint64(0x9E3779B97F4A7C15)
+    return (mixed >> np.uint64(11)) < np.uint64(fraction * (1 << 53))
+
+def iter_splits(source, target_column: str, chunksize: int = 50000, holdout_fraction: float = 0.2, seed: int = 42):
+    """Yield (X_train, y_train, X_holdout, y_holdout) for each chunk of source."""
+    offset = 0
+    for chunk in iter_chunks(source, chunksize):
+        if target_column not in chunk.columns:
+            raise KeyError(f"Target column '{target_column}' not found.")
+        test = holdout_mask(np.arange(offset, offset + len(chunk)), holdout_fraction, seed)
+        offset += len(chunk)
+        X = chunk.drop(columns=[target_column])
+        y = chunk[target_column].to_numpy()
+        yield X[~test], y[~test], X[test], y[test]
@@ -0,0 +1,160 @@
+# src/core/risk_assessment/streaming_detection.py
+
+import logging
+import math
+import numpy as np
+
+RESCALE_AT = 1e150  # Fold the growing event weight back into the counts past this
+
+class StreamingAnomalyDetector:
+    """Constant-memory anomaly scoring for unbounded event streams (Loda).
+
+    Each event is projected onto n_projections sparse random directions and
+    looked up in one histogram per direction; the score is the mean negative
+    log density, so higher means more anomalous. Histogram counts decay
+    exponentially with the given half_life (in events), which makes them a
+    decaying window over the stream. Decay is applied lazily by giving each
+    new event a growing weight instead of touching the whole table, so
+    score_one and update cost a fixed handful of vectorized operations
+    regardless of how many events have been seen.
+
+    Feature standardization and bin ranges come from fit() or, if fit is
+    not called, from the first `warmup` events; values outside the range
+    land in two overflow bins per projection. The anomaly threshold is the
+    (1 - contamination) quantile of prequential scores (score, then learn)
+    over the second half of that initial data.
+    """
+
+    def __init__(self, n_projections: int = 100, n_bins: int = 32, half_life: float = 5000, warmup: int = 256,
+                 contamination: float = 0.05, prior: float = 1.0, random_state: int = 42):
+        if half_life <= 0 or warmup < 2:
+            raise ValueError("half_life must be positive and warmup at least 2.")
+        self.n_projections = n_projections
+        self.n_bins = n_bins
+        self.half_life = half_life
+        self.warmup = warmup
+        self.contamination = contamination
+        self.prior = prior  # Pseudo-count per bin, in units of one current event
+        self.random_state = random_state
+        self.decay = 0.5 ** (1.0 / half_life)
+        self.threshold = None
+        self._weights = None
+        self._buffer = None
+        self._buffered = 0
+
+    @property
+    def fitted(self) -> bool:
+        return self._weights is not None
+
+    @property
+    def nbytes(self) -> int:
+        arrays = (self._weights, self._offsets, self._counts, self._rows) if self.fitted else (self._buffer,)
+        return sum(array.nbytes for array in arrays if array is not None)
+
+    def fit(self, data):
+        """Initialize standardization, bin ranges, counts and threshold from reference data."""
+        X = np.asarray(data, dtype=np.float64)
+        if X.ndim != 2 or len(X) < 2:
+            raise ValueError("fit needs a 2-D array with at least two rows.")
+        n_features = X.shape[1]
+        rng = np.random.default_rng(self.random_state)
+        projection = rng.normal(size=(self.n_projections, n_features))
+        nonzero = max(1, int(round(math.sqrt(n_features))))
+        for row in projection:  # Sparse directions, as in the Loda paper
+            row[rng.permutation(n_features)[nonzero:]] = 0.0
+        mean, scale = X.mean(axis=0), X.std(axis=0)
+        projection /= np.where(scale > 0, scale, 1.0)
+        projected = X @ projection.T - mean @ projection.T
+        low, high = projected.min(axis=0), projected.max(axis=0)
+        margin = 0.1 * np.maximum(high - low, 1e-12)
+        low, high = low - margin, high + margin
+        inv_width = self.n_bins / (high - low)
+        # Event x falls in bin clip(x @ weights.T + offsets, 0, n_bins + 1), where bins 0 and
+        # n_bins + 1 collect values below and above the range
+        self._weights = np.ascontiguousarray(projection * inv_width[:, None])
+        self._offsets = (-(mean @ projection.T) - low) * inv_width + 1.0
+        self._log_width = float(np.mean(np.log((high - low) / self.n_bins)))
+        self._rows = np.arange(self.n_projections) * (self.n_bins + 2)
+        self._counts = np.zeros(self.n_projections * (self.n_bins + 2))
+        self._total = 0.0
+        self._increment = 1.0
+        self._buffer = None
+        # Threshold from prequential scores: each event in the second half is scored before it is
+        # learned, like live traffic. In-sample scores would include each event's own count and
+        # set the threshold too low.
+        split = len(X) // 2
+        for x in X[:split]:
+            self.update(x)
+        scores = [self.score_and_update(x) for x in X[split:]]
+        self.threshold = float(np.quantile(scores, 1.0 - self.contamination))
+        logging.info("StreamingAnomalyDetector fitted on %d events (%d projections, threshold %.3f).",
+                     len(X), self.n_projections, self.threshold)
+        return self
+
+    def _bins(self, x) -> np.ndarray:
+        coordinates = self._weights @ np.asarray(x, dtype=np.float64) + self._offsets
+        return np.clip(coordinates, 0.0, self.n_bins + 1).astype(np.intp) + self._rows
+
+    def _score_bins(self, bins) -> float:
+        pseudo = self.prior * self._increment
+        density = np.log(self._counts[bins] + pseudo).mean() - math.log(self._total + pseudo * (self.n_bins + 2))
+        return -(density - self._log_width)
+
+    def _learn_bins(self, bins):
+        self._counts[bins] += self._increment
+        self._total += self._increment
+        self._increment /= self.decay
+        if self._increment > RESCALE_AT:
+            self._counts /= self._increment
+            self._total /= self._increment
+            self._increment = 1.0
+
+    def score_one(self, x) -> float:
+        """Anomaly score of one event (higher is more anomalous); 0.0 while warming up."""
+        if not self.fitted:
+            return 0.0
+        return self._score_bins(self._bins(x))
+
+    def update(self, x):
+        """Add one event to the window."""
+        if not self.fitted:
+            self._warm_up(x)
+            return
+        self._learn_bins(self._bins(x))
+
+    def score_and_update(self, x) -> float:
+        """score_one followed by update, projecting the event once."""
+        if not self.fitted:
+            self._warm_up(x)
+            return 0.0
+        bins = self._bins(x)
+        score = self._score_bins(bins)
+        self._learn_bins(bins)
+        return score
+
+    def is_anomaly(self, x) -> bool:
+        """Whether one event scores above the threshold (never while warming up)."""
+        return self.fitted and self.score_one(x) > self.threshold
+
+    def _warm_up(self, x):
+        x = np.asarray(x, dtype=np.float64)
+        if self._buffer is None:
+            self._buffer = np.empty((self.warmup, len(x)))
+        self._buffer[self._buffered] = x
+        self._buffered += 1
+        if self._buffered == self.warmup:
+            self.fit(self._buffer)
+
+    def score_samples(self, data) -> np.ndarray:
+        """Scores for a block of events, without updating the window."""
+        X = np.asarray(data, dtype=np.float64)
+        if not self.fitted:
+            return np.zeros(len(X))
+        bins = np.clip(X @ self._weights.T + self._offsets, 0.0, self.n_bins + 1).astype(np.intp) + self._rows
+        pseudo = self.prior * self._increment
+        density = np.log(self._counts[bins] + pseudo).mean(axis=1) - math.log(self._total + pseudo * (self.n_bins + 2))
+        return -(density - self._log_width)
+
+    def predict(self, data) -> np.ndarray:
+        """-1 for anomalies and 1 for normal events, like scikit-learn detectors."""
+        return np.where(self.score_samples(data) > self.threshold, -1, 1)
@@ -0,0 +1,118 @@
+# src/core/risk_assessment/tuning.py
+
+import logging
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import KFold, ParameterGrid, StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+
+_worker_folds = None  # Scaled folds, sent once to each pool process
+
+def _init_worker(folds):
+    global _worker_folds
+    _worker_folds = folds
+
+def _evaluate(task, folds=None):
+    """Fit one candidate on a prefix of one fold's training rows; returns (score, model or None)."""
+    estimator, params, fold, n_samples, scoring, keep_model = task
+    X_train, y_train, X_val, y_val, _ = (folds if folds is not None else _worker_folds)[fold]
+    model = clone(estimator).set_params(**params)
+    model.fit(X_train[:n_samples], y_train[:n_samples])
+    score = get_scorer(scoring)(model, X_val, y_val)
+    return score, model if keep_model else None
+
+class HyperparameterSearch:
+    """Cross-validated grid search with successive halving, run on a process pool.
+
+    The data is split into cv folds once, and each fold's scaler is fitted
+    and applied once; the scaled arrays are shipped to every worker process
+    a single time (pool initializer) instead of with each candidate. All
+    candidates start on a small slice of every fold's training rows; after
+    each rung only the best 1/factor survive and the slice grows by factor,
+    so the last rung trains at most `factor` candidates on full folds.
+    The fitted models from that rung are kept, and best_estimator_ is the
+    best candidate's best-scoring fold model (with its scaler as
+    best_scaler_), so nothing is retrained after the search.
+    """
+
+    def __init__(self, estimator, param_grid, cv: int = 5, scoring: str = 'accuracy', factor: int = 3,
+                 min_resources: int = 50, max_workers: int = None, random_state: int = 42):
+        if factor < 2:
+            raise ValueError("factor must be at least 2.")
+        self.estimator = estimator
+        self.candidates = list(ParameterGrid(param_grid))
+        self.cv = cv
+        self.scoring = scoring
+        self.factor = factor
+        self.min_resources = min_resources
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.random_state = random_state
+        self.results_ = []
+
+    def _folds(self, X, y):
+        """Scaled (X_train, y_train, X_val, y_val, scaler) per fold, training rows shuffled."""
+        splitter = (StratifiedKFold if is_classifier(self.estimator) else KFold)(
+            n_splits=self.cv, shuffle=True, random_state=self.random_state)
+        rng = np.random.default_rng(self.random_state)
+        y = np.asarray(y)
+        folds = []
+        for train, val in splitter.split(X, y):
+            train = rng.permutation(train)  # So every prefix is a random subsample
+            X_train, X_val = (X.iloc[train], X.iloc[val]) if hasattr(X, 'iloc') else (X[train], X[val])
+            scaler = StandardScaler().fit(X_train)
+            folds.append((scaler.transform(X_train), y[train], scaler.transform(X_val), y[val], scaler))
+        return folds
+
+    def _schedule(self, n_train: int) -> list:
+        """Training rows per fold for each rung, ending at the full fold."""
+        rungs, remaining = 1, len(self.candidates)
+        while remaining > self.factor:
+            remaining = math.ceil(remaining / self.factor)
+            rungs += 1
+        return [max(min(self.min_resources, n_train), n_train // self.factor ** (rungs - 1 - rung))
+                for rung in range(rungs)]
+
+    def fit(self, X, y):
+        """Run the search; returns self."""
+        if not self.candidates:
+            raise ValueError("param_grid has no candidates.")
+        folds = self._folds(X, y)
+        schedule = self._schedule(min(len(fold[1]) for fold in folds))
+        alive = list(range(len(self.candidates)))
+        executor = None
+        if self.max_workers > 1 and len(self.candidates) > 1:
+            executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_init_worker, initargs=(folds,))
+        try:
+            for rung, n_samples in enumerate(schedule):
+                last = rung == len(schedule) - 1
+                tasks = [(self.estimator, self.candidates[c], fold, n_samples, self.scoring, last)
+                         for c in alive for fold in range(len(folds))]
+                if executor is not None:
+                    outcomes = list(executor.map(_evaluate, tasks))
+                else:
+                    outcomes = [_evaluate(task, folds) for task in tasks]
+                scores = np.array([score for score, _ in outcomes]).reshape(len(alive), len(folds))
+                means = scores.mean(axis=1)
+                for c, fold_scores in zip(alive, scores):
+                    self.results_.append({'params': self.candidates[c], 'rung': rung, 'n_samples': n_samples,
+                                          'mean_score': fold_scores.mean(), 'scores': fold_scores.tolist()})
+                order = np.argsort(-means, kind='stable')  # Ties go to the earlier grid point
+                logging.info("Rung %d: %d candidates on %d rows, best %.4f.", rung, len(alive), n_samples, means[order[0]])
+                if last:
+                    best = order[0]
+                    best_fold = int(np.argmax(scores[best]))
+                    self.best_params_ = self.candidates[alive[best]]
+                    self.best_score_ = float(means[best])
+                    self.best_estimator_ = outcomes[best * len(folds) + best_fold][1]
+                    self.best_scaler_ = folds[best_fold][4]
+                else:
+                    alive = [alive[i] for i in order[:max(1, math.ceil(len(alive) / self.factor))]]
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        logging.info("Hyperparameter search completed: %s (%.4f).", self.best_params_, self.best_score_)
+        return self
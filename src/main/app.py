@@ -1,11 +1,18 @@
 # src/main/app.py
 
+import os
+import sys
+import threading
 from flask import Flask, jsonify, request
 from flask_sqlalchemy import SQLAlchemy
 from config import Config
 from logger import setup_logging
 import logging
 
+# Started as `python src/main/app.py`, only src/main is on the path; add the repository root for src.core
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from src.core.identity import IdentityManager, SQLiteUserStore, LoginThrottle
+
 # Initialize the Flask application
 app = Flask(__name__)
 app.config.from_object(Config)
@@ -16,6 +23,44 @@ setup_logging()
 # Initialize the database
 db = SQLAlchemy(app)
 
+# Identity manager, created on first use because TokenManager reads current_app
+identity_manager = None
+identity_manager_lock = threading.Lock()  # Concurrent first requests must build a single manager
+
+def get_identity_manager():
+    """Return the shared IdentityManager, creating it inside the app context."""
+    global identity_manager
+    if identity_manager is not None:
+        return identity_manager
+    with identity_manager_lock:
+        if identity_manager is not None:
+            return identity_manager
+        with app.app_context():
+            manager = IdentityManager(
+                user_store=SQLiteUserStore(app.config['IDENTITY_DB_PATH'], pool_size=app.config['IDENTITY_DB_POOL_SIZE']),
+                throttle=LoginThrottle(app.config['LOGIN_RATE_PER_USER'], app.config['LOGIN_BURST_PER_USER'],
+                                       app.config['LOGIN_RATE_PER_IP'], app.config['LOGIN_BURST_PER_IP']))
+            if app.config['PASSWORD_HASH_TARGET_MS'] > 0:
+                manager.cryptography.calibrate(app.config['PASSWORD_HASH_TARGET_MS'] / 1000)
+            identity_manager = manager
+    return identity_manager
+
+def _bulk_items(data, key):
+    """Return the list under key from a bulk request body, or an error response."""
+    items = (data or {}).get(key)
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({"error": f"'{key}' must be a non-empty list"}), 400)
+    if len(items) > app.config['MAX_BULK_ITEMS']:
+        return None, (jsonify({"error": f"At most {app.config['MAX_BULK_ITEMS']} items per request"}), 413)
+    return items, None
+
+def _authenticated_caller():
+    """Username from a valid 'Authorization: Bearer <token>' header, or None."""
+    scheme, _, token = request.headers.get('Authorization', '').partition(' ')
+    if scheme.lower() != 'bearer' or not token.strip():
+        return None
+    return get_identity_manager().token_manager.verify_token(token.strip())
+
 # Database model for User
 class User(db.Model):
     """User  model for storing user information."""
@@ -75,6 +120,40 @@ def get_user(user_id):
         "email": user.email
     }), 200
 
+@app.route('/tokens/bulk', methods=['POST'])
+def generate_tokens_bulk():
+    """Issue tokens for many verified users in one request.
+
+    Needs a bearer token. Callers with the 'issue_tokens' permission (admins)
+    may request any users; everyone else only their own username.
+    """
+    caller = _authenticated_caller()
+    if caller is None:
+        return jsonify({"error": "Authentication required"}), 401
+    usernames, error = _bulk_items(request.get_json(), 'usernames')
+    if error:
+        return error
+    if not all(isinstance(username, str) for username in usernames):
+        return jsonify({"error": "'usernames' must contain only strings"}), 400
+    manager = get_identity_manager()
+    if any(username != caller for username in usernames) and \
+            not manager.user_roles.has_permission(caller, 'issue_tokens'):
+        logging.warning("User %s may not issue tokens for other users.", caller)
+        return jsonify({"error": "Not allowed to issue tokens for other users"}), 403
+    result, status = manager.generate_tokens(usernames)
+    return jsonify(result), status
+
+@app.route('/tokens/verify/bulk', methods=['POST'])
+def verify_tokens_bulk():
+    """Verify many tokens in one request; returns the subject (or null) for each token."""
+    tokens, error = _bulk_items(request.get_json(), 'tokens')
+    if error:
+        return error
+    if not all(isinstance(token, str) for token in tokens):
+        return jsonify({"error": "'tokens' must contain only strings"}), 400
+    subjects = get_identity_manager().token_manager.verify_tokens(tokens)
+    return jsonify({"subjects": subjects, "valid": sum(subject is not None for subject in subjects)}), 200
+
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors."""
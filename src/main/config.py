@@ -17,10 +17,20 @@ class Config:
     # API settings
     API_VERSION = os.getenv('API_VERSION', 'v1')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # Limit request size to 16 MB
+    MAX_BULK_ITEMS = int(os.getenv('MAX_BULK_ITEMS', 10000))  # Limit items per bulk token request
 
     # CORS settings
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*')  # Allow all origins by default
 
+    # Identity settings
+    IDENTITY_DB_PATH = os.getenv('IDENTITY_DB_PATH', 'identity.db')  # SQLite user store shared by all workers
+    IDENTITY_DB_POOL_SIZE = int(os.getenv('IDENTITY_DB_POOL_SIZE', 4))
+    PASSWORD_HASH_TARGET_MS = float(os.getenv('PASSWORD_HASH_TARGET_MS', 0))  # Calibrate PBKDF2 at startup; 0 = fixed default
+    LOGIN_RATE_PER_USER = float(os.getenv('LOGIN_RATE_PER_USER', 0.2))  # Attempts per second, per username
+    LOGIN_BURST_PER_USER = float(os.getenv('LOGIN_BURST_PER_USER', 5))
+    LOGIN_RATE_PER_IP = float(os.getenv('LOGIN_RATE_PER_IP', 2.0))  # Attempts per second, per client IP
+    LOGIN_BURST_PER_IP = float(os.getenv('LOGIN_BURST_PER_IP', 20))
+
 class DevelopmentConfig(Config):
     """Development configuration settings."""
     DEBUG = True
@@ -0,0 +1,86 @@
+# src/tests/test_app.py
+
+import os
+import sys
+import threading
+import pytest
+
+pytest.importorskip('flask_sqlalchemy')
+# Loaded the way it is started (python src/main/app.py): as a script next to config and logger
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'main'))
+import app as app_module
+
+@pytest.fixture(scope='module')
+def client(tmp_path_factory):
+    """Fixture for a test client with a fresh identity store: verified alice and bob, admin root."""
+    app_module.app.config.update(TESTING=True, PASSWORD_HASH_TARGET_MS=0,
+                                 IDENTITY_DB_PATH=str(tmp_path_factory.mktemp('app') / 'identity.db'))
+    app_module.identity_manager = None
+    manager = app_module.get_identity_manager()
+    for username in ('alice', 'bob', 'root'):
+        manager.register_user(username, 'password')
+        manager.verify_user(username, 'password')
+    manager.assign_role('alice', 'viewer')
+    manager.assign_role('root', 'admin')
+    with app_module.app.app_context():
+        tokens = {username: manager.token_manager.generate_token(username) for username in ('alice', 'root')}
+    yield app_module.app.test_client(), tokens
+    manager.users.close()
+    app_module.identity_manager = None
+
+def bearer(token):
+    return {'Authorization': f'Bearer {token}'}
+
+def test_identity_manager_created_once_under_concurrency(client):
+    """Test that concurrent first calls share a single IdentityManager."""
+    current = app_module.identity_manager
+    app_module.identity_manager = None
+    barrier = threading.Barrier(8)
+    managers = []
+    def first_request():
+        barrier.wait()
+        managers.append(app_module.get_identity_manager())
+    threads = [threading.Thread(target=first_request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(manager) for manager in managers}) == 1
+    managers[0].users.close()
+    app_module.identity_manager = current
+
+def test_bulk_tokens_require_authentication(client):
+    """Test that /tokens/bulk rejects missing and invalid bearer tokens."""
+    client, _ = client
+    assert client.post('/tokens/bulk', json={'usernames': ['alice']}).status_code == 401
+    assert client.post('/tokens/bulk', json={'usernames': ['alice']}, headers=bearer('garbage')).status_code == 401
+
+def test_bulk_tokens_for_self_and_others(client):
+    """Test that users get their own tokens, are refused others', and admins may issue any."""
+    client, tokens = client
+    response = client.post('/tokens/bulk', json={'usernames': ['alice']}, headers=bearer(tokens['alice']))
+    assert response.status_code == 200 and 'alice' in response.get_json()['tokens']
+    response = client.post('/tokens/bulk', json={'usernames': ['alice', 'bob']}, headers=bearer(tokens['alice']))
+    assert response.status_code == 403
+    response = client.post('/tokens/bulk', json={'usernames': ['alice', 'bob', 'nobody']}, headers=bearer(tokens['root']))
+    body = response.get_json()
+    assert response.status_code == 200
+    assert sorted(body['tokens']) == ['alice', 'bob'] and list(body['errors']) == ['nobody']
+
+def test_bulk_verify_reports_each_token(client):
+    """Test that /tokens/verify/bulk returns the subject or null per token."""
+    client, tokens = client
+    response = client.post('/tokens/verify/bulk', json={'tokens': [tokens['alice'], 'garbage', tokens['root']]})
+    assert response.status_code == 200
+    assert response.get_json() == {'subjects': ['alice', None, 'root'], 'valid': 2}
+
+@pytest.mark.parametrize('path, key', [('/tokens/bulk', 'usernames'), ('/tokens/verify/bulk', 'tokens')])
+def test_bulk_routes_reject_bad_bodies(client, path, key):
+    """Test 400 for malformed lists and 400/415 for non-JSON bodies."""
+    client, tokens = client
+    headers = bearer(tokens['root'])
+    assert client.post(path, json={key: []}, headers=headers).status_code == 400
+    assert client.post(path, json={key: 'alice'}, headers=headers).status_code == 400
+    assert client.post(path, json={key: [1, 2]}, headers=headers).status_code == 400
+    response = client.post(path, data='not json', content_type='text/plain', headers=headers)
+    assert response.status_code in (400, 415)
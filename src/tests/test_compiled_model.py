@@ -0,0 +1,72 @@
+# src/tests/test_compiled_model.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.core.risk_assessment import RiskAnalyzer, AnomalyDetector, CompiledRiskModel, CompiledAnomalyModel
+
+def make_data(n_classes, rows=600, seed=0):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame(rng.normal(size=(rows, 5)) * [1, 10, 0.1, 100, 1], columns=list('abcde'))
+    data['c'] = np.round(data['c'], 2)  # Repeated values put thresholds between ties
+    score = data['a'] + data['b'] / 10 - data['c'] * 10
+    target = pd.cut(score, n_classes, labels=False) if n_classes > 2 else (score > 0).astype(int)
+    return data, target
+
+@pytest.mark.parametrize('model_type', ['RandomForest', 'GradientBoosting'])
+@pytest.mark.parametrize('n_classes', [2, 3])
+def test_predictions_identical(model_type, n_classes):
+    """Test that compiled predictions equal predict_risk, including on training rows and ties."""
+    data, target = make_data(n_classes)
+    analyzer = RiskAnalyzer(model_type)
+    analyzer.model.set_params(n_estimators=20)
+    analyzer.train_model(data, target)
+    compiled = analyzer.compile()
+    fresh, _ = make_data(n_classes, rows=2500, seed=1)
+    for frame in (data, fresh):
+        assert np.array_equal(compiled.predict(frame), analyzer.predict_risk(frame))
+    if model_type == 'RandomForest':
+        assert np.array_equal(compiled.decision(fresh), analyzer.model.predict_proba(analyzer.scaler.transform(fresh)))
+    else:
+        raw = analyzer.model.decision_function(analyzer.scaler.transform(fresh))
+        assert np.array_equal(compiled.decision(fresh).reshape(raw.shape), raw)
+
+def test_round_trip_and_validation():
+    """Test rebuilding from exported arrays, column reordering and feature-count checks."""
+    data, target = make_data(2)
+    analyzer = RiskAnalyzer()
+    analyzer.model.set_params(n_estimators=5)
+    analyzer.train_model(data, target)
+    arrays, metadata = analyzer.compile().to_arrays()
+    compiled = CompiledRiskModel.from_arrays(arrays, metadata)
+    assert np.array_equal(compiled.predict(data[list('edcba')]), analyzer.predict_risk(data))
+    assert compiled.predict(data.iloc[:0]).shape == (0,)
+    with pytest.raises(ValueError):
+        compiled.predict(np.zeros((2, 3)))
+
+def test_untrained_model_rejected():
+    """Test that compiling an untrained analyzer raises ValueError."""
+    with pytest.raises(ValueError):
+        RiskAnalyzer().compile()
+
+def test_unsupported_estimators_name_their_type():
+    """Test that unsupported estimators raise ValueError naming their type."""
+    data, target = make_data(2)
+    analyzer = RiskAnalyzer('SGD')
+    analyzer.train_model(data, target)
+    with pytest.raises(ValueError, match='SGDClassifier'):
+        analyzer.compile()
+    with pytest.raises(ValueError, match='LocalOutlierFactor'):
+        CompiledAnomalyModel.from_detector(AnomalyDetector('LocalOutlierFactor'))
+
+@pytest.mark.parametrize('params', [{}, {'max_features': 0.6}])
+def test_isolation_forest_identical(params):
+    """Test that compiled IsolationForest scores and flags equal the detector's."""
+    data, _ = make_data(2)
+    detector = AnomalyDetector()
+    detector.model.set_params(**params)
+    detector.fit(data)
+    compiled = CompiledAnomalyModel.from_detector(detector)
+    fresh, _ = make_data(2, rows=2500, seed=1)
+    assert np.array_equal(compiled.get_anomaly_scores(fresh), detector.get_anomaly_scores(fresh))
+    assert np.array_equal(compiled.detect_anomalies(fresh), detector.detect_anomalies(fresh))
@@ -0,0 +1,67 @@
+# src/tests/test_cryptography.py
+
+import os
+import pytest
+from hashlib import pbkdf2_hmac
+from flask import Flask
+from src.core.identity import Cryptography, IdentityManager
+
+@pytest.fixture
+def crypto():
+    """Fixture for Cryptography with a low iteration count."""
+    return Cryptography(iterations=1000)
+
+def legacy_hash(password):
+    """Hash in the pre-header format: 16-byte salt + PBKDF2-SHA256 at 100k iterations."""
+    salt = os.urandom(16)
+    return salt + pbkdf2_hmac('sha256', password.encode('utf-8'), salt, 100000)
+
+def test_hash_is_self_describing(crypto):
+    """Test that new hashes embed their parameters and verify."""
+    hashed = crypto.hash_password("secret")
+    assert hashed.startswith(b'$pbkdf2-sha256$i=1000,s=16$')
+    algorithm, iterations, salt, _ = crypto.parse_hash(hashed)
+    assert (algorithm, iterations, len(salt)) == ('sha256', 1000, 16)
+    assert crypto.verify_password("secret", hashed)
+    assert not crypto.verify_password("wrong", hashed)
+
+def test_verify_uses_stored_parameters(crypto):
+    """Test that hashes keep verifying after the iteration count changes."""
+    hashed = crypto.hash_password("secret")
+    crypto.iterations = 2000
+    assert crypto.verify_password("secret", hashed)
+    assert crypto.needs_rehash(hashed)
+    assert not crypto.needs_rehash(crypto.hash_password("secret"))
+
+def test_legacy_hashes(crypto):
+    """Test that bare salt + hash values still verify and are flagged for rehash."""
+    hashed = legacy_hash("secret")
+    assert crypto.verify_password("secret", hashed)
+    assert crypto.needs_rehash(hashed)
+
+def test_malformed_hash(crypto):
+    """Test that a corrupted header raises ValueError."""
+    with pytest.raises(ValueError):
+        crypto.verify_password("secret", b'$pbkdf2-sha256$i=x$abc')
+
+def test_calibrate_respects_bounds(crypto):
+    """Test that calibration stays within the requested bounds."""
+    assert crypto.calibrate(0.001, min_iterations=5000, max_iterations=50000) in range(5000, 50001)
+    assert crypto.calibrate(10.0, min_iterations=5000, max_iterations=50000) == 50000
+
+def test_verify_user_upgrades_outdated_hash():
+    """Test that a successful login rehashes legacy hashes and a failed one does not."""
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test-secret'
+    with app.app_context():
+        manager = IdentityManager()
+        manager.cryptography = Cryptography(iterations=1000)
+        manager.users.add('alice', {"password_hash": legacy_hash("secret"), "verified": False, "role": None})
+        original = manager.users.get('alice')["password_hash"]
+        assert manager.verify_user('alice', 'wrong')[1] == 401
+        assert manager.users.get('alice')["password_hash"] == original
+        assert manager.verify_user('alice', 'secret')[1] == 200
+        upgraded = manager.users.get('alice')["password_hash"]
+        assert upgraded.startswith(b'$pbkdf2-sha256$i=1000,')
+        assert manager.verify_user('alice', 'secret')[1] == 200
+        assert manager.users.get('alice')["password_hash"] == upgraded
@@ -0,0 +1,92 @@
+# src/tests/test_hashing_pool.py
+
+import threading
+import pytest
+from flask import Flask
+from src.core.identity import IdentityManager, Cryptography, PasswordHashingPool, HashingPoolSaturatedError
+
+class FastCryptography(Cryptography):
+    """Cryptography with a low iteration count to keep tests quick."""
+    def __init__(self):
+        super().__init__()
+        self.iterations = 1000
+
+@pytest.fixture
+def app_context():
+    """Fixture providing the Flask app context TokenManager needs."""
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test-secret'
+    with app.app_context():
+        yield
+
+@pytest.fixture
+def pool():
+    """Fixture to create a small hashing pool."""
+    pool = PasswordHashingPool(FastCryptography(), max_workers=2, max_pending=4)
+    yield pool
+    pool.shutdown()
+
+def test_hash_and_verify_async(pool):
+    """Test hashing and verification through futures."""
+    hashed = pool.hash_password_async("secret").result()
+    assert pool.verify_password_async("secret", hashed).result() is True
+    assert pool.verify_password_async("wrong", hashed).result() is False
+
+def test_verify_batch(pool):
+    """Test batch verification keeps input order."""
+    hashed = pool.hash_password_async("secret").result()
+    pairs = [("secret", hashed), ("wrong", hashed)] * 5
+    assert pool.verify_batch(pairs) == [True, False] * 5
+
+def test_large_batch_counts_every_item(pool):
+    """Test that a batch far larger than max_pending never has more than max_pending hashes queued."""
+    hashed = pool.hash_password_async("secret").result()
+    peak = []
+    verify = pool.cryptography.verify_password
+    def tracking_verify(password, stored):
+        peak.append(pool.pending)
+        return verify(password, stored)
+    pool.cryptography.verify_password = tracking_verify
+    assert pool.verify_batch([("secret", hashed), ("wrong", hashed)] * 20) == [True, False] * 20
+    assert max(peak) <= pool.max_pending
+    assert pool.pending == 0
+
+def test_batch_failures_stay_per_item(pool):
+    """Test that a malformed hash or a saturated pool fails only the affected items."""
+    hashed = pool.hash_password_async("secret").result()
+    results = pool.verify_batch([("secret", hashed), ("secret", ""), ("wrong", hashed)])
+    assert results[0] is True and results[2] is False
+    assert isinstance(results[1], ValueError)
+    gate = threading.Event()
+    blockers = [pool._submit(gate.wait) for _ in range(4)]
+    results = pool.hash_batch(["a", "b"])
+    assert all(isinstance(result, HashingPoolSaturatedError) for result in results)
+    gate.set()
+    for future in blockers:
+        future.result()
+
+def test_saturated_pool_fails_fast(pool):
+    """Test that submissions beyond max_pending are rejected immediately."""
+    gate = threading.Event()
+    blockers = [pool._submit(gate.wait) for _ in range(4)]
+    with pytest.raises(HashingPoolSaturatedError):
+        pool.hash_password_async("secret")
+    gate.set()
+    for future in blockers:
+        future.result()
+    assert pool.pending == 0
+
+def test_identity_manager_uses_pool(pool, app_context):
+    """Test registration and batch verification through the pool."""
+    manager = IdentityManager(hashing_pool=pool)
+    manager.cryptography = pool.cryptography
+    assert manager.register_user("alice", "secret")[1] == 201
+    assert manager.verify_user("alice", "secret")[1] == 200
+    statuses = [status for _, status in manager.verify_users([("alice", "wrong"), ("bob", "x"), ("alice", "secret")])]
+    assert statuses == [401, 404, 200]
+    gate = threading.Event()
+    blockers = [pool._submit(gate.wait) for _ in range(4)]
+    assert [status for _, status in manager.register_users([("carol", "pw"), ("alice", "pw")])] == [503, 409]
+    gate.set()
+    for future in blockers:
+        future.result()
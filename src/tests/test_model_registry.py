@@ -0,0 +1,136 @@
+# src/tests/test_model_registry.py
+
+import threading
+import numpy as np
+import pandas as pd
+import pytest
+from src.core.risk_assessment import RiskAnalyzer, AnomalyDetector, ModelRegistry, CompiledAnomalyModel
+
+@pytest.fixture(scope='module')
+def data():
+    """Fixture for a small feature frame and target."""
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.normal(size=(500, 4)), columns=['a', 'b', 'c', 'd'])
+    return frame, (frame['a'] - frame['b'] > 0).astype(int)
+
+def train(data, n_estimators):
+    analyzer = RiskAnalyzer()
+    analyzer.model.set_params(n_estimators=n_estimators)
+    analyzer.train_model(*data)
+    return analyzer
+
+def test_publish_load_and_activate(tmp_path, data):
+    """Test versioning, memory-mapped loading and activation."""
+    frame, _ = data
+    registry = ModelRegistry(str(tmp_path))
+    first, second = train(data, 3), train(data, 7)
+    assert registry.publish('risk', first) == 1
+    assert registry.publish('risk', second) == 2
+    assert registry.versions('risk') == [1, 2]
+    loaded = registry.load('risk', 1)
+    assert isinstance(loaded.threshold, np.memmap)
+    assert np.array_equal(loaded.predict(frame), first.predict_risk(frame))
+    with pytest.raises(KeyError):
+        registry.get('risk')
+    assert registry.activate('risk', 1) == 1
+    assert np.array_equal(registry.predict('risk', frame), first.predict_risk(frame))
+    registry.activate('risk')
+    assert registry.live_version('risk') == 2
+    assert np.array_equal(registry.predict('risk', frame), second.predict_risk(frame))
+    assert registry.load_source('risk', 2).model.n_estimators == 7
+
+def test_refresh_follows_other_process(tmp_path, data):
+    """Test that a second registry on the same directory follows activations."""
+    writer, reader = ModelRegistry(str(tmp_path)), ModelRegistry(str(tmp_path))
+    writer.publish('risk', train(data, 3))
+    writer.activate('risk')
+    assert reader.refresh('risk')
+    assert not reader.refresh('risk')
+    writer.publish('risk', train(data, 4))
+    writer.activate('risk', 2)
+    assert reader.refresh('risk') and reader.live_version('risk') == 2
+
+def test_swap_during_predictions(tmp_path, data):
+    """Test that predictions keep succeeding while versions are swapped."""
+    frame, _ = data
+    registry = ModelRegistry(str(tmp_path))
+    analyzers = [train(data, 3), train(data, 5)]
+    for analyzer in analyzers:
+        registry.publish('risk', analyzer, include_source=False)
+    registry.activate('risk', 1)
+    expected = [analyzer.predict_risk(frame) for analyzer in analyzers]
+    errors = []
+    stop = threading.Event()
+    def serve():
+        while not stop.is_set():
+            result = registry.predict('risk', frame)
+            if not any(np.array_equal(result, e) for e in expected):
+                errors.append(result)
+    threads = [threading.Thread(target=serve) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for i in range(20):
+        registry.activate('risk', 1 + i % 2)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    assert not errors
+
+def test_anomaly_detector_round_trip(tmp_path, data):
+    """Test publishing an IsolationForest detector and rejecting uncompilable ones."""
+    frame, _ = data
+    detector = AnomalyDetector()
+    detector.fit(frame)
+    registry = ModelRegistry(str(tmp_path))
+    registry.activate('anomaly', registry.publish('anomaly', detector))
+    assert isinstance(registry.get('anomaly'), CompiledAnomalyModel)
+    assert np.array_equal(registry.predict('anomaly', frame), detector.detect_anomalies(frame))
+    with pytest.raises(ValueError):
+        registry.publish('lof', AnomalyDetector('LocalOutlierFactor'))
+    with pytest.raises(ValueError):
+        registry.publish('../escape', detector)
+    assert registry.versions('lof') == []
+
+def test_string_labels_round_trip(tmp_path, data):
+    """Test that models trained on string class labels can be published and loaded."""
+    frame, target = data
+    analyzer = RiskAnalyzer()
+    analyzer.model.set_params(n_estimators=3)
+    analyzer.train_model(frame, target.map({0: 'low', 1: 'high'}))
+    registry = ModelRegistry(str(tmp_path))
+    registry.activate('risk', registry.publish('risk', analyzer, include_source=False))
+    assert registry.get('risk').classes.dtype == object
+    assert list(registry.predict('risk', frame)) == list(analyzer.predict_risk(frame))
+
+def test_batcher_follows_activation(tmp_path, data):
+    """Test that a registry-backed PredictionBatcher serves each newly activated version."""
+    frame, _ = data
+    analyzers = [train(data, 3), train(data, 5)]
+    registry = ModelRegistry(str(tmp_path))
+    for analyzer in analyzers:
+        registry.publish('risk', analyzer, include_source=False)
+    registry.activate('risk', 1)
+    with registry.batcher('risk') as batcher:
+        assert np.array_equal(batcher.predict(frame), analyzers[0].predict_risk(frame))
+        registry.activate('risk', 2)
+        assert batcher.analyzer is registry.get('risk')
+        assert np.array_equal(batcher.predict(frame), analyzers[1].predict_risk(frame))
+
+def test_racing_activations_notify_in_order(tmp_path, data):
+    """Test that subscribers end on the live model when activations race."""
+    registry = ModelRegistry(str(tmp_path))
+    for n_estimators in (2, 3):
+        registry.publish('risk', train(data, n_estimators), include_source=False)
+    seen = []
+    registry.subscribe('risk', seen.append)
+    for _ in range(20):
+        start = threading.Barrier(2)
+        def activate(version):
+            start.wait()
+            registry.activate('risk', version)
+        threads = [threading.Thread(target=activate, args=(version,)) for version in (1, 2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert seen[-1] is registry.get('risk')
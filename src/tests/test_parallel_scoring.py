@@ -0,0 +1,76 @@
+# src/tests/test_parallel_scoring.py
+
+import logging
+import multiprocessing
+import os
+import pytest
+from src.core.reputation.parallel import ScoringPool
+from src.core.reputation.reputation_manager import ReputationManager
+from src.core.reputation.scoring_algorithm import CustomScore
+
+def total_or_fail(data):
+    """Module-level scoring function so it can be pickled for process pools."""
+    if "fail" in data:
+        raise RuntimeError("bad signal")
+    return float(sum(data.values()))
+
+def crash_worker_once(data):
+    """Kill the worker process the first time a crash marker is seen; score normally afterwards."""
+    marker = data.pop("crash_marker", None)
+    if marker is not None and multiprocessing.parent_process() is not None and not os.path.exists(marker):
+        open(marker, 'w').close()
+        os._exit(1)
+    return float(sum(data.values()))
+
+class ExplodingScore(CustomScore):
+    """Custom score whose calculate_score itself raises for some entities."""
+    def calculate_score(self, data):
+        if "explode" in data:
+            raise RuntimeError("boom")
+        return super().calculate_score(data)
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_parallel_add_entities_preserves_order(executor):
+    """Test that parallel scoring matches serial results for every entity."""
+    entities = {f"entity_{i}": {"a": i, "b": 1} for i in range(50)}
+    manager = ReputationManager(CustomScore(total_or_fail), executor=executor, max_workers=2, chunk_size=7)
+    try:
+        manager.add_entities(entities)
+        assert [manager.get_score(f"entity_{i}") for i in range(50)] == [i + 1.0 for i in range(50)]
+    finally:
+        manager.close()
+
+def test_parallel_errors_are_isolated():
+    """Test that one failing entity does not affect the rest of its chunk."""
+    manager = ReputationManager(ExplodingScore(total_or_fail), executor="thread", chunk_size=4)
+    try:
+        manager.add_entities({"good": {"a": 1}, "custom_fail": {"fail": 1}, "exploding": {"explode": 1}})
+        assert manager.get_score("good") == 1.0
+        assert manager.get_score("custom_fail") == 0.0  # CustomScore logs and scores 0.0
+        assert manager.get_score("exploding") is None  # skipped, as add_entity does on errors
+    finally:
+        manager.close()
+
+def test_unknown_executor_type():
+    """Test that an unsupported executor type falls back to serial scoring."""
+    manager = ReputationManager(CustomScore(total_or_fail), executor="gpu")
+    manager.add_entities({"alice": {"a": 2}})
+    assert manager.get_score("alice") == 2.0
+
+def test_broken_process_pool_is_recreated(tmp_path, caplog):
+    """Test that a worker crash replaces the shared pool and the retry still scores in parallel."""
+    pool = ScoringPool("process", max_workers=2)
+    broken = pool.executor
+    manager = ReputationManager(CustomScore(crash_worker_once), pool=pool)
+    try:
+        entities = {f"entity_{i}": {"a": i} for i in range(20)}
+        entities["entity_3"]["crash_marker"] = str(tmp_path / "crashed")
+        with caplog.at_level(logging.WARNING):
+            manager.add_entities(entities)
+        assert (tmp_path / "crashed").exists()
+        assert pool.executor is not broken
+        assert "falling back" not in caplog.text
+        assert [manager.get_score(f"entity_{i}") for i in range(20)] == [float(i) for i in range(20)]
+    finally:
+        manager.close()
+        pool.shutdown()
@@ -0,0 +1,71 @@
+# src/tests/test_permissions.py
+
+import pytest
+from src.core.identity.permissions import PermissionEngine
+from src.core.identity.user_roles import UserRoles
+
+@pytest.fixture
+def roles():
+    """Fixture for UserRoles with a few assigned users."""
+    roles = UserRoles()
+    roles.assign_role('alice', 'admin')
+    roles.assign_role('bob', 'editor')
+    roles.assign_role('carol', 'viewer')
+    return roles
+
+def test_builtin_roles_keep_existing_semantics(roles):
+    """Test that built-in roles grant the same permissions as before."""
+    assert roles.has_permission('alice', 'edit')
+    assert roles.has_permission('alice', 'anything')
+    assert roles.has_permission('bob', 'edit')
+    assert roles.has_permission('bob', 'view')
+    assert not roles.has_permission('carol', 'edit')
+    assert roles.has_permission('carol', 'view')
+    assert not roles.has_permission('dave', 'view')
+    assert roles.get_user_role('bob') == 'editor'
+    assert roles.get_user_role('dave') == 'No role assigned'
+
+def test_invalid_role(roles):
+    """Test that assigning an undefined role raises ValueError."""
+    with pytest.raises(ValueError):
+        roles.assign_role('dave', 'owner')
+
+def test_custom_role_inheritance(roles):
+    """Test runtime roles that inherit from built-in roles."""
+    roles.define_role('publisher', ['publish'], inherits=['editor'])
+    roles.assign_role('dave', 'publisher')
+    assert roles.has_permission('dave', 'publish')
+    assert roles.has_permission('dave', 'view')
+    assert not roles.has_permission('bob', 'publish')
+
+def test_redefining_role_updates_assigned_users(roles):
+    """Test that redefining a role recompiles the masks of users holding it."""
+    roles.define_role('viewer', ['view', 'comment'])
+    assert roles.has_permission('carol', 'comment')
+    assert roles.has_permission('bob', 'comment')  # Inherited through editor
+
+def test_inheritance_cycle_rejected():
+    """Test that cyclic inheritance is rejected and the previous definition kept."""
+    engine = PermissionEngine()
+    engine.define_role('a', ['x'])
+    engine.define_role('b', ['y'], inherits=['a'])
+    with pytest.raises(ValueError):
+        engine.define_role('a', ['x'], inherits=['b'])
+    engine.assign_role('u', 'b')
+    assert engine.has_permission('u', 'x')
+
+def test_bulk_checks(roles):
+    """Test vectorized bulk permission checks."""
+    usernames = ['alice', 'bob', 'carol', 'dave']
+    assert roles.users_with_permission(usernames, 'edit') == ['alice', 'bob']
+    assert list(roles.permissions.check_many(usernames, 'view')) == [True, True, True, False]
+    assert roles.users_with_permission(usernames, 'undeclared') == ['alice']
+
+def test_capacity_growth():
+    """Test that user storage grows past its initial capacity."""
+    engine = PermissionEngine(initial_capacity=2)
+    engine.define_role('viewer', ['view'])
+    for i in range(10):
+        engine.assign_role(f'user{i}', 'viewer')
+    assert engine.users_with_permission([f'user{i}' for i in range(10)], 'view') == [f'user{i}' for i in range(10)]
+    assert len(engine.user_roles()) == 10
@@ -0,0 +1,114 @@
+# src/tests/test_prediction_batcher.py
+
+import threading
+import time
+import numpy as np
+import pandas as pd
+import pytest
+from src.core.risk_assessment import RiskAnalyzer, PredictionBatcher
+
+@pytest.fixture(scope='module')
+def analyzer():
+    """Fixture for a small trained RiskAnalyzer."""
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame(rng.normal(size=(400, 4)), columns=['a', 'b', 'c', 'd'])
+    target = (data['a'] + data['b'] > 0).astype(int)
+    analyzer = RiskAnalyzer()
+    analyzer.model.set_params(n_estimators=10)
+    analyzer.train_model(data, target)
+    return analyzer, data
+
+def test_concurrent_requests_are_coalesced(analyzer):
+    """Test that concurrent single-row requests get their own predictions from shared batches."""
+    analyzer, data = analyzer
+    expected = analyzer.predict_risk(data)
+    results = [None] * len(data)
+    with PredictionBatcher(analyzer, max_batch_size=32, max_delay=0.01) as batcher:
+        def worker(indices):
+            for i in indices:
+                results[i] = batcher.predict(data.iloc[[i]])
+        threads = [threading.Thread(target=worker, args=(range(t, len(data), 8),)) for t in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert batcher.batches < len(data)
+    assert np.array_equal(np.concatenate(results), expected)
+
+def test_blocks_and_arrays(analyzer):
+    """Test array rows and multi-row blocks in one batch."""
+    analyzer, data = analyzer
+    values = data.to_numpy()
+    with PredictionBatcher(analyzer, max_batch_size=100, max_delay=0.05) as batcher:
+        single = batcher.submit(values[0])
+        block = batcher.submit(values[1:6])
+        assert np.array_equal(single.result(), analyzer.predict_risk(values[:1]))
+        assert np.array_equal(block.result(), analyzer.predict_risk(values[1:6]))
+
+def test_errors_reach_callers(analyzer):
+    """Test that a failing batch sets the exception on every caller's future."""
+    analyzer, _ = analyzer
+    with PredictionBatcher(analyzer) as batcher:
+        with pytest.raises(ValueError):
+            batcher.predict([1.0, 2.0])  # Wrong feature count
+
+def test_closed_batcher_rejects(analyzer):
+    """Test that a closed batcher rejects new requests."""
+    analyzer, _ = analyzer
+    batcher = PredictionBatcher(analyzer)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit([0.0] * 4)
+
+def test_mixed_blocks_use_model_column_order(analyzer):
+    """Test that reordered DataFrames and arrays in one batch are aligned to the fitted columns."""
+    analyzer, data = analyzer
+    values = data.to_numpy()
+    with PredictionBatcher(analyzer, max_batch_size=100, max_delay=0.05) as batcher:
+        reordered = batcher.submit(data.iloc[:5][['d', 'c', 'b', 'a']])
+        array = batcher.submit(values[5:10])
+        assert np.array_equal(reordered.result(), analyzer.predict_risk(data.iloc[:5]))
+        assert np.array_equal(array.result(), analyzer.predict_risk(data.iloc[5:10]))
+    assert batcher.batches == 1
+
+def test_close_racing_submit_resolves_every_future(analyzer):
+    """Test that every accepted request resolves when close() races with submitters."""
+    analyzer, data = analyzer
+    row = data.to_numpy()[0]
+    for _ in range(10):
+        batcher = PredictionBatcher(analyzer, max_batch_size=256, max_delay=0.0)
+        futures = []
+        start = threading.Barrier(5)
+        def submitter():
+            start.wait()
+            try:
+                for _ in range(100):
+                    futures.append(batcher.submit(row))
+            except RuntimeError:
+                pass
+        threads = [threading.Thread(target=submitter) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        start.wait()
+        time.sleep(0.0005)
+        batcher.close()
+        for thread in threads:
+            thread.join()
+        for future in futures:
+            assert future.result(timeout=5) is not None
+
+def test_malformed_block_fails_only_its_caller(analyzer):
+    """Test that a wrong-width or missing-column block does not fail requests batched with it."""
+    analyzer, data = analyzer
+    values = data.to_numpy()
+    with PredictionBatcher(analyzer, max_batch_size=100, max_delay=0.05) as batcher:
+        good = batcher.submit(values[0])
+        wide = batcher.submit(np.zeros(5))
+        missing = batcher.submit(data.iloc[:2][['a', 'b', 'c']])
+        frame = batcher.submit(data.iloc[1:3])
+        assert np.array_equal(good.result(), analyzer.predict_risk(values[:1]))
+        assert np.array_equal(frame.result(), analyzer.predict_risk(data.iloc[1:3]))
+        with pytest.raises(ValueError):
+            wide.result()
+        with pytest.raises(KeyError):
+            missing.result()
@@ -0,0 +1,66 @@
+# src/tests/test_rank_index.py
+
+import random
+import pytest
+from src.core.reputation.rank_index import RankIndex
+from src.core.reputation.reputation_manager import ReputationManager
+from src.core.reputation.scoring_algorithm import SimpleAverageScore
+
+@pytest.fixture
+def index():
+    """Fixture to create a RankIndex with small blocks so splits are exercised."""
+    index = RankIndex(load=4)
+    for i in range(50):
+        index.insert(f"entity_{i}", float(i % 10))
+    return index
+
+def test_top_k(index):
+    """Test that top_k returns the highest scores first."""
+    top = index.top_k(3)
+    assert [score for _, score in top] == [9.0, 9.0, 9.0]
+    assert len(index.top_k(100)) == 50
+
+def test_rank_and_percentile(index):
+    """Test competition rank and percentile for tied scores."""
+    assert index.rank("entity_9") == 1
+    assert index.rank("entity_0") == 46
+    assert index.percentile("entity_9") == 100.0
+    assert index.percentile_of_score(4.5) == 50.0
+    assert index.rank("missing") is None
+
+def test_range_queries(index):
+    """Test range listing and counting."""
+    in_range = index.range(2.0, 3.0)
+    assert len(in_range) == 10
+    assert all(2.0 <= score <= 3.0 for _, score in in_range)
+    assert index.count_range(2.0, 3.0) == 10
+    assert index.count_range(3.0, 2.0) == 0
+
+def test_matches_full_sort_after_random_updates():
+    """Test that the index agrees with a full sort after random updates and removals."""
+    rng = random.Random(7)
+    index = RankIndex(load=8)
+    scores = {}
+    for _ in range(2000):
+        entity = f"e{rng.randrange(300)}"
+        if rng.random() < 0.2 and entity in scores:
+            index.remove(entity)
+            del scores[entity]
+        else:
+            scores[entity] = rng.randrange(100) / 4
+            index.insert(entity, scores[entity])
+    expected = sorted(scores.values(), reverse=True)
+    assert [score for _, score in index.top_k(len(scores))] == expected
+    for entity, score in list(scores.items())[:20]:
+        assert index.rank(entity) == 1 + sum(1 for other in scores.values() if other > score)
+
+def test_manager_keeps_index_in_sync():
+    """Test that manager writes after the first rank query update the index."""
+    manager = ReputationManager(SimpleAverageScore())
+    manager.add_entities({"alice": {"a": 1}, "bob": {"a": 2}})
+    assert manager.rank("bob") == 1
+    manager.add_entity("carol", {"a": 3})
+    manager.update_entity_score("alice", {"a": 5})
+    manager.remove_entity("bob")
+    assert manager.top_k(2) == [("alice", 5.0), ("carol", 3.0)]
+    assert manager.entities_in_range(0.0, 4.0) == [("carol", 3.0)]
@@ -0,0 +1,87 @@
+# src/tests/test_rate_limiter.py
+
+import threading
+import pytest
+from flask import Flask
+from src.core.identity import IdentityManager, Cryptography, TokenBucketLimiter, LoginThrottle
+
+class CountingCryptography(Cryptography):
+    """Cryptography that counts hash computations."""
+    def __init__(self):
+        super().__init__(iterations=1000)
+        self.calls = 0
+
+    def hash_password(self, password):
+        self.calls += 1
+        return super().hash_password(password)
+
+    def verify_password(self, password, hashed):
+        self.calls += 1
+        return super().verify_password(password, hashed)
+
+def test_burst_then_refill():
+    """Test that a bucket allows its burst, rejects, then refills lazily."""
+    limiter = TokenBucketLimiter(rate=1.0, burst=3)
+    assert [limiter.allow('k', now=0.0) for _ in range(4)] == [True, True, True, False]
+    assert not limiter.allow('k', now=0.5)
+    assert limiter.allow('k', now=1.0)
+    assert limiter.allow('other', now=1.0)
+
+def test_idle_buckets_evicted():
+    """Test that fully refilled buckets are dropped and drained ones kept."""
+    limiter = TokenBucketLimiter(rate=1.0, burst=2, num_stripes=4, evict_interval=1.0)
+    limiter.allow('idle', now=0.0)
+    for _ in range(2):
+        limiter.allow('busy', now=9.0)
+    assert limiter.evict_idle(now=10.0) == 1
+    assert len(limiter) == 1
+
+def test_concurrent_allowance_is_exact():
+    """Test that concurrent checks on one key never exceed the burst."""
+    limiter = TokenBucketLimiter(rate=1e-9, burst=100)
+    allowed = []
+    def worker():
+        allowed.append(sum(limiter.allow('k') for _ in range(100)))
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(allowed) == 100
+
+def test_invalid_parameters():
+    """Test that nonsensical limits raise ValueError."""
+    with pytest.raises(ValueError):
+        TokenBucketLimiter(rate=0, burst=5)
+
+def test_throttled_logins_skip_hashing():
+    """Test that throttled attempts return 429 before any password hashing."""
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test-secret'
+    with app.app_context():
+        manager = IdentityManager(throttle=LoginThrottle(per_user_rate=1e-9, per_user_burst=2,
+                                                         per_ip_rate=1e-9, per_ip_burst=3))
+        manager.cryptography = CountingCryptography()
+        assert manager.register_user('alice', 'secret', client_ip='10.0.0.1')[1] == 201
+        assert manager.verify_user('alice', 'wrong', client_ip='10.0.0.1')[1] == 401
+        calls = manager.cryptography.calls
+        assert manager.verify_user('alice', 'secret', client_ip='10.0.0.2')[1] == 429  # Username exhausted
+        assert manager.verify_user('bob', 'secret', client_ip='10.0.0.1')[1] == 404
+        assert manager.verify_user('carol', 'secret', client_ip='10.0.0.1')[1] == 429  # IP exhausted
+        assert manager.cryptography.calls == calls
+
+def test_bulk_paths_are_throttled():
+    """Test that a locked-out user is also rejected by the bulk APIs, before any hashing."""
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test-secret'
+    with app.app_context():
+        manager = IdentityManager(throttle=LoginThrottle(per_user_rate=1e-9, per_user_burst=2))
+        manager.cryptography = CountingCryptography()
+        assert [status for _, status in manager.register_users([('alice', 'secret'), ('bob', 'pw')])] == [201, 201]
+        assert manager.verify_user('alice', 'wrong')[1] == 401
+        assert manager.verify_user('alice', 'secret')[1] == 429  # alice is locked out
+        calls = manager.cryptography.calls
+        results = manager.verify_users([('alice', 'secret'), ('alice', 'guess'), ('bob', 'pw')])
+        assert [status for _, status in results] == [429, 429, 200]
+        assert manager.cryptography.calls == calls + 1
+        assert manager.register_users([('alice', 'again')])[0][1] == 429
@@ -0,0 +1,97 @@
+# src/tests/test_score_cache.py
+
+import pytest
+from src.core.reputation.score_cache import CachedScore
+from src.core.reputation.reputation_manager import ReputationManager
+from src.core.reputation.scoring_algorithm import CustomScore, WeightedScore, ExponentialDecayScore
+
+@pytest.fixture
+def calls():
+    """Fixture counting how often the wrapped scoring function runs."""
+    return []
+
+@pytest.fixture
+def cached(calls):
+    """Fixture wrapping a counting CustomScore in a small cache."""
+    def scoring_function(data):
+        calls.append(data)
+        return float(sum(data.values()))
+    return CachedScore(CustomScore(scoring_function), max_size=2)
+
+def test_identical_data_hits_cache(cached, calls):
+    """Test that resubmitting identical data is served from the cache."""
+    assert cached.calculate_score({"a": 1, "b": 2}) == 3.0
+    assert cached.calculate_score({"a": 1, "b": 2}) == 3.0
+    assert len(calls) == 1
+    assert cached.stats()['hits'] == 1
+    assert cached.stats()['misses'] == 1
+
+def test_lru_eviction(cached, calls):
+    """Test that the least recently used entry is evicted first."""
+    cached.calculate_score({"a": 1})
+    cached.calculate_score({"a": 2})
+    cached.calculate_score({"a": 1})
+    cached.calculate_score({"a": 3})
+    cached.calculate_score({"a": 2})
+    assert len(calls) == 4
+    assert cached.stats()['evictions'] == 2
+
+def test_ttl_expiry(calls, monkeypatch):
+    """Test that expired entries are recomputed."""
+    clock = [100.0]
+    monkeypatch.setattr("src.core.reputation.score_cache.time.monotonic", lambda: clock[0])
+    cached = CachedScore(CustomScore(lambda data: calls.append(data) or 1.0), ttl=5)
+    cached.calculate_score({"a": 1})
+    clock[0] += 10
+    cached.calculate_score({"a": 1})
+    assert len(calls) == 2
+
+def test_parameters_are_part_of_the_key():
+    """Test that differently configured algorithms do not share results."""
+    data = {"a": 1.0, "b": 1.0}
+    assert CachedScore(WeightedScore({"a": 1})).calculate_score(data) == 1.0
+    assert CachedScore(WeightedScore({"a": 2})).calculate_score(data) == 2.0
+    decay = CachedScore(ExponentialDecayScore(0.5))
+    assert decay.calculate_score(data) != decay.calculate_score(data, decay_rate=0.0)
+
+def test_manager_enable_score_cache():
+    """Test turning the cache on per manager without changing the scoring function."""
+    manager = ReputationManager(ExponentialDecayScore(decay_rate=0.1, time_based=True))
+    cache = manager.enable_score_cache(max_size=100)
+    assert manager.enable_score_cache() is cache
+    manager.add_entity("alice", {"a": 1.0})
+    manager.add_entity("bob", {"a": 1.0})
+    assert cache.stats()['hits'] == 1
+    assert cache.time_based is True
+
+def test_batched_add_entities_uses_cache():
+    """Test that the vectorized batch path serves cached rows and computes only the misses."""
+    class CountingWeighted(WeightedScore):
+        rows = 0
+        def calculate_scores(self, data, weights=None):
+            CountingWeighted.rows += len(data)
+            return super().calculate_scores(data, weights)
+    manager = ReputationManager(CountingWeighted({"a": 2.0, "b": 1.0}))
+    cache = manager.enable_score_cache()
+    manager.add_entities({"alice": {"a": 1.0, "b": 1.0}, "bob": {"b": 4.0}})
+    manager.add_entities({"carol": {"a": 1.0, "b": 1.0}, "dave": {"a": 3.0}, "erin": {"b": 4.0}})
+    assert CountingWeighted.rows == 3
+    assert cache.stats()['hits'] == 2
+    assert manager.get_score("carol") == manager.get_score("alice")
+    assert manager.get_score("erin") == manager.get_score("bob")
+
+def test_parallel_add_entities_uses_cache(calls):
+    """Test that pool scoring dispatches only cache misses and caches what the workers return."""
+    def scoring_function(data):
+        calls.append(data)
+        return float(sum(data.values()))
+    manager = ReputationManager(CustomScore(scoring_function), executor="thread", max_workers=2, chunk_size=2)
+    cache = manager.enable_score_cache()
+    try:
+        manager.add_entities({f"entity_{i}": {"a": i} for i in range(6)})
+        manager.add_entities({f"other_{i}": {"a": i} for i in range(4, 8)})
+        assert len(calls) == 8
+        assert cache.stats()['hits'] == 2
+        assert manager.get_score("other_7") == 7.0
+    finally:
+        manager.close()
@@ -0,0 +1,156 @@
+# src/tests/test_score_store.py
+
+import logging
+import math
+import numpy as np
+import pytest
+import pandas as pd
+from src.core.reputation.score_store import ScoreStore
+from src.core.reputation.reputation_manager import ReputationManager
+from src.core.reputation.scoring_algorithm import (
+    SimpleAverageScore, WeightedScore, ExponentialDecayScore, signals_to_matrix, signals_to_frame)
+
+@pytest.fixture
+def store():
+    """Fixture to create a small ScoreStore for testing."""
+    return ScoreStore(initial_capacity=2)
+
+def test_add_and_get(store):
+    """Test adding entities and reading their scores back."""
+    store.add("alice", 1.5)
+    store.add("bob", 2.5)
+    assert store.get("alice") == 1.5
+    assert store.get("bob") == 2.5
+    assert store.get("carol") is None
+    assert len(store) == 2
+
+def test_grows_past_initial_capacity(store):
+    """Test that the store grows when more entities than slots are added."""
+    for i in range(10):
+        store.add(f"entity_{i}", float(i))
+    assert len(store) == 10
+    assert store.capacity >= 10
+    assert store.get("entity_7") == 7.0
+
+def test_remove_reuses_slot(store):
+    """Test that removed slots are reused by later inserts."""
+    store.add("alice", 1.0)
+    slot = store.add("bob", 2.0)
+    assert store.remove("bob") is True
+    assert store.remove("bob") is False
+    assert store.add("carol", 3.0) == slot
+    assert "bob" not in store
+
+def test_add_many_overwrites_existing(store):
+    """Test that bulk inserts overwrite existing entities instead of duplicating them."""
+    store.add("alice", 1.0)
+    store.add_many(["alice", "bob", "carol"], [5.0, 6.0, 7.0])
+    assert len(store) == 3
+    assert store.get("alice") == 5.0
+
+def test_frame_round_trip(store):
+    """Test converting to and from a DataFrame."""
+    store.add_many(["alice", "bob"], [1.0, 2.0])
+    frame = store.to_frame()
+    assert list(frame.columns) == ['entity', 'score']
+    restored = ScoreStore.from_frame(frame)
+    assert restored.get("bob") == 2.0
+
+def test_manager_uses_store():
+    """Test that ReputationManager add/update/remove go through the store."""
+    manager = ReputationManager(SimpleAverageScore())
+    manager.add_entity("alice", {"a": 1, "b": 3})
+    assert manager.get_score("alice") == 2.0
+    manager.update_entity_score("alice", {"a": 4})
+    assert manager.get_score("alice") == 4.0
+    manager.remove_entity("alice")
+    assert manager.get_score("alice") is None
+    assert isinstance(manager.get_all_scores(), pd.DataFrame)
+
+def test_batch_scores_match_single_scores():
+    """Test that vectorized batch scoring matches per-entity scoring."""
+    records = [{"a": 1, "b": 2, "c": 3}, {"a": 4}, {}]
+    matrix = signals_to_matrix(records)
+    for algorithm in (SimpleAverageScore(), WeightedScore(), ExponentialDecayScore()):
+        expected = [algorithm.calculate_score(record) for record in records]
+        assert algorithm.calculate_scores(matrix) == pytest.approx(expected)
+
+def test_weighted_batch_with_dict_weights():
+    """Test batch weighted scoring against named DataFrame columns."""
+    frame = pd.DataFrame({"a": [1.0, 2.0], "b": [3.0, 4.0]})
+    scores = WeightedScore().calculate_scores(frame, weights={"a": 2})
+    assert list(scores) == [2.0, 4.0]
+
+def test_manager_batch_weighted_matches_keys(caplog):
+    """Test that batched dict weights are matched by signal name, not position, without a fallback."""
+    records = {"alice": {"quality": 1.0, "spam": 5.0}, "bob": {"spam": 2.0, "quality": 3.0}, "carol": {"other": 7.0}}
+    frame = signals_to_frame(records.values())
+    assert list(frame.columns) == ["quality", "spam", "other"]
+    manager = ReputationManager(WeightedScore(weights={"quality": 2, "spam": -1}))
+    with caplog.at_level(logging.WARNING):
+        manager.add_entities(records)
+    assert "falling back" not in caplog.text
+    assert [manager.get_score(entity) for entity in records] == [-3.0, 4.0, 0.0]
+    with pytest.raises(ValueError):
+        WeightedScore(weights={"quality": 2}).calculate_scores(np.ones((2, 2)))
+
+def test_manager_batch_add_and_update():
+    """Test that add_entities and batch_update_scores score in batch."""
+    manager = ReputationManager(SimpleAverageScore())
+    manager.add_entities({"alice": {"a": 1, "b": 3}, "bob": {"a": 5}})
+    manager.batch_update_scores({"alice": {"a": 10}, "unknown": {"a": 1}})
+    assert manager.get_score("alice") == 10.0
+    assert manager.get_score("bob") == 5.0
+    assert manager.get_score("unknown") is None
+
+def test_ingest_streams_average():
+    """Test that streamed observations update a running average."""
+    manager = ReputationManager(SimpleAverageScore())
+    manager.ingest("alice", "rating", 4.0)
+    assert manager.ingest("alice", "rating", 2.0) == 3.0
+    assert manager.get_score("alice") == 3.0
+
+def test_ingest_weighted_and_decay():
+    """Test weighted and time-decayed streaming accumulators."""
+    weighted = ReputationManager(WeightedScore(weights={"quality": 2}))
+    weighted.ingest("bob", "quality", 3.0)
+    assert weighted.ingest("bob", "spam", 100.0) == 6.0
+
+    decayed = ReputationManager(ExponentialDecayScore(decay_rate=0.5))
+    decayed.ingest("carol", "rating", 1.0, ts=0.0)
+    assert decayed.ingest("carol", "rating", 1.0, ts=2.0) == pytest.approx(1.0 + math.exp(-1.0))
+
+def test_time_based_decay_is_lazy():
+    """Test that time-based decay is applied on read and preserves ranking."""
+    manager = ReputationManager(ExponentialDecayScore(decay_rate=0.1, time_based=True))
+    epoch = manager.decay.epoch
+    manager.add_entity("old", {"a": 10.0}, ts=epoch)
+    manager.add_entity("new", {"a": 5.0}, ts=epoch + 10)
+    assert manager.get_score("old", now=epoch + 10) == pytest.approx(10.0 * math.exp(-1.0))
+    assert manager.get_score("new", now=epoch + 10) == pytest.approx(5.0)
+    ranked = manager.get_all_scores(now=epoch + 10).sort_values('score', ascending=False)
+    assert list(ranked['entity']) == ["new", "old"]
+
+def test_time_based_decay_rebases_epoch():
+    """Test that moving far past the epoch rebases without changing scores."""
+    manager = ReputationManager(ExponentialDecayScore(decay_rate=0.1, time_based=True))
+    epoch = manager.decay.epoch
+    manager.add_entity("alice", {"a": 1.0}, ts=epoch)
+    manager.add_entity("bob", {"a": 1.0}, ts=epoch + 2500)
+    assert manager.decay.epoch == epoch + 2500
+    assert manager.get_score("bob", now=epoch + 2500) == pytest.approx(1.0)
+    assert manager.get_score("alice", now=epoch + 2500) == pytest.approx(math.exp(-250.0))
+
+def test_rank_queries_far_past_epoch():
+    """Test score-threshold queries where the read factor underflows to zero."""
+    manager = ReputationManager(ExponentialDecayScore(decay_rate=0.5, time_based=True), time_decay_rate=0.1)
+    assert manager.decay.decay_rate == 0.1
+    epoch = manager.decay.epoch
+    manager.add_entities({"alice": {"a": 1.0}, "bob": {"a": 2.0}}, ts=epoch)
+    now = epoch + 10000  # exp(-0.1 * 10000) == 0.0 in float64
+    assert manager.count_above(0.5, now=now) == 0
+    assert manager.count_at_most(0.5, now=now) == 2
+    assert manager.percentile_of_score(0.5, now=now) == 100.0
+    assert manager.count_above(0.0, now=now) == 2
+    assert manager.entities_in_range(0.5, 1.0, now=now) == []
+    assert [entity for entity, _ in manager.entities_in_range(0.0, 1.0, now=now)] == ["alice", "bob"]
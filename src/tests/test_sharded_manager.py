@@ -0,0 +1,65 @@
+# src/tests/test_sharded_manager.py
+
+import threading
+import pytest
+from src.core.reputation.sharded_manager import ShardedReputationManager
+from src.core.reputation.scoring_algorithm import SimpleAverageScore
+
+@pytest.fixture
+def manager():
+    """Fixture to create a sharded manager with a few entities."""
+    manager = ShardedReputationManager(SimpleAverageScore(), num_shards=4)
+    manager.add_entities({f"entity_{i}": {"a": i} for i in range(20)})
+    return manager
+
+def test_operations_route_to_shards(manager):
+    """Test single-entity operations across shards."""
+    assert manager.get_score("entity_7") == 7.0
+    manager.update_entity_score("entity_7", {"a": 70})
+    manager.remove_entity("entity_3")
+    assert manager.get_score("entity_7") == 70.0
+    assert manager.get_score("entity_3") is None
+    assert len(manager) == 19
+
+def test_cross_shard_queries(manager):
+    """Test that top_k, rank and percentile see all shards."""
+    assert manager.top_k(3) == [("entity_19", 19.0), ("entity_18", 18.0), ("entity_17", 17.0)]
+    assert manager.rank("entity_19") == 1
+    assert manager.rank("entity_0") == 20
+    assert manager.percentile("entity_9") == 50.0
+    assert sorted(manager.get_all_scores()['score']) == [float(i) for i in range(20)]
+
+def test_concurrent_writers_do_not_lose_updates():
+    """Test that concurrent ingest calls on shared entities are all applied."""
+    manager = ShardedReputationManager(SimpleAverageScore(), num_shards=8)
+
+    def writer(worker):
+        for i in range(200):
+            manager.ingest(f"entity_{i % 50}", "rating", 1.0)
+            manager.add_entity(f"worker_{worker}_{i}", {"a": 1.0})
+
+    threads = [threading.Thread(target=writer, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(manager) == 50 + 4 * 200
+    assert all(manager.shards[manager.shard_index(f"entity_{i}")].accumulators[f"entity_{i}"].count == 16
+               for i in range(50))
+
+def test_percentile_with_unequal_shards():
+    """Test that percentiles are exact when shard sizes differ widely."""
+    manager = ShardedReputationManager(SimpleAverageScore(), num_shards=4)
+    manager.add_entities({f"entity_{i}": {"a": i % 7} for i in range(103)})
+    scores = sorted(manager.get_all_scores()['score'])
+    for entity in ("entity_0", "entity_3", "entity_6", "entity_50"):
+        score = manager.get_score(entity)
+        expected = 100.0 * sum(s <= score for s in scores) / len(scores)
+        assert manager.percentile(entity) == pytest.approx(expected)
+
+def test_shards_share_one_scoring_pool():
+    """Test that a pooled sharded manager creates a single executor for all shards."""
+    manager = ShardedReputationManager(SimpleAverageScore(), num_shards=4, executor='thread', max_workers=2)
+    assert all(shard._executor is manager.pool for shard in manager.shards)
+    manager.close()
+    assert manager.pool is None
@@ -0,0 +1,75 @@
+# src/tests/test_streaming_detection.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.core.risk_assessment import AnomalyDetector, StreamingAnomalyDetector
+
+@pytest.fixture
+def events():
+    """Fixture for a normal event stream with every 100th event shifted far away."""
+    rng = np.random.default_rng(0)
+    X = rng.normal(loc=[10.0, -5.0, 0.0, 100.0], scale=[1.0, 2.0, 0.5, 20.0], size=(5000, 4))
+    X[::100] += [8.0, -16.0, 4.0, 160.0]
+    labels = np.zeros(len(X), dtype=bool)
+    labels[::100] = True
+    return X, labels
+
+def test_scores_separate_anomalies_after_warmup(events):
+    """Test that injected anomalies score above normal events once warmed up."""
+    X, labels = events
+    detector = StreamingAnomalyDetector(warmup=300)
+    scores = np.array([detector.score_and_update(x) for x in X])
+    assert not scores[:300].any() and detector.fitted
+    assert scores[300:][labels[300:]].min() > np.percentile(scores[300:][~labels[300:]], 99)
+    assert detector.is_anomaly(X[4900]) and not detector.is_anomaly(X[4901])
+
+def test_memory_is_bounded(events):
+    """Test that state size does not grow with the number of events."""
+    X, _ = events
+    detector = StreamingAnomalyDetector(half_life=2).fit(X[:500])
+    size = detector.nbytes
+    for x in np.tile(X, (4, 1)):  # Short half-life forces several weight rescales
+        detector.update(x)
+    assert detector.nbytes == size
+    assert np.isfinite(detector.score_one(X[1]))
+
+def test_block_scores_match_single_events(events):
+    """Test that score_samples agrees with score_one and does not update the window."""
+    X, _ = events
+    detector = StreamingAnomalyDetector().fit(X[:1000])
+    block = detector.score_samples(X[1000:1100])
+    np.testing.assert_allclose(block, [detector.score_one(x) for x in X[1000:1100]])
+    np.testing.assert_allclose(detector.score_samples(X[1000:1100]), block)
+
+def test_window_adapts_to_drift(events):
+    """Test that a new regime stops looking anomalous as old events decay."""
+    X, _ = events
+    detector = StreamingAnomalyDetector(half_life=200).fit(X[:1000])
+    shifted = X[1000:3000] + [1.5, 3.0, 0.75, 30.0]
+    before = detector.score_samples(shifted[-100:]).mean()
+    for x in shifted[:-100]:
+        detector.update(x)
+    assert detector.score_samples(shifted[-100:]).mean() < before
+
+def test_anomaly_detector_streaming_mode(events):
+    """Test the Streaming model type through AnomalyDetector."""
+    X, labels = events
+    frame = pd.DataFrame(X, columns=['a', 'b', 'c', 'd'])
+    detector = AnomalyDetector('Streaming')
+    detector.fit(frame.iloc[:2000])
+    flagged = detector.detect_anomalies(frame.iloc[2000:])
+    assert flagged[labels[2000:]].all()
+    assert len(detector.get_anomaly_scores(frame.iloc[:10])) == 10
+    assert detector.score_and_update(X[2000]) > detector.score_one(X[2001])
+    with pytest.raises(ValueError):
+        AnomalyDetector().score_one(X[0])
+
+def test_flag_rate_on_clean_data_matches_contamination():
+    """Test that the warmup threshold flags about `contamination` of a clean stream."""
+    rng = np.random.default_rng(1)
+    X = rng.normal(loc=[10.0, -5.0, 0.0, 100.0], scale=[1.0, 2.0, 0.5, 20.0], size=(6000, 4))
+    detector = StreamingAnomalyDetector(warmup=256, contamination=0.05)
+    scores = np.array([detector.score_and_update(x) for x in X])
+    flag_rate = np.mean(scores[256:] > detector.threshold)
+    assert abs(flag_rate - 0.05) < 0.03
@@ -0,0 +1,52 @@
+# src/tests/test_streaming_training.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.core.risk_assessment import RiskAnalyzer
+from src.core.risk_assessment.streaming import iter_chunks, holdout_mask
+
+@pytest.fixture
+def csv_path(tmp_path):
+    """Fixture for a CSV file with a linearly separable target."""
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.normal(loc=5.0, scale=3.0, size=(4000, 4)), columns=['a', 'b', 'c', 'd'])
+    frame['risk'] = (frame['a'] - frame['b'] > 0).astype(int)
+    path = tmp_path / 'transactions.csv'
+    frame.to_csv(path, index=False)
+    return path, frame
+
+def test_streaming_training_matches_in_memory_statistics(csv_path):
+    """Test that the chunked scaler equals a full fit and the model learns the target."""
+    path, frame = csv_path
+    analyzer = RiskAnalyzer('SGD')
+    metrics = analyzer.train_model_streaming(path, 'risk', chunksize=300, epochs=3)
+    train = frame[~holdout_mask(np.arange(len(frame)), 0.2)]
+    np.testing.assert_allclose(analyzer.scaler.mean_, train[['a', 'b', 'c', 'd']].mean().to_numpy())
+    assert metrics['train_rows'] + metrics['holdout_rows'] == len(frame)
+    assert 0.1 < metrics['holdout_rows'] / len(frame) < 0.3
+    assert metrics['confusion_matrix'].shape == (2, 2)
+    assert metrics['accuracy'] > 0.95
+    predictions = analyzer.predict_risk(frame[['a', 'b', 'c', 'd']].iloc[:10])
+    assert (predictions == frame['risk'].iloc[:10].to_numpy()).mean() >= 0.8
+
+def test_chunks_are_bounded(csv_path):
+    """Test that no chunk exceeds chunksize and a chunk factory is accepted."""
+    path, frame = csv_path
+    sizes = [len(chunk) for chunk in iter_chunks(path, chunksize=700)]
+    assert max(sizes) == 700 and sum(sizes) == len(frame)
+    analyzer = RiskAnalyzer('SGD')
+    metrics = analyzer.train_model_streaming(lambda: iter_chunks(path, 500), 'risk')
+    assert metrics['train_rows'] + metrics['holdout_rows'] == len(frame)
+
+def test_holdout_assignment_is_stable():
+    """Test that the holdout split does not depend on chunk boundaries."""
+    ids = np.arange(1000)
+    whole = holdout_mask(ids, 0.25)
+    assert np.array_equal(whole, np.concatenate([holdout_mask(ids[:333], 0.25), holdout_mask(ids[333:], 0.25)]))
+    assert 0.2 < whole.mean() < 0.3
+
+def test_streaming_requires_incremental_model(csv_path):
+    """Test that batch-only models are rejected."""
+    with pytest.raises(ValueError):
+        RiskAnalyzer().train_model_streaming(csv_path[0], 'risk')
@@ -0,0 +1,105 @@
+# src/tests/test_token_cache.py
+
+import pytest
+from flask import Flask
+from src.core.identity import TokenManager
+from src.core.identity.token_cache import RevocationList
+from src.core.identity.user_store import SQLiteUserStore
+
+@pytest.fixture
+def token_manager():
+    """Fixture to create a TokenManager inside a Flask app context."""
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test-secret'
+    with app.app_context():
+        yield TokenManager(cache_size=2)
+
+def test_repeat_verification_hits_cache(token_manager):
+    """Test that verifying the same token twice decodes it once."""
+    token = token_manager.generate_token("alice")
+    assert token_manager.verify_token(token) == "alice"
+    assert token_manager.verify_token(token) == "alice"
+    assert token_manager.cache.hits == 1
+
+def test_revocation_is_immediate(token_manager):
+    """Test that a cached token is rejected right after revocation."""
+    token = token_manager.generate_token("alice")
+    other = token_manager.generate_token("alice")
+    token_manager.verify_token(token)
+    assert token_manager.revoke_token(token) is True
+    assert token_manager.verify_token(token) is None
+    assert token_manager.verify_token(other) == "alice"
+
+def test_invalid_and_expired_tokens(token_manager):
+    """Test that invalid and expired tokens are not cached."""
+    assert token_manager.verify_token("not-a-token") is None
+    assert token_manager.revoke_token("not-a-token") is False
+    token_manager.expiration_time = -10
+    expired = token_manager.generate_token("alice")
+    assert token_manager.verify_token(expired) is None
+    assert len(token_manager.cache) == 0
+
+def test_revocation_prune():
+    """Test that revocations are dropped once their tokens expire."""
+    revocations = RevocationList()
+    revocations.revoke("old", exp=10)
+    revocations.revoke("new", exp=1000)
+    revocations.revoke("newer", exp=1000)
+    assert revocations.prune(now=100) == 1
+    assert "old" not in revocations
+    assert "new" in revocations and "newer" in revocations
+
+def test_batch_tokens_round_trip(token_manager):
+    """Test that batch-issued tokens verify individually and in batch."""
+    tokens = token_manager.generate_tokens(["alice", "bob"])
+    assert token_manager.verify_token(tokens[1]) == "bob"
+    single = token_manager.generate_token("carol")
+    token_manager.revoke_token(tokens[0])
+    assert token_manager.verify_tokens(tokens + [single, "garbage", tokens[1][:-2] + "xx"]) == \
+        [None, "bob", "carol", None, None]
+
+def test_revocations_prune_automatically():
+    """Test that adding revocations drops expired ones without an explicit prune()."""
+    revocations = RevocationList(prune_interval=50)
+    revocations.revoke("old", exp=10, now=0)
+    revocations.revoke("new", exp=1000, now=20)
+    assert len(revocations) == 2  # Next prune is not due until t=50
+    revocations.revoke("newer", exp=1000, now=60)
+    assert "old" not in revocations and len(revocations) == 2
+
+def test_revocations_shared_between_workers(tmp_path, monkeypatch):
+    """Test that a token revoked through one worker's store is rejected by another's within the TTL."""
+    clock = [100.0]
+    monkeypatch.setattr("src.core.identity.token_cache.time.monotonic", lambda: clock[0])
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test-secret'
+    path = str(tmp_path / "identity.db")
+    with app.app_context():
+        first, second = SQLiteUserStore(path), SQLiteUserStore(path)
+        worker_a, worker_b = TokenManager(revocation_store=first), TokenManager(revocation_store=second)
+        token = worker_a.generate_token("alice")
+        assert worker_b.verify_token(token) == "alice"  # Now cached in worker_b
+        assert worker_a.revoke_token(token)
+        assert worker_a.verify_token(token) is None
+        assert worker_b.verify_token(token) == "alice"  # Not-revoked answer still fresh
+        clock[0] += 1.5
+        assert worker_b.verify_token(token) is None
+        assert worker_b.verify_tokens([token]) == [None]
+        first.add_revocation("expired", 0.0)
+        assert worker_b.revocations.prune() == 1
+        assert second.is_revoked("expired") is False
+        first.close()
+        second.close()
+
+def test_store_lookups_are_cached_until_revoked(tmp_path, monkeypatch):
+    """Test that repeat checks skip the store query and a local revoke takes effect at once."""
+    store = SQLiteUserStore(str(tmp_path / "identity.db"))
+    queries = []
+    is_revoked = store.is_revoked
+    monkeypatch.setattr(store, "is_revoked", lambda revocation_id: queries.append(revocation_id) or is_revoked(revocation_id))
+    revocations = RevocationList(store=store, negative_ttl=60)
+    assert "jti-1" not in revocations and "jti-1" not in revocations
+    assert queries == ["jti-1"]
+    revocations.revoke("jti-1", exp=float('inf'))
+    assert "jti-1" in revocations
+    store.close()
@@ -0,0 +1,67 @@
+# src/tests/test_trust_graph.py
+
+import numpy as np
+import pytest
+from src.core.reputation.trust_graph import TrustGraph
+
+@pytest.fixture
+def graph():
+    """Fixture to create a small trust graph where 'hub' is rated by everyone."""
+    graph = TrustGraph(damping=0.85)
+    graph.add_ratings(["a", "b", "c", "hub"], ["hub", "hub", "hub", "a"])
+    return graph
+
+def test_trust_sums_to_one(graph):
+    """Test that global trust is a probability vector."""
+    trust = graph.compute()
+    assert trust.sum() == pytest.approx(1.0)
+    assert graph.trust_of("hub") == max(trust)
+
+def test_cycle_is_uniform():
+    """Test that a symmetric cycle gives every node equal trust."""
+    graph = TrustGraph()
+    graph.add_ratings(["a", "b", "c"], ["b", "c", "a"])
+    assert graph.compute() == pytest.approx(np.full(3, 1 / 3))
+
+def test_matches_dense_solution(graph):
+    """Test power iteration against a dense linear solve."""
+    trust = graph.compute(tol=1e-12, max_iter=1000)
+    n = len(graph)
+    local = graph._matrix.toarray()
+    local = local / local.sum(axis=1, keepdims=True)
+    p = np.full(n, 1 / n)
+    expected = np.linalg.solve(np.eye(n) - 0.85 * local.T, 0.15 * p)
+    assert trust == pytest.approx(expected / expected.sum(), abs=1e-9)
+
+def test_personalization_and_edge_changes(graph):
+    """Test personalization vectors and recomputation after edge changes."""
+    graph.compute(personalization={"a": 1.0}, tol=1e-12, max_iter=1000)
+    graph.add_rating("d", "c", 2.0)
+    graph.remove_ratings(["b"], ["hub"])
+    warm = graph.compute(personalization={"a": 1.0}, tol=1e-12, max_iter=1000)
+    cold = graph.compute(personalization={"a": 1.0}, tol=1e-12, max_iter=1000, warm_start=False)
+    assert warm == pytest.approx(cold, abs=1e-10)
+    assert graph.edge_count == 4
+    assert list(graph.get_all_trust()['entity']) == ["a", "b", "c", "hub", "d"]
+
+def test_warm_start_after_perturbation():
+    """Test that starting from the previous graph's trust converges in fewer iterations than a cold start."""
+    rng = np.random.default_rng(0)
+    raters, ratees = rng.integers(0, 300, size=(2, 3000))
+    graph = TrustGraph()
+    graph.add_ratings(list(raters), list(ratees), rng.random(3000))
+    graph.compute(tol=1e-10, max_iter=1000)
+    graph.add_ratings(list(raters[:30]), list(ratees[30:60]))  # Perturb 1% of the edges
+    warm = graph.compute(tol=1e-10, max_iter=1000)
+    warm_iterations = graph.iterations
+    cold = graph.compute(tol=1e-10, max_iter=1000, warm_start=False)
+    assert warm == pytest.approx(cold, abs=1e-8)
+    assert warm_iterations < graph.iterations
+
+def test_damping_follows_pagerank_convention():
+    """Test that damping is the edge-following probability and validated."""
+    graph = TrustGraph(damping=0.0)
+    graph.add_ratings(["a", "b", "c"], ["hub", "hub", "hub"])
+    assert graph.compute() == pytest.approx(np.full(4, 0.25))  # Pure teleportation
+    with pytest.raises(ValueError):
+        TrustGraph(damping=1.0)
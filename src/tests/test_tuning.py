@@ -0,0 +1,60 @@
+# src/tests/test_tuning.py
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import IsolationForest
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import StandardScaler
+from src.core.risk_assessment import RiskAnalyzer, AnomalyDetector
+from src.core.risk_assessment.tuning import HyperparameterSearch
+
+@pytest.fixture(scope='module')
+def data():
+    """Fixture for a small feature frame and target."""
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(rng.normal(size=(1200, 4)), columns=['a', 'b', 'c', 'd'])
+    return frame, (frame['a'] - frame['b'] + 0.3 * rng.normal(size=1200) > 0).astype(int)
+
+GRID = {'alpha': [1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0, 10.0, 100.0, 1000.0]}
+
+def test_successive_halving_discards_weak_candidates(data):
+    """Test that rungs shrink by factor and only the last rung uses full folds."""
+    search = HyperparameterSearch(SGDClassifier(random_state=0), GRID, cv=3, factor=3, max_workers=1)
+    search.fit(*data)
+    rungs = {}
+    for result in search.results_:
+        rungs.setdefault(result['rung'], []).append(result)
+    assert [len(rungs[r]) for r in sorted(rungs)] == [9, 3]
+    assert rungs[0][0]['n_samples'] < rungs[1][0]['n_samples'] == 800
+    assert search.best_params_['alpha'] < 1.0
+    assert search.best_score_ == max(r['mean_score'] for r in rungs[1])
+    assert isinstance(search.best_estimator_, SGDClassifier) and isinstance(search.best_scaler_, StandardScaler)
+
+def test_process_pool_matches_serial(data):
+    """Test that the process pool gives the same results as the in-process path."""
+    serial = HyperparameterSearch(SGDClassifier(random_state=0), GRID, cv=3, max_workers=1).fit(*data)
+    pooled = HyperparameterSearch(SGDClassifier(random_state=0), GRID, cv=3, max_workers=2).fit(*data)
+    assert [r['scores'] for r in pooled.results_] == [r['scores'] for r in serial.results_]
+    assert pooled.best_params_ == serial.best_params_
+    np.testing.assert_array_equal(pooled.best_estimator_.coef_, serial.best_estimator_.coef_)
+
+def test_risk_analyzer_reuses_best_fold_model(data):
+    """Test that tuning installs the search's model and scaler without re-training."""
+    analyzer = RiskAnalyzer('SGD')
+    best = analyzer.hyperparameter_tuning(*data, {'alpha': [1e-4, 1e-2, 10.0]}, max_workers=1)
+    assert best['alpha'] in (1e-4, 1e-2)
+    assert analyzer.model.alpha == best['alpha']
+    assert (analyzer.predict_risk(data[0]) == data[1]).mean() > 0.85
+
+def test_anomaly_tuning_matches_refitting(data):
+    """Test that the single-fit anomaly tuning picks what refitting per contamination would."""
+    frame = data[0]
+    contaminations = [0.01, 0.05, 0.1]
+    detector = AnomalyDetector()
+    detector.hyperparameter_tuning(frame, contaminations)
+    scaled = StandardScaler().fit_transform(frame)
+    reference = IsolationForest(contamination=0.1, random_state=42).fit(scaled)
+    assert detector.model.contamination == 0.1
+    assert detector.model.offset_ == pytest.approx(reference.offset_)
+    np.testing.assert_array_equal(detector.detect_anomalies(frame), reference.predict(scaled) == -1)
@@ -0,0 +1,155 @@
+# src/tests/test_user_store.py
+
+import threading
+import pytest
+from flask import Flask
+from src.core.identity import IdentityManager, Cryptography, InMemoryUserStore, SQLiteUserStore
+
+class FastCryptography(Cryptography):
+    """Cryptography with a low iteration count to keep tests quick."""
+    def __init__(self):
+        super().__init__()
+        self.iterations = 1000
+
+@pytest.fixture
+def app_context():
+    """Fixture providing the Flask app context TokenManager needs."""
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test-secret'
+    with app.app_context():
+        yield
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path):
+    """Fixture for each user store backend."""
+    store = InMemoryUserStore() if request.param == 'memory' else SQLiteUserStore(str(tmp_path / 'users.db'))
+    yield store
+    store.close()
+
+def record(password_hash=b'hash', role=None):
+    return {"password_hash": password_hash, "verified": False, "role": role}
+
+def test_add_get_update(store):
+    """Test the basic store operations on every backend."""
+    assert store.add('alice', record())
+    assert not store.add('alice', record(b'other'))
+    assert store.get('alice') == record()
+    assert 'alice' in store and 'bob' not in store
+    assert store.update('alice', verified=True, role='editor')
+    assert store.get('alice') == {"password_hash": b'hash', "verified": True, "role": 'editor'}
+    assert not store.update('bob', verified=True)
+    assert store.get('bob') is None
+    assert list(store.role_assignments()) == [('alice', 'editor')]
+
+def test_add_many_skips_existing(store):
+    """Test that batched inserts keep existing users and in-batch duplicates out."""
+    store.add('alice', record(b'original'))
+    inserted = store.add_many([('alice', record()), ('bob', record()), ('bob', record(b'dup')), ('carol', record())])
+    assert inserted == {'bob', 'carol'}
+    assert store.get('alice')['password_hash'] == b'original'
+    assert store.get('bob')['password_hash'] == b'hash'
+    assert set(store.get_many(['alice', 'carol', 'dave'])) == {'alice', 'carol'}
+
+def test_sqlite_store_is_shared_and_persistent(tmp_path):
+    """Test that two stores on one file see each other's writes and survive reopening."""
+    path = str(tmp_path / 'users.db')
+    first, second = SQLiteUserStore(path), SQLiteUserStore(path)
+    first.add('alice', record())
+    second.update('alice', verified=True)
+    assert first.get('alice')['verified'] is True
+    first.close()
+    second.close()
+    reopened = SQLiteUserStore(path)
+    assert len(reopened) == 1
+    reopened.close()
+
+def test_sqlite_store_concurrent_adds(tmp_path):
+    """Test that concurrent registrations of one username insert it exactly once."""
+    store = SQLiteUserStore(str(tmp_path / 'users.db'), pool_size=4)
+    results = []
+    def add():
+        results.append(store.add('alice', record()))
+    threads = [threading.Thread(target=add) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results.count(True) == 1
+    store.close()
+
+def test_identity_manager_with_sqlite_store(app_context, tmp_path):
+    """Test IdentityManager end to end on a persistent store, including restart."""
+    path = str(tmp_path / 'users.db')
+    manager = IdentityManager(user_store=SQLiteUserStore(path))
+    manager.cryptography = FastCryptography()
+    results = manager.register_users([('alice', 'pw1'), ('bob', 'pw2'), ('alice', 'pw3'), ('carol', '')])
+    assert [status for _, status in results] == [201, 201, 409, 400]
+    assert manager.register_user('bob', 'pw')[1] == 409
+    assert manager.verify_user('alice', 'pw1')[1] == 200
+    assert manager.assign_role('alice', 'editor')[1] == 200
+    assert manager.generate_token('alice')[1] == 200
+
+    restarted = IdentityManager(user_store=SQLiteUserStore(path))
+    restarted.cryptography = FastCryptography()
+    assert restarted.is_user_verified('alice')
+    assert restarted.get_user_role('alice') == 'editor'
+    assert restarted.user_roles.has_permission('alice', 'edit')
+    assert [status for _, status in restarted.verify_users([('bob', 'pw2'), ('bob', 'bad'), ('dave', 'x')])] == [200, 401, 404]
+    assert restarted.is_user_verified('bob')
+
+def test_in_memory_store_growth_and_long_hashes():
+    """Test the compact store across array growth and for hashes wider than its slots."""
+    store = InMemoryUserStore(initial_capacity=2, hash_width=8)
+    for i in range(10):
+        store.add(f'user{i}', record(bytes([i]) * (4 if i % 2 else 12), role='viewer' if i % 3 == 0 else None))
+    assert len(store) == 10
+    assert store.get('user3') == record(bytes([3]) * 4, role='viewer')
+    assert store.get('user4') == record(bytes([4]) * 12)
+    store.update('user4', password_hash=b'short')
+    assert store.get('user4')['password_hash'] == b'short'
+    assert sorted(store.role_assignments()) == [('user0', 'viewer'), ('user3', 'viewer'), ('user6', 'viewer'), ('user9', 'viewer')]
+
+def test_identity_manager_shares_username_index(app_context):
+    """Test that roles reuse the in-memory store's username index."""
+    manager = IdentityManager()
+    manager.cryptography = FastCryptography()
+    assert manager.user_roles.permissions._user_slots is manager.users.slot_index
+    assert manager.user_roles.permissions._role_table is manager.users.role_table
+    manager.register_user('alice', 'pw')
+    assert manager.assign_role('alice', 'editor')[1] == 200
+    assert manager.assign_role('bob', 'editor')[1] == 404
+    assert manager.user_roles.has_permission('alice', 'view')
+    assert manager.get_user_role('alice') == 'editor'
+    with pytest.raises(ValueError):
+        manager.user_roles.assign_role('bob', 'viewer')
+
+def test_roles_are_stored_once(app_context):
+    """Test that role checks read the in-memory store's role ids, so the two cannot drift."""
+    manager = IdentityManager(user_store=InMemoryUserStore(initial_capacity=2))
+    manager.cryptography = FastCryptography()
+    for username in ('alice', 'bob', 'carol'):
+        manager.register_user(username, 'pw')
+    manager.users.update('alice', role='admin')  # Written straight to the store
+    manager.user_roles.assign_role('bob', 'editor')  # Written through the engine
+    assert manager.users.get('bob')['role'] == 'editor'
+    assert manager.user_roles.has_permission('alice', 'delete')
+    assert manager.user_roles.users_with_permission(['alice', 'bob', 'carol'], 'edit') == ['alice', 'bob']
+    manager.users.update('alice', role='viewer')
+    assert not manager.user_roles.has_permission('alice', 'edit')
+    assert manager.user_roles.get_user_role('alice') == 'viewer'
+
+def test_role_changes_reach_other_processes(app_context, tmp_path):
+    """Test that managers sharing a SQLite store see each other's role changes on the next check."""
+    path = str(tmp_path / 'users.db')
+    first, second = IdentityManager(user_store=SQLiteUserStore(path)), IdentityManager(user_store=SQLiteUserStore(path))
+    first.cryptography = FastCryptography()
+    first.register_user('alice', 'secret')
+    first.assign_role('alice', 'admin')
+    assert second.user_roles.has_permission('alice', 'delete')
+    second.assign_role('alice', 'viewer')  # Demoted by another worker
+    assert not first.user_roles.has_permission('alice', 'delete')
+    assert first.user_roles.has_permission('alice', 'view')
+    assert first.user_roles.get_user_role('alice') == 'viewer'
+    assert list(first.user_roles.users_with_permission(['alice', 'bob'], 'view')) == ['alice']
+    first.users.close()
+    second.users.close()